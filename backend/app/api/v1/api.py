@@ -2,10 +2,10 @@
 API Router - Main router that includes all endpoint routers
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import interpretations
+from app.api.v1.endpoints import dreams, interpretations, social
 
 # Import other routers (to be created)
-# from app.api.v1.endpoints import auth, dreams, social, profile, imam, azkar, sleep
+# from app.api.v1.endpoints import auth, profile, imam, azkar, sleep
 
 api_router = APIRouter()
 
@@ -16,10 +16,22 @@ api_router.include_router(
     tags=["Interpretations"]
 )
 
+# Include dreams router (journal search)
+api_router.include_router(
+    dreams.router,
+    prefix="/dreams",
+    tags=["Dreams"]
+)
+
+# Include social router (sharing, follows, feeds)
+api_router.include_router(
+    social.router,
+    prefix="/social",
+    tags=["Social"]
+)
+
 # Include other endpoint routers (to be added later)
 # api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-# api_router.include_router(dreams.router, prefix="/dreams", tags=["Dreams"])
-# api_router.include_router(social.router, prefix="/social", tags=["Social"])
 # api_router.include_router(profile.router, prefix="/profile", tags=["Profile"])
 # api_router.include_router(imam.router, prefix="/imam", tags=["Imam Consultation"])
 # api_router.include_router(azkar.router, prefix="/azkar", tags=["Azkar"])
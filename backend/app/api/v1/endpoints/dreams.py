@@ -0,0 +1,158 @@
+"""
+Dream API Endpoints - Dream journal search, similar dreams, analytics,
+import and export
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.dream import Dream
+from app.schemas.dream import (
+    DreamAnalyticsResponse,
+    DreamImportResponse,
+    DreamResponse,
+    DreamSearchResponse,
+    DreamSearchResult,
+    SimilarDream,
+    SimilarDreamsResponse,
+)
+from app.repositories import users
+from app.services import journal_transfer, search_service
+from app.services.dream_analytics import dream_analytics
+from app.services.dream_embeddings import dream_index
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=DreamSearchResponse)
+async def search_dreams(
+    q: str = Query(..., min_length=1, max_length=200, description="Words, symbols or \"quoted phrases\" to search for"),
+    user_id: Optional[int] = Query(None, description="ID of the searching user (replaced by the authenticated user once auth lands)"),
+    scope: str = Query("all", description="\"all\" for every dream the user may see, \"mine\" for their own journal"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search dreams by title, description, symbols and tags
+
+    Symbols also match approximately, so small misspellings still find
+    results. Only dreams the user may see are returned: public dreams,
+    their own, and friends-only dreams of mutual followers.
+    """
+    try:
+        page = await search_service.search_dreams(
+            db, q, viewer_id=user_id, scope=scope, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return DreamSearchResponse(
+        items=[
+            DreamSearchResult(**DreamResponse.model_validate(dream).model_dump(), rank=round(rank, 4))
+            for dream, rank in page["items"]
+        ],
+        next_cursor=page["next_cursor"],
+    )
+
+
+@router.get("/analytics", response_model=DreamAnalyticsResponse)
+async def dream_journal_analytics(
+    user_id: int = Query(..., description="ID of the journal's owner (replaced by the authenticated user once auth lands)"),
+    period: Optional[str] = Query(None, description="Month as YYYY-MM, or \"all\"; defaults to the current month"),
+    top: int = Query(settings.ANALYTICS_TOP_TERMS, ge=1, le=50, description="Symbols and emotions to list"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    A user's most frequent symbols and emotions, dream-type mix and sleep
+    on nights with and without dreams
+
+    Served from monthly aggregates kept current as dreams and sleep logs
+    are written, so the cost does not grow with the journal.
+    """
+    try:
+        return await dream_analytics.summary(db, user_id, period=period, top=top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/import", response_model=DreamImportResponse)
+async def import_journal(
+    request: Request,
+    user_id: int = Query(..., description="ID of the journal's owner (replaced by the authenticated user once auth lands)"),
+    fmt: Optional[str] = Query(None, alias="format", description="\"ndjson\" or \"csv\"; defaults to the Content-Type (text/csv for CSV, otherwise NDJSON)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import dreams from another journal app
+
+    The body is NDJSON (one dream object per line) or CSV (a header row
+    of dream fields, list fields separated by ";"), in the format of
+    GET /dreams/export. It is read as it arrives and inserted in batches,
+    so journals of any size import in bounded memory. Invalid records are
+    skipped and reported; valid ones are imported.
+    """
+    if fmt is None:
+        fmt = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson"
+    if fmt not in journal_transfer.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {fmt}")
+    if await users.get(db, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return await journal_transfer.import_dreams(db, request.stream(), user_id, fmt=fmt)
+
+
+@router.get("/export")
+async def export_journal(
+    user_id: int = Query(..., description="ID of the journal's owner (replaced by the authenticated user once auth lands)"),
+    fmt: str = Query("ndjson", alias="format", description="\"ndjson\" or \"csv\""),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download a user's whole journal as NDJSON or CSV
+
+    Dreams are streamed from a database cursor in id order, a batch at a
+    time, so memory use does not depend on the size of the journal.
+    """
+    if fmt not in journal_transfer.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {fmt}")
+    if await users.get(db, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return StreamingResponse(
+        journal_transfer.export_dreams(user_id, fmt=fmt),
+        media_type=journal_transfer.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="dreams-{user_id}.{fmt}"'}
+    )
+
+
+@router.get("/{dream_id}/similar", response_model=SimilarDreamsResponse)
+async def similar_dreams(
+    dream_id: int,
+    user_id: Optional[int] = Query(None, description="ID of the viewing user (replaced by the authenticated user once auth lands)"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Dreams like this one, by meaning rather than shared words
+
+    Uses the dream's embedding; a new or edited dream appears here once
+    the background indexer has embedded it (usually within seconds).
+    Only dreams the user may see are returned.
+    """
+    visible = await db.execute(
+        select(Dream.id).where(Dream.id == dream_id).where(search_service.visible_to(user_id))
+    )
+    if visible.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Dream not found")
+
+    ranked = await dream_index.similar_dreams(db, dream_id, viewer_id=user_id, limit=limit)
+    return SimilarDreamsResponse(items=[
+        SimilarDream(**DreamResponse.model_validate(dream).model_dump(), similarity=round(similarity, 4))
+        for dream, similarity in ranked
+    ])
@@ -1,19 +1,77 @@
 """
 Dream Interpretation API endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.models.dream import Dream
+from app.models.interpretation import Interpretation, InterpretationStatus
 from app.schemas.interpretation import (
     InterpretationRequest,
     InterpretationResponse,
     IstikharaInterpretationRequest,
+    InterpretationJobRequest,
+    InterpretationJobResponse,
+    BatchInterpretationRequest,
+)
+from app.services.circuit_breaker import CircuitOpenError, CircuitState
+from app.services.batch_interpretation import (
+    bulk_insert_interpretations,
+    interpret_dreams,
+    interpretation_row,
 )
+from app.services.interpretation_cache import interpretation_cache
+from app.services.interpretation_jobs import interpretation_jobs
 from app.services.ollama_service import ollama_service
+from app.services.scheduler import SchedulerOverloaded
+from app.services.structured_output import sections_from_columns
 
 router = APIRouter()
 
 
+def _build_context(request: InterpretationRequest) -> Optional[Dict]:
+    """
+    Build the optional interpretation context from request fields
+    """
+    context = {}
+    if request.emotions:
+        context["emotions"] = ", ".join(request.emotions)
+    if request.symbols:
+        context["symbols"] = ", ".join(request.symbols)
+    if request.time_of_day:
+        context["time_of_day"] = request.time_of_day
+    return context if context else None
+
+
+def _select_sections(sections: Dict, names: Optional[List[str]]) -> Dict:
+    """
+    Keep only the requested sections of a structured interpretation
+    """
+    if not names:
+        return sections
+    return {name: value for name, value in sections.items() if name in names}
+
+
+def _overloaded(e: SchedulerOverloaded) -> HTTPException:
+    """
+    503 response telling the client when to retry
+    """
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
 @router.post("/interpret", response_model=InterpretationResponse)
 async def interpret_dream(request: InterpretationRequest):
     """
@@ -21,6 +79,9 @@ async def interpret_dream(request: InterpretationRequest):
 
     This endpoint takes a dream description and optional context
     and returns an Islamic interpretation using the local Ollama LLM.
+    With `structured` (or `sections`) the interpretation is generated as
+    JSON and also returned split into sections; all sections are cached
+    together, so asking for a single section reuses an earlier generation.
 
     Args:
         request: InterpretationRequest containing dream text and context
@@ -29,27 +90,23 @@ async def interpret_dream(request: InterpretationRequest):
         InterpretationResponse with the interpretation and metadata
     """
     try:
-        # Build context dictionary from request
-        context = {}
-        if request.emotions:
-            context["emotions"] = ", ".join(request.emotions)
-        if request.symbols:
-            context["symbols"] = ", ".join(request.symbols)
-        if request.time_of_day:
-            context["time_of_day"] = request.time_of_day
-
         # Call Ollama service for interpretation
         result = await ollama_service.interpret_dream(
             dream_text=request.dream_text,
-            context=context if context else None
+            context=_build_context(request),
+            structured=request.structured or bool(request.sections)
         )
 
         # Add interpretation type to response
         if result.get("success"):
             result["interpretation_type"] = "regular"
+            if "sections" in result:
+                result["sections"] = _select_sections(result["sections"], request.sections)
 
         return InterpretationResponse(**result)
 
+    except SchedulerOverloaded as e:
+        raise _overloaded(e)
     except Exception as e:
         logger.error(f"Error in interpret_dream endpoint: {e}")
         raise HTTPException(
@@ -58,6 +115,129 @@ async def interpret_dream(request: InterpretationRequest):
         )
 
 
+@router.post("/interpret/stream")
+async def stream_dream_interpretation(request: InterpretationRequest):
+    """
+    Interpret a dream and stream the result as Server-Sent Events
+
+    Tokens are forwarded as `token` events as soon as Ollama produces them.
+    A `queued` event reports the queue position if the request has to wait.
+    In structured mode a `section` event is sent as each section completes
+    instead of `token` events.
+    A final `done` event carries time-to-first-token and tokens/sec, or an
+    `error` event is sent if generation fails mid-stream.
+
+    Args:
+        request: InterpretationRequest containing dream text and context
+
+    Returns:
+        text/event-stream response
+    """
+    # Reject before the stream starts so the client gets a real status code
+    if ollama_service.breaker.state == CircuitState.OPEN:
+        raise _overloaded(CircuitOpenError(
+            "Interpretation service is temporarily unavailable", ollama_service.breaker.retry_after()
+        ))
+    if ollama_service.scheduler.is_full():
+        raise _overloaded(SchedulerOverloaded(
+            "Interpretation queue is full", ollama_service.scheduler.retry_after()
+        ))
+
+    events = ollama_service.stream_interpretation(
+        dream_text=request.dream_text,
+        context=_build_context(request),
+        structured=request.structured or bool(request.sections)
+    )
+
+    return StreamingResponse(
+        _sse_events(events, request.sections),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx)
+        }
+    )
+
+
+async def _sse_events(
+    events: AsyncIterator[Dict],
+    sections: Optional[List[str]] = None
+) -> AsyncIterator[str]:
+    """
+    Format service stream events as Server-Sent Events frames, skipping
+    sections that were not requested
+    """
+    async for event in events:
+        if sections and event["event"] == "section" and event["name"] not in sections:
+            continue
+        # Events may be shared between coalesced subscribers; don't mutate them
+        data = {key: value for key, value in event.items() if key != "event"}
+        yield f"event: {event['event']}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/interpret/batch")
+async def interpret_dream_batch(
+    request: BatchInterpretationRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Interpret many stored dreams and stream results as NDJSON
+
+    Dreams run at batch priority with bounded concurrency so interactive
+    requests are not starved. One JSON line is emitted per dream as soon as
+    it completes, followed by a summary line. With `persist`, results are
+    written to the interpretations table in multi-row inserts.
+
+    Args:
+        request: BatchInterpretationRequest with dream IDs
+
+    Returns:
+        application/x-ndjson response
+    """
+    result = await db.execute(select(Dream).where(Dream.id.in_(request.dream_ids)))
+    dreams = result.scalars().all()
+
+    missing = set(request.dream_ids) - {dream.id for dream in dreams}
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Dreams not found: {sorted(missing)}"
+        )
+
+    return StreamingResponse(
+        _batch_lines(dreams, request.persist),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _batch_lines(dreams: List[Dream], persist: bool) -> AsyncIterator[str]:
+    """
+    Run a batch and format each result as an NDJSON line
+    """
+    pending_rows = []
+    succeeded = failed = 0
+
+    # The request-scoped session is closed once streaming starts; use our own
+    async with AsyncSessionLocal() as session:
+        async for dream, result in interpret_dreams(dreams):
+            if result.get("success"):
+                succeeded += 1
+                if persist:
+                    pending_rows.append(interpretation_row(dream, result))
+            else:
+                failed += 1
+
+            yield json.dumps({"dream_id": dream.id, **result}) + "\n"
+
+            if len(pending_rows) >= settings.BATCH_INSERT_SIZE:
+                await bulk_insert_interpretations(session, pending_rows)
+                pending_rows = []
+
+        await bulk_insert_interpretations(session, pending_rows)
+
+    yield json.dumps({"done": True, "succeeded": succeeded, "failed": failed}) + "\n"
+
+
 @router.post("/interpret/istikhara", response_model=InterpretationResponse)
 async def interpret_istikhara_dream(request: IstikharaInterpretationRequest):
     """
@@ -82,6 +262,8 @@ async def interpret_istikhara_dream(request: IstikharaInterpretationRequest):
         # The result already has type="istikhara" from the service
         return InterpretationResponse(**result)
 
+    except SchedulerOverloaded as e:
+        raise _overloaded(e)
     except Exception as e:
         logger.error(f"Error in interpret_istikhara_dream endpoint: {e}")
         raise HTTPException(
@@ -90,13 +272,97 @@ async def interpret_istikhara_dream(request: IstikharaInterpretationRequest):
         )
 
 
+def _job_response(job: Interpretation) -> InterpretationJobResponse:
+    """
+    Map an interpretation row to the job status response
+    """
+    completed = job.status == InterpretationStatus.COMPLETED
+    declined = job.status == InterpretationStatus.DECLINED
+    return InterpretationJobResponse(
+        job_id=job.id,
+        dream_id=job.dream_id,
+        status=job.status.value,
+        interpretation=job.interpretation_text if completed else None,
+        model=job.model_name,
+        confidence=job.confidence_score,
+        prompt_version=job.prompt_version,
+        sections=sections_from_columns(job) if completed else None,
+        error=job.interpretation_text if declined else None
+    )
+
+
+@router.post("/jobs", response_model=InterpretationJobResponse, status_code=202)
+async def submit_interpretation_job(
+    request: InterpretationJobRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue a stored dream for background interpretation
+
+    Returns immediately with a job ID instead of holding the connection
+    open for the whole generation. Poll `GET /jobs/{job_id}` for the result.
+
+    Args:
+        request: InterpretationJobRequest with the dream ID
+
+    Returns:
+        InterpretationJobResponse with status "pending"
+    """
+    dream = await db.get(Dream, request.dream_id)
+    if dream is None:
+        raise HTTPException(status_code=404, detail="Dream not found")
+
+    job = await interpretation_jobs.submit(db, dream)
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=InterpretationJobResponse)
+async def get_interpretation_job(
+    job_id: int,
+    wait: int = Query(0, ge=0, le=settings.INTERPRETATION_JOB_MAX_WAIT,
+                      description="Seconds to long-poll for completion"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the status and result of a background interpretation job
+
+    With `wait`, the request is held until the job finishes or the wait
+    expires, so clients don't need to poll in a tight loop.
+
+    Args:
+        job_id: The job ID returned on submission
+        wait: Maximum seconds to wait for completion
+
+    Returns:
+        InterpretationJobResponse with the current status
+    """
+    job = await db.get(Interpretation, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    finished = (InterpretationStatus.COMPLETED, InterpretationStatus.DECLINED)
+    while job.status not in finished and loop.time() < deadline:
+        # Re-check the row periodically in case another process ran the job
+        await interpretation_jobs.wait(job_id, min(deadline - loop.time(), 2.0))
+        await db.refresh(job)
+
+    return _job_response(job)
+
+
 @router.get("/health")
 async def check_ollama_health():
     """
     Check if Ollama service is running and accessible
 
+    Probes every configured Ollama node; the service is healthy while at
+    least one node is up. The circuit breaker state shows whether
+    interpretation requests are currently being rejected fast.
+
     Returns:
-        Dictionary with health status and details
+        Dictionary with health status, details, circuit breaker state
+        and per-node statistics
     """
     try:
         is_healthy = await ollama_service.check_health()
@@ -106,14 +372,19 @@ async def check_ollama_health():
                 "status": "healthy",
                 "service": "ollama",
                 "model": ollama_service.model,
-                "host": ollama_service.base_url
+                "models": ollama_service.router.distinct_models,
+                "host": ollama_service.base_url,
+                "circuit": ollama_service.breaker.get_stats(),
+                "nodes": ollama_service.balancer.get_stats()
             }
         else:
             return {
                 "status": "unhealthy",
                 "service": "ollama",
                 "message": "Ollama service is not responding",
-                "host": ollama_service.base_url
+                "host": ollama_service.base_url,
+                "circuit": ollama_service.breaker.get_stats(),
+                "nodes": ollama_service.balancer.get_stats()
             }
 
     except Exception as e:
@@ -123,3 +394,26 @@ async def check_ollama_health():
             "service": "ollama",
             "error": str(e)
         }
+
+
+@router.get("/metrics")
+async def get_ollama_metrics():
+    """
+    Runtime metrics for the Ollama integration
+
+    Returns:
+        Dictionary with connection pool utilization, cache hit ratios,
+        request coalescing counters, model routing, token usage per model,
+        scheduler queue state, circuit breaker/retry budget state and job
+        counters
+    """
+    return {
+        "pool": ollama_service.get_pool_stats(),
+        "cache": interpretation_cache.get_stats(),
+        "single_flight": ollama_service.get_single_flight_stats(),
+        "routing": ollama_service.get_routing_stats(),
+        "tokens": ollama_service.get_token_stats(),
+        "scheduler": ollama_service.scheduler.get_stats(),
+        "resilience": ollama_service.get_resilience_stats(),
+        "jobs": interpretation_jobs.get_stats()
+    }
@@ -0,0 +1,347 @@
+"""
+Social API Endpoints - Sharing dreams, likes, comments, follows, feeds and trending
+"""
+from typing import NoReturn, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from loguru import logger
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.dream import Dream
+from app.models.social import Comment, Follow, Like, SocialPost
+from app.models.user import User
+from app.repositories import profiles
+from app.schemas.social import (
+    CommentCreate,
+    CommentResponse,
+    CommentThreadResponse,
+    FeedResponse,
+    FollowResponse,
+    LikeResponse,
+    PostResponse,
+    ShareDreamRequest,
+    TrendingPost,
+    TrendingResponse,
+)
+from app.services import feed_service
+from app.services.comment_threads import comment_threads
+from app.services.engagement_counters import engagement_counters
+from app.services.trending_service import trending_service
+
+router = APIRouter()
+
+# Until authentication is available, the acting user is passed explicitly
+ActingUser = Query(..., description="ID of the acting user (replaced by the authenticated user once auth lands)")
+
+# PostgreSQL error code of a foreign key violation
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _references_missing_row(error: IntegrityError) -> bool:
+    """
+    Whether a write failed because a row it references does not exist
+    """
+    return getattr(error.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION
+
+
+async def _reject_unknown_user(db: AsyncSession, error: IntegrityError) -> NoReturn:
+    """
+    Roll back a write by the acting user and raise 404 if the user does not exist
+    """
+    await db.rollback()
+    if _references_missing_row(error):
+        raise HTTPException(status_code=404, detail="User not found")
+    raise error
+
+
+@router.get("/feed", response_model=FeedResponse)
+async def get_feed(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Newest shared dreams from the whole community
+
+    Hidden and flagged posts are excluded. Pages are cursor-based: pass
+    `next_cursor` from the previous response to continue.
+    """
+    try:
+        page = await feed_service.global_feed(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await engagement_counters.overlay(page["items"])
+    return page
+
+
+@router.get("/feed/following", response_model=FeedResponse)
+async def get_following_feed(
+    user_id: int = ActingUser,
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Newest shared dreams from the users a user follows
+    """
+    try:
+        page = await feed_service.following_feed(db, user_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await engagement_counters.overlay(page["items"])
+    return page
+
+
+@router.get("/trending", response_model=TrendingResponse)
+async def get_trending(
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Posts with the most recent engagement
+
+    Likes, comments and shares count towards a post's score and lose half
+    their weight every TRENDING_HALF_LIFE_HOURS, so new activity outranks
+    old popularity.
+    """
+    ranked = await trending_service.trending_posts(db, limit)
+    await engagement_counters.overlay(post for post, _ in ranked)
+    return TrendingResponse(items=[
+        TrendingPost(
+            **PostResponse.model_validate(post).model_dump(),
+            trending_score=round(score, 4)
+        )
+        for post, score in ranked
+    ])
+
+
+@router.post("/dreams/{dream_id}/share", response_model=PostResponse, status_code=201)
+async def share_dream(
+    dream_id: int,
+    request: ShareDreamRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Share a dream to the social feed
+
+    The new post is pushed to followers' timelines in the background.
+    """
+    dream = await db.get(Dream, dream_id)
+    if dream is None:
+        raise HTTPException(status_code=404, detail="Dream not found")
+
+    post = SocialPost(
+        user_id=dream.user_id,
+        dream_id=dream.id,
+        caption=request.caption,
+        interpretation_included=request.include_interpretation,
+    )
+    dream.is_shared = True
+    db.add(post)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Dream is already shared")
+
+    result = await db.execute(
+        select(SocialPost).options(*profiles.POST_CARD).where(SocialPost.id == post.id)
+    )
+    post = result.scalar_one()
+
+    background_tasks.add_task(feed_service.fan_out_post, post.id)
+    await trending_service.record(post.id, "share", post.created_at)
+    logger.info(f"Dream {dream_id} shared as post {post.id}")
+    return post
+
+
+async def _get_visible_post(db: AsyncSession, post_id: int) -> SocialPost:
+    """
+    Load a post that can be interacted with, or raise 404
+
+    Hidden and flagged posts are excluded, as they are from the feeds.
+    """
+    post = await db.scalar(
+        select(SocialPost).where(SocialPost.id == post_id, feed_service.visible_filter())
+    )
+    if post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return post
+
+
+async def _like_response(post: SocialPost, liked: bool) -> LikeResponse:
+    await engagement_counters.overlay([post])
+    return LikeResponse(post_id=post.id, liked=liked, likes_count=post.likes_count or 0)
+
+
+@router.post("/posts/{post_id}/like", response_model=LikeResponse)
+async def like_post(
+    post_id: int,
+    user_id: int = ActingUser,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Like a post; liking an already liked post has no effect
+
+    The like row is written immediately; the post's likes_count is updated
+    by the next batched counter flush.
+    """
+    post = await _get_visible_post(db, post_id)
+
+    async with engagement_counters.changing(post_id):
+        try:
+            result = await db.execute(
+                insert(Like)
+                .values(user_id=user_id, post_id=post_id)
+                .on_conflict_do_nothing(index_elements=["user_id", "post_id"])
+                .returning(Like.id)
+            )
+        except IntegrityError as e:
+            await _reject_unknown_user(db, e)
+        liked_now = result.scalar_one_or_none() is not None
+        await db.commit()
+        if liked_now:
+            await engagement_counters.add(post_id, "likes", 1)
+
+    if liked_now:
+        await trending_service.record(post_id, "like")
+    return await _like_response(post, liked=True)
+
+
+@router.delete("/posts/{post_id}/like", response_model=LikeResponse)
+async def unlike_post(
+    post_id: int,
+    user_id: int = ActingUser,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Remove a like from a post; unliking a post that is not liked has no effect
+    """
+    post = await _get_visible_post(db, post_id)
+
+    async with engagement_counters.changing(post_id):
+        result = await db.execute(
+            delete(Like)
+            .where(Like.user_id == user_id)
+            .where(Like.post_id == post_id)
+            .returning(Like.id)
+        )
+        unliked_now = result.scalar_one_or_none() is not None
+        await db.commit()
+        if unliked_now:
+            await engagement_counters.add(post_id, "likes", -1)
+    return await _like_response(post, liked=False)
+
+
+@router.post("/posts/{post_id}/comments", response_model=CommentResponse, status_code=201)
+async def comment_on_post(
+    post_id: int,
+    request: CommentCreate,
+    user_id: int = ActingUser,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Comment on a post, optionally as a reply to another comment
+    """
+    await _get_visible_post(db, post_id)
+
+    if request.parent_comment_id is not None:
+        parent = await db.get(Comment, request.parent_comment_id)
+        if parent is None or parent.post_id != post_id:
+            raise HTTPException(status_code=400, detail="Parent comment does not belong to this post")
+
+    comment = Comment(
+        user_id=user_id,
+        post_id=post_id,
+        text=request.text,
+        parent_comment_id=request.parent_comment_id,
+    )
+    async with engagement_counters.changing(post_id):
+        db.add(comment)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await _reject_unknown_user(db, e)
+        await engagement_counters.add(post_id, "comments", 1)
+
+    await comment_threads.invalidate(post_id)
+    await trending_service.record(post_id, "comment")
+    return comment
+
+
+@router.get("/posts/{post_id}/comments", response_model=CommentThreadResponse)
+async def get_comment_thread(
+    post_id: int,
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE,
+                       description="Top-level comments per page"),
+    depth: int = Query(settings.COMMENT_THREAD_MAX_DEPTH, ge=1, le=settings.COMMENT_THREAD_MAX_DEPTH,
+                       description="Reply levels to load"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    A post's comments as a tree, top-level comments oldest first
+
+    The whole page, replies included, is loaded with one query and cached
+    until the next comment on the post.
+    """
+    await _get_visible_post(db, post_id)
+    try:
+        return await comment_threads.get_thread(db, post_id, cursor=cursor, limit=limit, max_depth=depth)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/users/{followee_id}/follow", response_model=FollowResponse)
+async def follow_user(
+    followee_id: int,
+    user_id: int = ActingUser,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Follow a user; their future and recent posts appear in the following feed
+    """
+    if followee_id == user_id:
+        raise HTTPException(status_code=400, detail="Users cannot follow themselves")
+    if await db.get(User, followee_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    db.add(Follow(follower_id=user_id, followee_id=followee_id))
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if _references_missing_row(e):
+            raise HTTPException(status_code=404, detail="User not found")
+        # Already following; following is idempotent
+    else:
+        await feed_service.invalidate_timeline(user_id)
+
+    return FollowResponse(follower_id=user_id, followee_id=followee_id, following=True)
+
+
+@router.delete("/users/{followee_id}/follow", response_model=FollowResponse)
+async def unfollow_user(
+    followee_id: int,
+    user_id: int = ActingUser,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stop following a user
+    """
+    result = await db.execute(
+        delete(Follow)
+        .where(Follow.follower_id == user_id)
+        .where(Follow.followee_id == followee_id)
+    )
+    await db.commit()
+    if result.rowcount:
+        await feed_service.invalidate_timeline(user_id)
+
+    return FollowResponse(follower_id=user_id, followee_id=followee_id, following=False)
@@ -0,0 +1,173 @@
+"""
+Benchmark similar-dream lookups on synthetic embeddings
+
+Fills dream_embeddings with synthetic clustered vectors (no Ollama needed,
+everything runs on the database CPU), builds the HNSW index, then reports
+top-k latency of the queries behind GET /dreams/{id}/similar and their
+recall against an exact scan. Seed dreams first, e.g. with
+`python -m app.cli.benchmark_search --seed --dreams 1000000`.
+
+Usage:
+    python -m app.cli.benchmark_embeddings --seed
+    python -m app.cli.benchmark_embeddings --ef-search 40 --ef-search 100
+    python -m app.cli.benchmark_embeddings --cleanup
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List
+
+from loguru import logger
+from sqlalchemy import delete, func, select, text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, close_db, engine
+from app.models.embedding import DreamEmbedding
+from app.services.dream_embeddings import dream_index
+
+SYNTHETIC_MODEL = "synthetic"
+
+# One vector per dream: a cluster centre chosen by dream id plus noise
+_SEED_VECTORS = text("""
+    INSERT INTO dream_embeddings (dream_id, model, content_hash, embedding)
+    SELECT d.id, :model, md5(d.id::text), (
+        SELECT array_agg(sin((d.id % :clusters) * 0.7 + i) + (random() - 0.5) * :noise)
+        FROM generate_series(1, :dimensions) AS i
+    )::vector
+    FROM dreams d
+    LEFT JOIN dream_embeddings e ON e.dream_id = d.id
+    WHERE e.dream_id IS NULL AND d.id > :first_id AND d.id <= :last_id
+""")
+
+_HNSW_INDEX = """
+    CREATE INDEX idx_dream_embeddings_hnsw ON dream_embeddings
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)
+"""
+
+
+async def seed(chunk_size: int, clusters: int, noise: float) -> None:
+    """
+    Give every dream without an embedding a synthetic vector, then rebuild the index
+
+    The HNSW index is dropped while seeding; building it once afterwards
+    is much faster than maintaining it row by row.
+    """
+    async with engine.begin() as conn:
+        max_id = (await conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM dreams"))).scalar_one()
+        await conn.execute(text("DROP INDEX IF EXISTS idx_dream_embeddings_hnsw"))
+
+    for first_id in range(0, max_id, chunk_size):
+        async with engine.begin() as conn:
+            await conn.execute(_SEED_VECTORS, {
+                "model": SYNTHETIC_MODEL,
+                "clusters": clusters,
+                "noise": noise,
+                "dimensions": settings.EMBEDDING_DIMENSIONS,
+                "first_id": first_id,
+                "last_id": first_id + chunk_size,
+            })
+        logger.info(f"Seeded vectors up to dream {min(first_id + chunk_size, max_id)} of {max_id}")
+
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL maintenance_work_mem = '1GB'"))
+        await conn.execute(text(_HNSW_INDEX))
+        await conn.execute(text("ANALYZE dream_embeddings"))
+    logger.info(f"Built HNSW index in {time.perf_counter() - started:.1f}s")
+
+
+async def cleanup() -> None:
+    """
+    Delete synthetic embeddings
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(delete(DreamEmbedding).where(DreamEmbedding.model == SYNTHETIC_MODEL))
+        await session.commit()
+        logger.info(f"Deleted {result.rowcount} synthetic embeddings")
+
+
+async def sample_dream_ids(count: int) -> List[int]:
+    """
+    Random dream ids that have an embedding
+    """
+    async with AsyncSessionLocal() as session:
+        low, high = (await session.execute(
+            select(func.min(DreamEmbedding.dream_id), func.max(DreamEmbedding.dream_id))
+        )).one()
+        if low is None:
+            raise SystemExit("No embeddings found; run with --seed first")
+        candidates = random.Random(7).sample(range(low, high + 1), min(count * 2, high - low + 1))
+        result = await session.execute(
+            select(DreamEmbedding.dream_id).where(DreamEmbedding.dream_id.in_(candidates))
+        )
+        return list(result.scalars())[:count]
+
+
+async def exact_neighbours(dream_id: int, limit: int) -> List[int]:
+    """
+    True top-k by a sequential scan, for measuring recall
+    """
+    async with AsyncSessionLocal() as session:
+        await session.execute(select(func.set_config("enable_indexscan", "off", True)))
+        ranked = await dream_index.similar_dreams(session, dream_id, limit=limit)
+        return [dream.id for dream, _ in ranked]
+
+
+async def run(ef_searches: List[int], queries: int, recall_queries: int, limit: int) -> None:
+    """
+    Time top-k lookups and measure recall for each ef_search value
+    """
+    dream_ids = await sample_dream_ids(queries)
+    exact = {
+        dream_id: await exact_neighbours(dream_id, limit)
+        for dream_id in dream_ids[:recall_queries]
+    }
+
+    print(f"{'ef_search':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'recall@' + str(limit):>10}")
+    for ef_search in ef_searches:
+        settings.EMBEDDING_EF_SEARCH = ef_search
+        timings = []
+        hits = 0
+        for dream_id in dream_ids:
+            async with AsyncSessionLocal() as session:
+                started = time.perf_counter()
+                ranked = await dream_index.similar_dreams(session, dream_id, limit=limit)
+                timings.append((time.perf_counter() - started) * 1000)
+            if dream_id in exact:
+                hits += len({dream.id for dream, _ in ranked} & set(exact[dream_id]))
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        expected = sum(len(ids) for ids in exact.values()) or 1
+        print(
+            f"{ef_search:>9} {statistics.median(timings):>8.2f} {p95:>8.2f} "
+            f"{timings[-1]:>8.2f} {hits / expected:>10.3f}"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        if args.cleanup:
+            await cleanup()
+            return
+        if args.seed:
+            await seed(args.chunk_size, args.clusters, args.noise)
+        await run(args.ef_search or [settings.EMBEDDING_EF_SEARCH], args.queries, args.recall_queries, args.limit)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark similar-dream lookups on synthetic embeddings")
+    parser.add_argument("--seed", action="store_true", help="Add synthetic vectors for dreams without one")
+    parser.add_argument("--cleanup", action="store_true", help="Delete synthetic vectors and exit")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Dreams seeded per statement")
+    parser.add_argument("--clusters", type=int, default=200, help="Distinct themes in the synthetic data")
+    parser.add_argument("--noise", type=float, default=0.8, help="Spread of vectors around their theme")
+    parser.add_argument("--ef-search", type=int, action="append", help="HNSW ef_search to test (repeatable)")
+    parser.add_argument("--queries", type=int, default=200, help="Timed lookups per ef_search value")
+    parser.add_argument("--recall-queries", type=int, default=20, help="Lookups checked against an exact scan")
+    parser.add_argument("--limit", type=int, default=10, help="Neighbours per lookup (k)")
+    asyncio.run(main(parser.parse_args()))
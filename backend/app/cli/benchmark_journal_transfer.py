@@ -0,0 +1,185 @@
+"""
+Benchmark streaming journal import and export
+
+Creates a synthetic user (username prefixed "bench_journal_"), imports a
+generated journal into it through the same code as POST /dreams/import,
+then exports it as GET /dreams/export does, and reports throughput per
+format. The journal is generated while it is imported and the export is
+counted, not kept, so with --memory the reported Python allocation peaks
+are those of the import and export themselves; they should not grow with
+--dreams. Run it against a scratch database with all db/schemas
+migrations applied.
+
+Usage:
+    python -m app.cli.benchmark_journal_transfer
+    python -m app.cli.benchmark_journal_transfer --dreams 10000 --format csv --memory
+    python -m app.cli.benchmark_journal_transfer --cleanup
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import time
+import tracemalloc
+from typing import AsyncIterator, Dict
+
+from loguru import logger
+from sqlalchemy import delete, insert
+
+from app.cli.benchmark_search import SYMBOLS, WORDS
+from app.core.database import AsyncSessionLocal, close_db
+from app.models.user import User
+from app.services import journal_transfer
+from app.services.dream_embeddings import dream_index
+
+BENCH_PREFIX = "bench_journal_"
+
+# Request body chunk size, as a client upload would arrive
+CHUNK_SIZE = 64 * 1024
+
+
+def synthetic_record(rng: random.Random) -> Dict:
+    """
+    One random journal entry in import form
+    """
+    symbols = rng.sample(SYMBOLS, rng.randint(1, 4))
+    words = rng.choices(WORDS + SYMBOLS, k=rng.randint(20, 60)) + symbols
+    rng.shuffle(words)
+    return {
+        "title": " ".join(rng.sample(symbols + WORDS, 3)).capitalize(),
+        "description": " ".join(words),
+        "dream_type": rng.choices(["regular", "istikhara", "prophetic", "confused"], weights=[7, 1, 1, 1])[0],
+        "emotions": rng.sample(WORDS[:20], rng.randint(0, 2)),
+        "symbols": symbols,
+        "tags": rng.sample(SYMBOLS, rng.randint(0, 2)),
+        "privacy": rng.choices(["private", "friends", "public"], weights=[6, 1, 3])[0],
+    }
+
+
+async def journal_body(dreams: int, fmt: str, rng: random.Random) -> AsyncIterator[bytes]:
+    """
+    A generated import body, produced chunk by chunk
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(journal_transfer.IMPORT_FIELDS)
+    for _ in range(dreams):
+        record = synthetic_record(rng)
+        if fmt == "ndjson":
+            buffer.write(json.dumps(record) + "\n")
+        else:
+            writer.writerow([
+                journal_transfer.LIST_SEPARATOR.join(value) if isinstance(value, list) else value or ""
+                for value in (record.get(field) for field in journal_transfer.IMPORT_FIELDS)
+            ])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def create_user(fmt: str) -> int:
+    async with AsyncSessionLocal() as session:
+        user_id = await session.scalar(
+            insert(User)
+            .values(email=f"{BENCH_PREFIX}{fmt}@example.com", username=f"{BENCH_PREFIX}{fmt}", hashed_password="-")
+            .returning(User.id)
+        )
+        await session.commit()
+    return user_id
+
+
+async def cleanup() -> None:
+    """
+    Delete the synthetic users; their dreams cascade
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(delete(User).where(User.username.startswith(BENCH_PREFIX)))
+        await session.commit()
+        logger.info(f"Deleted {result.rowcount} synthetic users")
+
+
+def report(phase: str, fmt: str, dreams: int, seconds: float, size: int, peak: int, trace: bool) -> None:
+    peak_column = f"{peak / 2 ** 20:>8.1f}" if trace else f"{'-':>8}"
+    print(
+        f"{phase:<8} {fmt:<7} {dreams:>9} {seconds:>8.2f} {dreams / seconds:>10.0f} "
+        f"{size / 2 ** 20:>8.1f} {peak_column}"
+    )
+
+
+async def run(dreams: int, formats, batch_size: int, trace: bool, rng: random.Random) -> None:
+    """
+    Import and export a generated journal per format
+    """
+    print(f"{'phase':<8} {'format':<7} {'dreams':>9} {'seconds':>8} {'dreams/s':>10} {'MiB':>8} {'peak MiB':>8}")
+    for fmt in formats:
+        user_id = await create_user(fmt)
+
+        size = 0
+
+        async def counted(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+            nonlocal size
+            async for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            result = await journal_transfer.import_dreams(
+                session, counted(journal_body(dreams, fmt, rng)), user_id, fmt=fmt, batch_size=batch_size
+            )
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        tracemalloc.stop()
+        if result["failed"] or not result["complete"]:
+            logger.warning(f"Import rejected records: {result['errors'][:3]}")
+        report("import", fmt, result["imported"], seconds, size, peak, trace)
+
+        if trace:
+            tracemalloc.start()
+        exported = size = 0
+        started = time.perf_counter()
+        async for chunk in journal_transfer.export_dreams(user_id, fmt=fmt, batch_size=batch_size):
+            size += len(chunk.encode())
+            exported += chunk.count("\n")
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        tracemalloc.stop()
+        if fmt == "csv":
+            # Header row; a description never contains a newline here
+            exported -= 1
+        report("export", fmt, exported, seconds, size, peak, trace)
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        await cleanup()
+        if args.cleanup:
+            return
+        # No indexer runs in this process; don't queue the imported dreams for embedding
+        dream_index.enabled = False
+        await run(args.dreams, args.format or list(journal_transfer.FORMATS), args.batch_size,
+                  args.memory, random.Random(args.random_seed))
+        if not args.keep:
+            await cleanup()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming journal import and export")
+    parser.add_argument("--dreams", type=int, default=100_000, help="Dreams per journal")
+    parser.add_argument("--format", action="append", choices=list(journal_transfer.FORMATS),
+                        help="Format to benchmark (repeatable, default: all)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Dreams per INSERT and per export fetch")
+    parser.add_argument("--memory", action="store_true", help="Report peak Python allocations; slows the run")
+    parser.add_argument("--keep", action="store_true", help="Keep the imported journals")
+    parser.add_argument("--cleanup", action="store_true", help="Delete synthetic data and exit")
+    parser.add_argument("--random-seed", type=int, default=42, help="Seed for reproducible data")
+    asyncio.run(main(parser.parse_args()))
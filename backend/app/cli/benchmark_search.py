@@ -0,0 +1,188 @@
+"""
+Benchmark dream search latency on a synthetic data set
+
+Seeds synthetic users and dreams (usernames prefixed "bench_"), then runs
+the search queries used by GET /dreams/search and reports latency
+percentiles per query and scope. Run it against a scratch database with
+all db/schemas migrations applied; seeding 1M dreams takes a few minutes.
+
+Usage:
+    python -m app.cli.benchmark_search --seed --dreams 1000000
+    python -m app.cli.benchmark_search --query snake --query water --explain
+    python -m app.cli.benchmark_search --cleanup
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy import delete, func, insert, select, text
+
+from app.core.database import AsyncSessionLocal, close_db, engine
+from app.models.dream import Dream, DreamPrivacy
+from app.models.social import Follow
+from app.models.user import User
+from app.services.search_service import search_dreams, search_query
+
+BENCH_PREFIX = "bench_"
+
+# Common dream symbols plus filler words, so some queries are selective and some are not
+SYMBOLS = [
+    "snake", "water", "fire", "mosque", "kaaba", "moon", "sun", "rain", "river", "sea",
+    "mountain", "garden", "tree", "lion", "horse", "camel", "bird", "dog", "cat", "fish",
+    "gold", "silver", "house", "door", "key", "bread", "milk", "honey", "dates", "prayer",
+    "quran", "teeth", "hair", "death", "wedding", "baby", "flying", "falling", "darkness", "light",
+]
+WORDS = [
+    "walking", "through", "large", "small", "old", "green", "white", "black", "saw", "felt",
+    "afraid", "peaceful", "mother", "father", "brother", "friend", "stranger", "night", "morning",
+    "city", "village", "road", "running", "standing", "calling", "voice", "crowd", "empty", "bright",
+]
+DEFAULT_QUERIES = ["snake", "water", "\"black snake\"", "snak", "kaaba prayer", "mountain -fire"]
+
+
+def synthetic_dream(rng: random.Random, user_ids: List[int]) -> dict:
+    """
+    One random dream row
+    """
+    symbols = rng.sample(SYMBOLS, rng.randint(1, 4))
+    words = rng.choices(WORDS + SYMBOLS, k=rng.randint(20, 60)) + symbols
+    rng.shuffle(words)
+    return {
+        "user_id": rng.choice(user_ids),
+        "title": " ".join(rng.sample(symbols + WORDS, 3)).capitalize(),
+        "description": " ".join(words),
+        "symbols": symbols,
+        "tags": rng.sample(SYMBOLS, rng.randint(0, 2)),
+        "privacy": rng.choices(list(DreamPrivacy), weights=[6, 1, 3])[0],
+    }
+
+
+async def seed(users: int, dreams: int, batch_size: int, rng: random.Random) -> None:
+    """
+    Insert synthetic users, random follows and dreams
+    """
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "email": f"{BENCH_PREFIX}{i}@example.com",
+                    "username": f"{BENCH_PREFIX}{i}",
+                    "hashed_password": "-",
+                }
+                for i in range(users)
+            ]
+        )
+        user_ids = list((await session.execute(
+            select(User.id).where(User.username.startswith(BENCH_PREFIX))
+        )).scalars())
+
+        follows = {tuple(rng.sample(user_ids, 2)) for _ in range(users * 10)}
+        await session.execute(
+            insert(Follow),
+            [{"follower_id": a, "followee_id": b} for a, b in follows]
+        )
+        await session.commit()
+        logger.info(f"Seeded {len(user_ids)} users and {len(follows)} follows")
+
+        inserted = 0
+        while inserted < dreams:
+            count = min(batch_size, dreams - inserted)
+            await session.execute(insert(Dream), [synthetic_dream(rng, user_ids) for _ in range(count)])
+            await session.commit()
+            inserted += count
+            logger.info(f"Seeded {inserted}/{dreams} dreams")
+
+        await session.execute(text("ANALYZE users, follows, dreams"))
+        await session.commit()
+
+
+async def cleanup() -> None:
+    """
+    Delete all synthetic users; their dreams and follows cascade
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(delete(User).where(User.username.startswith(BENCH_PREFIX)))
+        await session.commit()
+        logger.info(f"Deleted {result.rowcount} synthetic users")
+
+
+async def explain(q: str, viewer_id: Optional[int], scope: str) -> None:
+    """
+    Print the executed plan of a first-page search
+    """
+    sql = search_query(q, viewer_id=viewer_id, scope=scope).compile(
+        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+        print("\n".join(row[0] for row in result))
+
+
+async def run(queries: List[str], iterations: int, pages: int, show_plans: bool) -> None:
+    """
+    Time first and follow-up pages for each query and scope
+    """
+    async with AsyncSessionLocal() as session:
+        viewer_id = (await session.execute(
+            select(Dream.user_id).group_by(Dream.user_id).order_by(func.count().desc()).limit(1)
+        )).scalar_one()
+
+    scopes = [("anonymous", None, "all"), ("signed in", viewer_id, "all"), ("own journal", viewer_id, "mine")]
+    print(f"{'query':<20} {'scope':<12} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'results':>8}")
+    for q in queries:
+        for label, viewer, scope in scopes:
+            timings = []
+            results = 0
+            for _ in range(iterations):
+                cursor = None
+                results = 0
+                async with AsyncSessionLocal() as session:
+                    for _ in range(pages):
+                        started = time.perf_counter()
+                        page = await search_dreams(session, q, viewer_id=viewer, scope=scope, cursor=cursor)
+                        timings.append((time.perf_counter() - started) * 1000)
+                        results += len(page["items"])
+                        cursor = page["next_cursor"]
+                        if cursor is None:
+                            break
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(
+                f"{q:<20} {label:<12} {statistics.median(timings):>8.1f} {p95:>8.1f} "
+                f"{timings[-1]:>8.1f} {results:>8}"
+            )
+            if show_plans:
+                await explain(q, viewer, scope)
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        if args.cleanup:
+            await cleanup()
+            return
+        if args.seed:
+            await seed(args.users, args.dreams, args.batch_size, random.Random(args.random_seed))
+        await run(args.query or DEFAULT_QUERIES, args.iterations, args.pages, args.explain)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dream search on synthetic data")
+    parser.add_argument("--seed", action="store_true", help="Insert synthetic data before benchmarking")
+    parser.add_argument("--cleanup", action="store_true", help="Delete synthetic data and exit")
+    parser.add_argument("--dreams", type=int, default=1_000_000, help="Dreams to seed")
+    parser.add_argument("--users", type=int, default=10_000, help="Users to seed")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Dreams per INSERT")
+    parser.add_argument("--random-seed", type=int, default=42, help="Seed for reproducible data")
+    parser.add_argument("--query", action="append", help="Search text to benchmark (repeatable)")
+    parser.add_argument("--iterations", type=int, default=20, help="Runs per query and scope")
+    parser.add_argument("--pages", type=int, default=3, help="Pages fetched per run")
+    parser.add_argument("--explain", action="store_true", help="Print EXPLAIN ANALYZE for each query")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,75 @@
+"""
+Embed dreams that are missing from the similar-dreams index
+
+The API server embeds new and edited dreams in the background; this
+command backfills dreams created before the index existed, dreams missed
+while the server was down, and every dream after switching
+OLLAMA_EMBEDDING_MODEL. Dreams are processed in id order, one Ollama
+request per batch; dreams whose text is unchanged are skipped.
+
+Usage:
+    python -m app.cli.embed_dreams
+    python -m app.cli.embed_dreams --all --batch-size 64
+"""
+import argparse
+import asyncio
+
+from loguru import logger
+from sqlalchemy import or_, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, close_db
+from app.models.dream import Dream
+from app.models.embedding import DreamEmbedding
+from app.services.dream_embeddings import dream_index
+from app.services.ollama_service import ollama_service
+
+
+async def backfill(batch_size: int, check_all: bool) -> None:
+    """
+    Index dreams without a current embedding, batch by batch
+    """
+    last_id = total = indexed = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            query = (
+                select(Dream)
+                .outerjoin(DreamEmbedding, DreamEmbedding.dream_id == Dream.id)
+                .where(Dream.id > last_id)
+                .order_by(Dream.id)
+                .limit(batch_size)
+            )
+            if not check_all:
+                query = query.where(or_(
+                    DreamEmbedding.dream_id.is_(None),
+                    DreamEmbedding.model != dream_index.model,
+                ))
+            dreams = (await session.execute(query)).scalars().all()
+            if not dreams:
+                break
+
+            indexed += await dream_index.index_dreams(session, dreams)
+
+        last_id = dreams[-1].id
+        total += len(dreams)
+        logger.info(f"Checked {total} dreams, embedded {indexed} (up to dream {last_id})")
+
+    logger.info(f"Done: {indexed} of {total} dreams embedded")
+
+
+async def main(args: argparse.Namespace) -> None:
+    await ollama_service.startup()
+    try:
+        await backfill(args.batch_size, args.all)
+    finally:
+        await ollama_service.shutdown()
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed dreams missing from the similar-dreams index")
+    parser.add_argument("--all", action="store_true",
+                        help="Check every dream, re-embedding those whose text changed")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE,
+                        help="Dreams per Ollama request")
+    asyncio.run(main(parser.parse_args()))
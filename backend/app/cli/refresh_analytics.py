@@ -0,0 +1,52 @@
+"""
+Rebuild dream journal analytics from the dreams and sleep_logs tables
+
+Triggers keep the aggregates current on every write; this command
+recomputes them from scratch, for one user or everyone, e.g. after a bulk
+load with triggers disabled or to check for drift. Cached summaries of
+the affected users are dropped.
+
+Usage:
+    python -m app.cli.refresh_analytics
+    python -m app.cli.refresh_analytics --user 42
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import Integer, bindparam, func, select
+
+from app.core.database import AsyncSessionLocal, close_db
+from app.core.redis import close_redis, init_redis
+from app.services.dream_analytics import dream_analytics
+
+
+async def refresh(user_id: Optional[int]) -> None:
+    """
+    Recompute the aggregates in one transaction
+    """
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        await session.execute(select(func.refresh_dream_analytics(bindparam("user_id", user_id, Integer))))
+        await session.commit()
+    target = f"user {user_id}" if user_id is not None else "all users"
+    logger.info(f"Rebuilt analytics for {target} in {time.perf_counter() - started:.1f}s")
+
+    await dream_analytics.invalidate(user_id)
+
+
+async def main(args: argparse.Namespace) -> None:
+    await init_redis()
+    try:
+        await refresh(args.user)
+    finally:
+        await close_db()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild dream journal analytics aggregates")
+    parser.add_argument("--user", type=int, help="Only rebuild this user's aggregates")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,136 @@
+"""
+Re-interpret stored dreams in bulk, e.g. after switching OLLAMA_MODEL
+
+Dreams are processed in id order, one chunk at a time. Each chunk is
+interpreted concurrently, its results are bulk-inserted, and the last
+dream id is written to a checkpoint file, so a crashed run resumes after
+the last completed chunk. Every dream is generated afresh: the
+interpretation cache is bypassed unless --use-cache is given, since a
+re-run with the same model and prompts would otherwise return the stored
+answers.
+
+Usage:
+    python -m app.cli.reinterpret --model mistral --output results.ndjson
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Optional, TextIO
+
+from loguru import logger
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.dream import Dream
+from app.services.batch_interpretation import (
+    bulk_insert_interpretations,
+    interpret_dreams,
+    interpretation_row,
+)
+from app.services.model_router import ModelRouter
+from app.services.ollama_service import ollama_service
+
+
+def read_checkpoint(path: str) -> int:
+    """
+    Last dream id completed by a previous run, or 0
+    """
+    try:
+        with open(path) as f:
+            return int(json.load(f)["last_dream_id"])
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path: str, last_dream_id: int) -> None:
+    """
+    Atomically record the last completed dream id
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_dream_id": last_dream_id}, f)
+    os.replace(tmp_path, path)
+
+
+async def reinterpret(
+    checkpoint: str,
+    chunk_size: int,
+    concurrency: int,
+    output: TextIO,
+    user_id: Optional[int] = None,
+    use_cache: bool = False
+) -> None:
+    """
+    Interpret every dream after the checkpoint, chunk by chunk
+    """
+    last_id = read_checkpoint(checkpoint)
+    if last_id:
+        logger.info(f"Resuming after dream {last_id}")
+
+    total = failed = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            query = select(Dream).where(Dream.id > last_id).order_by(Dream.id).limit(chunk_size)
+            if user_id is not None:
+                query = query.where(Dream.user_id == user_id)
+            dreams = (await session.execute(query)).scalars().all()
+            if not dreams:
+                break
+
+            rows = []
+            async for dream, result in interpret_dreams(dreams, concurrency, use_cache=use_cache):
+                output.write(json.dumps({"dream_id": dream.id, **result}) + "\n")
+                if result.get("success"):
+                    rows.append(interpretation_row(dream, result))
+                else:
+                    failed += 1
+
+            await bulk_insert_interpretations(session, rows)
+
+        output.flush()
+        last_id = dreams[-1].id
+        write_checkpoint(checkpoint, last_id)
+        total += len(dreams)
+        logger.info(f"Interpreted {total} dreams ({failed} failed), checkpoint at dream {last_id}")
+
+    logger.info(f"Done: {total} dreams interpreted, {failed} failed")
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.model:
+        # One model for every dream, whatever tier it would be routed to
+        ollama_service.model = args.model
+        ollama_service.router = ModelRouter(args.model, args.model, args.model)
+
+    await ollama_service.startup()
+    output = open(args.output, "a") if args.output else sys.stdout
+    try:
+        await reinterpret(
+            checkpoint=args.checkpoint,
+            chunk_size=args.chunk_size,
+            concurrency=args.concurrency,
+            output=output,
+            user_id=args.user_id,
+            use_cache=args.use_cache,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        await ollama_service.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-interpret stored dreams in bulk")
+    parser.add_argument("--model", help=f"Ollama model to use (default: {settings.OLLAMA_MODEL})")
+    parser.add_argument("--user-id", type=int, help="Only re-interpret this user's dreams")
+    parser.add_argument("--chunk-size", type=int, default=100, help="Dreams per checkpointed chunk")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_INTERPRETATION_CONCURRENCY,
+                        help="Generations in flight")
+    parser.add_argument("--checkpoint", default="reinterpret.checkpoint", help="Checkpoint file path")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Reuse cached interpretations instead of regenerating every dream")
+    parser.add_argument("--output", help="Append NDJSON results to this file (default: stdout)")
+    asyncio.run(main(parser.parse_args()))
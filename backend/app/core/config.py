@@ -49,6 +49,17 @@ class Settings(BaseSettings):
             return v
         return f"postgresql+asyncpg://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}:{values.get('POSTGRES_PORT')}/{values.get('POSTGRES_DB')}"
 
+    # Database connection pool
+    DB_POOL_SIZE: int = 10  # Connections kept open
+    DB_MAX_OVERFLOW: int = 20  # Extra connections allowed under load
+    DB_POOL_TIMEOUT: float = 30.0  # Max seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Reopen connections older than this (seconds)
+    DB_POOL_WARMUP: int = 5  # Connections opened at startup
+    DB_STATEMENT_CACHE_SIZE: int = 500  # asyncpg prepared statements cached per connection
+    DB_DRAIN_TIMEOUT: float = 10.0  # Seconds to wait for in-use connections at shutdown
+    DB_ECHO: bool = False  # Log SQL statements
+    DB_QUERY_COUNT_HEADER: bool = False  # Report statements per request in X-Query-Count
+
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -67,7 +78,120 @@ class Settings(BaseSettings):
     # Ollama Configuration
     OLLAMA_HOST: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "llama2"  # Default model, can be changed
-    OLLAMA_TIMEOUT: int = 120  # Timeout in seconds
+    OLLAMA_TIMEOUT: int = 120  # Read timeout in seconds (generation time)
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0  # TCP connect timeout in seconds
+    OLLAMA_POOL_TIMEOUT: float = 5.0  # Max wait for a free pooled connection
+    OLLAMA_KEEP_ALIVE: str = "30m"  # How long Ollama keeps the model loaded after a request, "-1m" for ever
+    OLLAMA_PRELOAD_MODELS: bool = True  # Load every routed model into Ollama at startup
+
+    # Model routing; unset tiers use OLLAMA_MODEL
+    OLLAMA_FAST_MODEL: Optional[str] = None  # Small model for short dreams
+    OLLAMA_LARGE_MODEL: Optional[str] = None  # Larger model for long dreams and Istikhara
+    OLLAMA_FAST_MAX_CHARS: int = 300  # Dreams up to this length go to the fast model
+    OLLAMA_LARGE_MIN_CHARS: int = 1500  # Dreams from this length go to the large model
+
+    # Generation budgets: tokens generated per endpoint, context window per tier
+    OLLAMA_NUM_PREDICT_DREAM: int = 400  # The dream prompt asks for under 250 words
+    OLLAMA_NUM_PREDICT_STRUCTURED: int = 512  # Same text plus JSON keys and quoting
+    OLLAMA_NUM_PREDICT_ISTIKHARA: int = 500
+    OLLAMA_NUM_CTX_FAST: int = 2048
+    OLLAMA_NUM_CTX_STANDARD: int = 4096
+    OLLAMA_NUM_CTX_LARGE: int = 4096  # Raise for large models trained on longer contexts
+    INTERPRETATION_MAX_DREAM_CHARS: int = 8000  # Longest dream_text accepted by the API
+
+    # Ollama resilience
+    OLLAMA_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before failing fast
+    OLLAMA_CIRCUIT_RECOVERY_TIMEOUT: float = 30.0  # Seconds before a half-open probe
+    OLLAMA_MAX_RETRIES: int = 2  # Retries for connection failures
+    OLLAMA_RETRY_BASE_DELAY: float = 0.2  # Seconds, doubled per attempt with jitter
+    OLLAMA_RETRY_BUDGET_RATIO: float = 0.2  # Retries allowed per request on average
+
+    # Multiple Ollama hosts (load balanced); empty means OLLAMA_HOST only
+    OLLAMA_HOSTS: List[str] = []
+    OLLAMA_HEALTH_CHECK_INTERVAL: float = 15.0  # Seconds between background probes, 0 disables
+    OLLAMA_EJECT_AFTER_FAILURES: int = 3  # Consecutive failures before a node is ejected
+
+    # Ollama HTTP connection pool (shared client, created at startup)
+    OLLAMA_MAX_CONNECTIONS: int = 20  # Max concurrent connections to Ollama
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS: int = 10  # Idle connections kept open
+    OLLAMA_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    OLLAMA_HTTP2: bool = True  # Use HTTP/2 when the h2 package is installed
+    OLLAMA_EMBEDDING_MODEL: str = "nomic-embed-text"  # Local embedding model
+
+    # Ollama admission control
+    OLLAMA_MAX_CONCURRENCY: int = 2  # Generations run at once
+    OLLAMA_MAX_QUEUE: int = 50  # Requests allowed to wait for a slot
+    OLLAMA_QUEUE_TIMEOUT: float = 30.0  # Max seconds a request waits in the queue
+
+    # Background interpretation jobs
+    INTERPRETATION_JOB_WORKERS: int = 2  # asyncio workers consuming the job queue
+    INTERPRETATION_JOB_MAX_WAIT: int = 60  # Max seconds a status poll may long-poll
+    INTERPRETATION_JOB_LEASE: int = 600  # Seconds before another worker may reclaim a running job
+
+    # Batch interpretation
+    BATCH_INTERPRETATION_CONCURRENCY: int = 2  # Generations in flight per batch
+    BATCH_INTERPRETATION_MAX_DREAMS: int = 500  # Max dreams per API request
+    BATCH_INSERT_SIZE: int = 50  # Rows per bulk INSERT
+    BATCH_INTERPRETATION_MAX_WAIT: int = 300  # Max seconds a dream waits out a full queue before failing
+
+    # Interpretation cache (Redis with in-process LRU fallback)
+    INTERPRETATION_CACHE_ENABLED: bool = True
+    INTERPRETATION_CACHE_TTL: int = 7 * 24 * 3600  # Seconds
+    INTERPRETATION_CACHE_MAX_ENTRIES: int = 1000  # In-process LRU size
+    INTERPRETATION_CACHE_SIMILARITY_ENABLED: bool = False  # Requires embedding model
+    INTERPRETATION_CACHE_SIMILARITY_THRESHOLD: float = 0.95  # Cosine similarity
+
+    # Classical symbol dictionary used to ground dream interpretation prompts
+    SYMBOL_DICTIONARY_PATH: Optional[str] = None  # Defaults to app/data/dream_symbols.json
+    SYMBOL_REFERENCES_MAX: int = 8  # Most symbol meanings added to one prompt
+
+    # Dream embedding index (pgvector)
+    EMBEDDING_INDEX_ENABLED: bool = True  # Embed dreams in the background for similar-dream lookups
+    EMBEDDING_DIMENSIONS: int = 768  # Must match OLLAMA_EMBEDDING_MODEL and the dream_embeddings column
+    EMBEDDING_BATCH_SIZE: int = 32  # Dreams embedded per Ollama request
+    EMBEDDING_FLUSH_INTERVAL: float = 2.0  # Seconds between background indexing passes
+    EMBEDDING_EF_SEARCH: int = 64  # HNSW candidates per query; higher improves recall, costs latency
+
+    # Social feed
+    FEED_TIMELINE_MAX: int = 800  # Post IDs kept per precomputed Redis timeline
+    FEED_TIMELINE_TTL: int = 3 * 24 * 3600  # Idle timelines expire and are rebuilt on demand
+    FEED_FANOUT_THRESHOLD: int = 5000  # Authors with more followers are merged in at read time
+    FEED_FANOUT_BATCH_SIZE: int = 500  # Follower timelines updated per Redis script call
+
+    # Trending posts
+    TRENDING_HALF_LIFE_HOURS: float = 12.0  # Engagement loses half its weight after this long
+    TRENDING_MAX_POSTS: int = 1000  # Top posts kept in the trending set
+    TRENDING_REBUILD_DAYS: int = 7  # Window used to seed scores when no trending state exists
+
+    # Write-behind engagement counters
+    COUNTER_FLUSH_INTERVAL: float = 5.0  # Seconds between batched counter UPDATEs
+    COUNTER_RECONCILE_INTERVAL: float = 3600.0  # Seconds between recounts, 0 disables
+    COUNTER_RECONCILE_BATCH_SIZE: int = 1000  # Posts recounted per query
+
+    # Comment threads
+    COMMENT_THREAD_MAX_DEPTH: int = 5  # Reply levels loaded per thread
+    COMMENT_THREAD_MAX_COMMENTS: int = 500  # Comments returned per page, breadth first
+    COMMENT_THREAD_CACHE_TTL: int = 300  # Seconds a cached thread page is kept
+
+    # Dream journal analytics
+    ANALYTICS_TOP_TERMS: int = 10  # Symbols and emotions listed per summary by default
+    ANALYTICS_CACHE_TTL: int = 300  # Seconds a cached summary is kept
+
+    # Journal import/export
+    JOURNAL_IMPORT_BATCH_SIZE: int = 1000  # Dreams per INSERT while importing
+    JOURNAL_IMPORT_MAX_DREAMS: int = 100_000  # Records read per import request
+    JOURNAL_IMPORT_MAX_LINE_LENGTH: int = 1_000_000  # Characters per NDJSON line or CSV row
+    JOURNAL_IMPORT_MAX_ERRORS: int = 100  # Rejected records listed in an import result
+    JOURNAL_EXPORT_BATCH_SIZE: int = 1000  # Dreams fetched per cursor round trip while exporting
+
+    # Response caching of read-heavy routes (policies in app/services/response_cache.py)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_LOCAL_MAX_ENTRIES: int = 1000  # Responses kept in process per worker
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 1024 * 1024  # Larger responses are not cached
+    RESPONSE_CACHE_MAX_TTL: int = 300  # Upper bound for any route's TTL
+    RESPONSE_CACHE_FEED_TTL: int = 30  # Seconds a global feed page is cached
+    RESPONSE_CACHE_TRENDING_TTL: int = 60  # Seconds a trending list is cached
+    RESPONSE_CACHE_HEALTH_TTL: int = 10  # Seconds an Ollama health check is cached
 
     # File Upload
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
@@ -0,0 +1,202 @@
+"""
+Database engine and session management
+
+A single async engine owns the connection pool for the process. The pool
+is sized by the DB_POOL_* settings, connections are recycled before
+PostgreSQL or a proxy drops them, and asyncpg caches prepared statements
+per connection so repeated queries skip parsing and planning. The pool is
+warmed up at startup and drained at shutdown.
+
+count_queries() counts the statements a block of code sends to the
+database, for the X-Query-Count header and the query budget tests
+(tests/test_query_counts.py).
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+
+
+def _engine_options(database_url: str) -> Dict:
+    """
+    Pool and driver options for the configured database
+    """
+    url = make_url(database_url)
+    options = {
+        "pool_pre_ping": True,
+        "echo": settings.DB_ECHO,
+    }
+    if url.get_backend_name() == "sqlite":
+        # SQLite (local development) does not use a server-side pool
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": {"application_name": settings.PROJECT_NAME},
+        }
+    return options
+
+
+# Async engine for the PostgreSQL database
+engine: AsyncEngine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+
+# Session factory; objects stay usable after commit
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+# Pool event counters, reported by get_pool_stats()
+_pool_stats = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidated": 0}
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record) -> None:
+    _pool_stats["connects"] += 1
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    _pool_stats["checkouts"] += 1
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record) -> None:
+    _pool_stats["checkins"] += 1
+
+
+@event.listens_for(engine.sync_engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+    _pool_stats["invalidated"] += 1
+
+
+class QueryCounter:
+    """
+    Statements executed while a count_queries() block is active
+    """
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+# Counters of the current task; a copy of the context is inherited by tasks it starts
+_query_counters: ContextVar[Tuple[QueryCounter, ...]] = ContextVar("query_counters", default=())
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _on_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    for counter in _query_counters.get():
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Count the statements executed by the current task inside the block
+
+    Blocks may be nested; each counter sees every statement executed
+    while it is active.
+    """
+    counter = QueryCounter()
+    token = _query_counters.set(_query_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _query_counters.reset(token)
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency providing a database session per request
+
+    The session is rolled back if the request fails and always returned
+    to the pool when the request ends.
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def init_db() -> bool:
+    """
+    Verify the database is reachable and open DB_POOL_WARMUP connections
+
+    Opening connections up front means the first requests after a deploy
+    do not pay for TCP, TLS and authentication handshakes.
+
+    Returns:
+        True if the database answered, False otherwise
+    """
+    async def ping() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    warmup = max(1, min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE))
+    try:
+        await asyncio.gather(*(ping() for _ in range(warmup)))
+    except Exception as e:
+        logger.warning(f"Database not available: {e}")
+        return False
+    return True
+
+
+async def close_db() -> None:
+    """
+    Wait for checked-out connections to be returned, then close the pool
+
+    Gives in-flight requests up to DB_DRAIN_TIMEOUT seconds to finish
+    before the remaining connections are closed.
+    """
+    deadline = time.monotonic() + settings.DB_DRAIN_TIMEOUT
+    while _checked_out() > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+
+    remaining = _checked_out()
+    if remaining:
+        logger.warning(f"Closing database pool with {remaining} connections still in use")
+    await engine.dispose()
+
+
+def _checked_out() -> int:
+    pool = engine.pool
+    return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+
+def get_pool_stats() -> Dict:
+    """
+    Connection pool utilization and event counters
+    """
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__, **_pool_stats}
+    if hasattr(pool, "checkedout"):
+        stats.update(
+            size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return stats
@@ -0,0 +1,53 @@
+"""
+Redis connection management
+"""
+from typing import Optional
+
+import redis.asyncio as redis
+from loguru import logger
+
+from app.core.config import settings
+
+# Shared client, set by init_redis() at startup
+_redis: Optional[redis.Redis] = None
+
+
+async def init_redis() -> Optional[redis.Redis]:
+    """
+    Connect to Redis and verify the connection
+
+    Returns:
+        The shared client, or None if Redis is not reachable. Callers are
+        expected to fall back to in-process state when Redis is unavailable.
+    """
+    global _redis
+
+    client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        await client.ping()
+    except Exception as e:
+        logger.warning(f"Redis not available at {settings.REDIS_URL}: {e}")
+        await client.aclose()
+        _redis = None
+        return None
+
+    _redis = client
+    return _redis
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Return the shared Redis client, or None if Redis is unavailable
+    """
+    return _redis
+
+
+async def close_redis() -> None:
+    """
+    Close the shared Redis client
+    """
+    global _redis
+
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
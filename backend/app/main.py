@@ -1,13 +1,14 @@
 """
 Dream Interpreter - Main FastAPI Application
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from loguru import logger
 
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.services.response_cache import response_cache
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -35,6 +36,24 @@ if settings.ENVIRONMENT == "production":
         allowed_hosts=settings.ALLOWED_HOSTS
     )
 
+
+# Cache responses of the routes registered in app/services/response_cache.py
+@app.middleware("http")
+async def cache_responses(request: Request, call_next):
+    return await response_cache.handle(request, call_next)
+
+# Report database statements per request, to spot N+1 queries during development
+if settings.DB_QUERY_COUNT_HEADER:
+    from app.core.database import count_queries
+
+    @app.middleware("http")
+    async def query_count_header(request: Request, call_next):
+        # Streamed responses only count statements made before the first chunk
+        with count_queries() as counter:
+            response = await call_next(request)
+        response.headers["X-Query-Count"] = str(counter.count)
+        return response
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -49,21 +68,68 @@ async def startup_event():
     logger.info(f"Debug mode: {settings.DEBUG}")
 
     # Initialize database connection pool
-    # Initialize Redis connection
+    from app.core.database import init_db
+
+    if await init_db():
+        logger.info("✓ Database connection pool ready")
+
+    # Initialize Redis connection (features fall back to in-process state without it)
+    from app.core.redis import init_redis
+
+    if await init_redis() is not None:
+        logger.info("✓ Redis connection established")
+
+    # Seed trending scores if none exist (e.g. after Redis was flushed)
+    from app.core.database import AsyncSessionLocal
+    from app.services.trending_service import trending_service
+
+    try:
+        async with AsyncSessionLocal() as session:
+            seeded = await trending_service.rebuild(session)
+        if seeded:
+            logger.info(f"✓ Seeded trending scores for {seeded} posts")
+    except Exception as e:
+        logger.warning(f"Could not seed trending scores: {e}")
+
+    # Start batched like/comment counter flushing
+    from app.services.engagement_counters import engagement_counters
+
+    await engagement_counters.start()
 
-    # Check Ollama connection
+    # Load the symbol dictionary that grounds dream prompts
+    from app.services.symbol_dictionary import symbol_dictionary
+
+    symbol_dictionary.load()
+
+    # Create shared Ollama HTTP connection pool and check connection
     from app.services.ollama_service import ollama_service
 
+    await ollama_service.startup()
+
     logger.info(f"Checking Ollama service at {settings.OLLAMA_HOST}...")
     ollama_healthy = await ollama_service.check_health()
 
     if ollama_healthy:
         logger.info(f"✓ Ollama service is running (model: {settings.OLLAMA_MODEL})")
+        if settings.OLLAMA_PRELOAD_MODELS:
+            # Load routed models now so the first requests don't pay the load time
+            preloaded = await ollama_service.preload_models()
+            logger.info(f"✓ Preloaded Ollama models: {', '.join(preloaded) or 'none'}")
     else:
         logger.warning(f"⚠ Ollama service is not available at {settings.OLLAMA_HOST}")
         logger.warning("Dream interpretation features will not work until Ollama is running")
         logger.warning("To start Ollama: ollama serve")
 
+    # Start background interpretation workers
+    from app.services.interpretation_jobs import interpretation_jobs
+
+    await interpretation_jobs.start()
+
+    # Start background embedding of new and edited dreams
+    from app.services.dream_embeddings import dream_index
+
+    await dream_index.start()
+
     logger.info("Application startup complete")
 
 
@@ -73,8 +139,22 @@ async def shutdown_event():
     Application shutdown event handler
     """
     logger.info("Shutting down application")
-    # Close database connections
-    # Close Redis connections
+
+    from app.core.database import close_db
+    from app.core.redis import close_redis
+    from app.services.dream_embeddings import dream_index
+    from app.services.engagement_counters import engagement_counters
+    from app.services.interpretation_jobs import interpretation_jobs
+    from app.services.ollama_service import ollama_service
+
+    await interpretation_jobs.stop()
+    await dream_index.stop()
+    # Flush buffered counters while the database and Redis are still open
+    await engagement_counters.stop()
+    await ollama_service.shutdown()
+    # Close database connections once in-flight requests have finished
+    await close_db()
+    await close_redis()
     logger.info("All connections closed")
 
 
@@ -96,7 +176,15 @@ async def health_check():
     """
     Health check endpoint for monitoring
     """
+    from app.core.database import get_pool_stats
+    from app.services.dream_embeddings import dream_index
+    from app.services.engagement_counters import engagement_counters
+
     return {
         "status": "healthy",
-        "environment": settings.ENVIRONMENT
+        "environment": settings.ENVIRONMENT,
+        "database_pool": get_pool_stats(),
+        "engagement_counters": engagement_counters.get_stats(),
+        "embedding_index": dream_index.get_stats(),
+        "response_cache": response_cache.get_stats()
     }
@@ -4,8 +4,10 @@ Database models package
 from app.models.base import Base, BaseModel
 from app.models.user import User, UserRole
 from app.models.dream import Dream, DreamType, DreamPrivacy
+from app.models.embedding import DreamEmbedding
 from app.models.interpretation import Interpretation, InterpretationType, InterpretationStatus
-from app.models.social import SocialPost, Comment, Like
+from app.models.social import SocialPost, Comment, Like, Follow
+from app.models.analytics import DreamTermCount, SleepPeriodStats
 
 __all__ = [
     "Base",
@@ -15,10 +17,14 @@ __all__ = [
     "Dream",
     "DreamType",
     "DreamPrivacy",
+    "DreamEmbedding",
     "Interpretation",
     "InterpretationType",
     "InterpretationStatus",
     "SocialPost",
     "Comment",
     "Like",
+    "Follow",
+    "DreamTermCount",
+    "SleepPeriodStats",
 ]
@@ -0,0 +1,45 @@
+"""
+Dream journal analytics aggregates, maintained by database triggers
+"""
+from sqlalchemy import Boolean, Column, Date, Float, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+
+class DreamTermCount(Base):
+    """
+    Dreams of a user in one month per symbol, emotion or dream type
+
+    Written only by the triggers in db/schemas/008_dream_analytics.sql.
+    """
+    __tablename__ = "dream_term_counts"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period = Column(Date, primary_key=True)  # First day of the month
+    kind = Column(String(10), primary_key=True)  # symbol, emotion or type
+    term = Column(String(200), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DreamTermCount {self.kind} {self.term}={self.count} for User {self.user_id}>"
+
+
+class SleepPeriodStats(Base):
+    """
+    Sleep totals of a user in one month, for nights with and without a dream
+
+    Written only by the triggers in db/schemas/008_dream_analytics.sql.
+    """
+    __tablename__ = "sleep_period_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period = Column(Date, primary_key=True)  # First day of the month
+    had_dream = Column(Boolean, primary_key=True)
+    nights = Column(Integer, nullable=False, default=0)
+    quality_sum = Column(Integer, nullable=False, default=0)
+    rated_nights = Column(Integer, nullable=False, default=0)  # Nights with a quality rating
+    hours_sum = Column(Float, nullable=False, default=0)
+    timed_nights = Column(Integer, nullable=False, default=0)  # Nights with a duration
+
+    def __repr__(self):
+        return f"<SleepPeriodStats {self.period} had_dream={self.had_dream} for User {self.user_id}>"
@@ -8,6 +8,11 @@ from sqlalchemy.ext.declarative import declarative_base
 Base = declarative_base()
 
 
+def enum_values(enum_class):
+    """Store enum values ("public"), matching the database enum types"""
+    return [member.value for member in enum_class]
+
+
 class TimestampMixin:
     """
     Mixin that adds created_at and updated_at timestamps
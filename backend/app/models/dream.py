@@ -5,7 +5,7 @@ from sqlalchemy import Column, String, Text, Integer, ForeignKey, Boolean, JSON,
 from sqlalchemy.orm import relationship
 import enum
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, enum_values
 
 
 class DreamType(str, enum.Enum):
@@ -35,7 +35,7 @@ class Dream(BaseModel):
     # Dream Content
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=False)
-    dream_type = Column(SQLEnum(DreamType), default=DreamType.REGULAR)
+    dream_type = Column(SQLEnum(DreamType, name="dream_type", values_callable=enum_values), default=DreamType.REGULAR)
 
     # Dream Context
     emotions = Column(JSON, nullable=True)  # List of emotions felt
@@ -48,7 +48,7 @@ class Dream(BaseModel):
     time_of_day = Column(String(20), nullable=True)  # Morning, night, etc.
 
     # Privacy & Sharing
-    privacy = Column(SQLEnum(DreamPrivacy), default=DreamPrivacy.PRIVATE)
+    privacy = Column(SQLEnum(DreamPrivacy, name="dream_privacy", values_callable=enum_values), default=DreamPrivacy.PRIVATE)
     is_shared = Column(Boolean, default=False)
 
     # Istikhara specific
@@ -58,10 +58,10 @@ class Dream(BaseModel):
     tags = Column(JSON, nullable=True)  # User-defined tags
     audio_url = Column(String(500), nullable=True)  # Voice recording of dream
 
-    # Relationships
-    user = relationship("User", back_populates="dreams")
-    interpretations = relationship("Interpretation", back_populates="dream", cascade="all, delete-orphan")
-    social_post = relationship("SocialPost", back_populates="dream", uselist=False)
+    # Relationships; never lazy loaded, see app.repositories.profiles
+    user = relationship("User", back_populates="dreams", lazy="raise_on_sql")
+    interpretations = relationship("Interpretation", back_populates="dream", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
+    social_post = relationship("SocialPost", back_populates="dream", uselist=False, lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Dream {self.title} by User {self.user_id}>"
@@ -0,0 +1,50 @@
+"""
+Dream embedding model for similar-dream lookups
+"""
+from sqlalchemy import Column, ForeignKey, Integer, String, cast
+from sqlalchemy.dialects.postgresql import ARRAY, REAL
+from sqlalchemy.orm import relationship
+from sqlalchemy.types import UserDefinedType
+
+from app.core.config import settings
+from app.models.base import Base, TimestampMixin
+
+
+class Vector(UserDefinedType):
+    """
+    pgvector column type, exchanged with the driver as a float4 array
+
+    Values are plain lists of floats; the casts let asyncpg send and
+    receive them as binary real[] without a pgvector client library.
+    """
+    cache_ok = True
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    def get_col_spec(self, **kw):
+        return f"VECTOR({self.dimensions})"
+
+    def bind_expression(self, bindvalue):
+        return cast(cast(bindvalue, ARRAY(REAL)), self)
+
+    def column_expression(self, column):
+        return cast(column, ARRAY(REAL))
+
+
+class DreamEmbedding(Base, TimestampMixin):
+    """
+    Embedding of a dream's description and symbols
+    """
+    __tablename__ = "dream_embeddings"
+
+    dream_id = Column(Integer, ForeignKey("dreams.id", ondelete="CASCADE"), primary_key=True)
+    model = Column(String(100), nullable=False)  # Embedding model that produced the vector
+    content_hash = Column(String(64), nullable=False)  # Hash of the embedded text, skips unchanged dreams
+    embedding = Column(Vector(settings.EMBEDDING_DIMENSIONS), nullable=False)
+
+    # Relationships; never lazy loaded, see app.repositories.profiles
+    dream = relationship("Dream", lazy="raise_on_sql")
+
+    def __repr__(self):
+        return f"<DreamEmbedding for Dream {self.dream_id}>"
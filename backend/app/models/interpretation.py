@@ -5,7 +5,7 @@ from sqlalchemy import Column, String, Text, Integer, ForeignKey, Float, Enum as
 from sqlalchemy.orm import relationship
 import enum
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, enum_values
 
 
 class InterpretationType(str, enum.Enum):
@@ -34,16 +34,17 @@ class Interpretation(BaseModel):
     dream_id = Column(Integer, ForeignKey("dreams.id", ondelete="CASCADE"), nullable=False)
 
     # Interpretation Details
-    interpretation_type = Column(SQLEnum(InterpretationType), nullable=False)
+    interpretation_type = Column(SQLEnum(InterpretationType, name="interpretation_type", values_callable=enum_values), nullable=False)
     interpretation_text = Column(Text, nullable=False)
 
     # AI specific
     model_name = Column(String(100), nullable=True)  # Which LLM model was used
     confidence_score = Column(Float, nullable=True)  # AI confidence score
+    prompt_version = Column(String(50), nullable=True)  # Prompt template that produced it, e.g. dream@v1
 
     # Imam specific
     imam_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # If from an Imam
-    status = Column(SQLEnum(InterpretationStatus), default=InterpretationStatus.COMPLETED)
+    status = Column(SQLEnum(InterpretationStatus, name="interpretation_status", values_callable=enum_values), default=InterpretationStatus.COMPLETED)
 
     # Metadata
     key_symbols = Column(Text, nullable=True)  # Main symbols identified
@@ -55,10 +56,10 @@ class Interpretation(BaseModel):
     rating = Column(Integer, nullable=True)  # User rating 1-5
     feedback = Column(Text, nullable=True)  # User feedback on interpretation
 
-    # Relationships
-    user = relationship("User", back_populates="interpretations", foreign_keys=[user_id])
-    dream = relationship("Dream", back_populates="interpretations")
-    imam = relationship("User", foreign_keys=[imam_id])
+    # Relationships; never lazy loaded, see app.repositories.profiles
+    user = relationship("User", back_populates="interpretations", foreign_keys=[user_id], lazy="raise_on_sql")
+    dream = relationship("Dream", back_populates="interpretations", lazy="raise_on_sql")
+    imam = relationship("User", foreign_keys=[imam_id], lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Interpretation {self.interpretation_type} for Dream {self.dream_id}>"
@@ -2,7 +2,7 @@
 Social features models - Posts, Comments, Likes
 """
 from sqlalchemy import Column, String, Text, Integer, ForeignKey, Boolean, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 
 from app.models.base import BaseModel
 
@@ -29,11 +29,11 @@ class SocialPost(BaseModel):
     is_flagged = Column(Boolean, default=False)
     is_hidden = Column(Boolean, default=False)
 
-    # Relationships
-    user = relationship("User", back_populates="posts")
-    dream = relationship("Dream", back_populates="social_post")
-    comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
-    likes = relationship("Like", back_populates="post", cascade="all, delete-orphan")
+    # Relationships; never lazy loaded, see app.repositories.profiles
+    user = relationship("User", back_populates="posts", lazy="raise_on_sql")
+    dream = relationship("Dream", back_populates="social_post", lazy="raise_on_sql")
+    comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
+    likes = relationship("Like", back_populates="post", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<SocialPost {self.id} by User {self.user_id}>"
@@ -59,10 +59,10 @@ class Comment(BaseModel):
     is_flagged = Column(Boolean, default=False)
     is_hidden = Column(Boolean, default=False)
 
-    # Relationships
-    user = relationship("User", back_populates="comments")
-    post = relationship("SocialPost", back_populates="comments")
-    parent = relationship("Comment", remote_side="Comment.id", backref="replies")
+    # Relationships; never lazy loaded, see app.repositories.profiles
+    user = relationship("User", back_populates="comments", lazy="raise_on_sql")
+    post = relationship("SocialPost", back_populates="comments", lazy="raise_on_sql")
+    parent = relationship("Comment", remote_side="Comment.id", backref=backref("replies", lazy="raise_on_sql"), lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Comment {self.id} on Post {self.post_id}>"
@@ -81,9 +81,29 @@ class Like(BaseModel):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     post_id = Column(Integer, ForeignKey("social_posts.id", ondelete="CASCADE"), nullable=False)
 
-    # Relationships
-    user = relationship("User", back_populates="likes")
-    post = relationship("SocialPost", back_populates="likes")
+    # Relationships; never lazy loaded, see app.repositories.profiles
+    user = relationship("User", back_populates="likes", lazy="raise_on_sql")
+    post = relationship("SocialPost", back_populates="likes", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Like by User {self.user_id} on Post {self.post_id}>"
+
+
+class Follow(BaseModel):
+    """
+    Follow relationship between users, drives the following feed
+    """
+    __tablename__ = "follows"
+    __table_args__ = (
+        UniqueConstraint('follower_id', 'followee_id', name='unique_follower_followee'),
+    )
+
+    follower_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    followee_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Relationships; never lazy loaded, see app.repositories.profiles
+    follower = relationship("User", foreign_keys=[follower_id], lazy="raise_on_sql")
+    followee = relationship("User", foreign_keys=[followee_id], lazy="raise_on_sql")
+
+    def __repr__(self):
+        return f"<Follow {self.follower_id} -> {self.followee_id}>"
@@ -1,11 +1,11 @@
 """
 User model for authentication and profile management
 """
-from sqlalchemy import Column, String, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, Integer, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 import enum
 
-from app.models.base import BaseModel
+from app.models.base import BaseModel, enum_values
 
 
 class UserRole(str, enum.Enum):
@@ -27,7 +27,7 @@ class User(BaseModel):
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
-    role = Column(SQLEnum(UserRole), default=UserRole.USER)
+    role = Column(SQLEnum(UserRole, name="user_role", values_callable=enum_values), default=UserRole.USER)
 
     # Profile
     full_name = Column(String(200), nullable=True)
@@ -38,12 +38,15 @@ class User(BaseModel):
     profile_visibility = Column(Boolean, default=True)
     allow_friend_requests = Column(Boolean, default=True)
 
-    # Relationships
-    dreams = relationship("Dream", back_populates="user", cascade="all, delete-orphan")
-    interpretations = relationship("Interpretation", back_populates="user", cascade="all, delete-orphan")
-    posts = relationship("SocialPost", back_populates="user", cascade="all, delete-orphan")
-    comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan")
-    likes = relationship("Like", back_populates="user", cascade="all, delete-orphan")
+    # Social Counters (denormalized, maintained by database trigger)
+    followers_count = Column(Integer, default=0)
+
+    # Relationships; never lazy loaded, see app.repositories.profiles
+    dreams = relationship("Dream", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
+    interpretations = relationship("Interpretation", back_populates="user", foreign_keys="Interpretation.user_id", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
+    posts = relationship("SocialPost", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
+    comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
+    likes = relationship("Like", back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<User {self.username}>"
@@ -0,0 +1,20 @@
+"""
+Query layer: loader profiles, repositories and read models
+"""
+from app.repositories import profiles
+from app.repositories.read_models import AuthorCard, DreamCard, DreamSummary, PostCard, ReadModel
+from app.repositories.repository import Repository, dreams, interpretations, posts, users
+
+__all__ = [
+    "profiles",
+    "ReadModel",
+    "AuthorCard",
+    "DreamCard",
+    "DreamSummary",
+    "PostCard",
+    "Repository",
+    "dreams",
+    "interpretations",
+    "posts",
+    "users",
+]
@@ -0,0 +1,35 @@
+"""
+Loader Profiles - Named eager-loading strategies per use case
+
+Relationships are declared lazy="raise_on_sql": touching one that was not
+loaded raises instead of issuing a query per object (which under asyncio
+fails anyway, outside a greenlet). Code that needs related objects picks
+the profile for its use case and passes it to a query or repository.
+
+Many-to-one relationships are joined into the same query (joinedload);
+collections are loaded with one extra IN query for all parents together
+(selectinload), so neither grows with the number of rows.
+"""
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.dream import Dream
+from app.models.interpretation import Interpretation
+from app.models.social import SocialPost
+
+# A post as shown in feeds and returned after sharing: author and dream
+POST_CARD = (
+    joinedload(SocialPost.user),
+    joinedload(SocialPost.dream),
+)
+
+# A dream page: author, share post and every interpretation
+DREAM_DETAIL = (
+    joinedload(Dream.user),
+    joinedload(Dream.social_post),
+    selectinload(Dream.interpretations),
+)
+
+# An interpretation job with the dream it interprets
+INTERPRETATION_WITH_DREAM = (
+    joinedload(Interpretation.dream),
+)
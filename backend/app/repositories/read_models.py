@@ -0,0 +1,124 @@
+"""
+Read Models - Lightweight rows for list endpoints
+
+List endpoints serialize dozens of rows that are never modified, so they
+select just the columns a response needs into slotted objects instead of
+ORM instances: no identity map bookkeeping, no change tracking, no
+unloaded relationships to trip over, and a fraction of the memory.
+
+Each read model mirrors some columns of a mapped class. `columns()`
+labels them for a select, optionally with a prefix so several models can
+share one joined row, and `from_row()` builds the object back from that
+row. Pydantic schemas read them with from_attributes like ORM objects.
+"""
+from typing import Any, ClassVar, List, Tuple
+
+from sqlalchemy import select
+
+from app.models.dream import Dream
+from app.models.social import SocialPost
+from app.models.user import User
+
+
+class ReadModel:
+    """
+    Base for slotted read models built from selected columns
+    """
+    __slots__ = ()
+
+    # Mapped class and the column attributes copied from it
+    model: ClassVar[Any] = None
+    fields: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def columns(cls, prefix: str = "") -> List:
+        """
+        Labelled columns to select for this model
+        """
+        return [getattr(cls.model, name).label(prefix + name) for name in cls.fields]
+
+    @classmethod
+    def from_row(cls, row, prefix: str = ""):
+        """
+        Build an instance from a row selected with columns(prefix)
+        """
+        mapping = row._mapping
+        obj = cls.__new__(cls)
+        for name in cls.fields:
+            setattr(obj, name, mapping[prefix + name])
+        return obj
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {getattr(self, 'id', '?')}>"
+
+
+class AuthorCard(ReadModel):
+    """
+    A post's author (PostAuthor)
+    """
+    model = User
+    fields = ("id", "username", "full_name", "avatar_url")
+    __slots__ = fields
+
+
+class DreamCard(ReadModel):
+    """
+    The dream shown with a post (PostDream)
+    """
+    model = Dream
+    fields = ("id", "title", "description", "dream_type")
+    __slots__ = fields
+
+
+class DreamSummary(ReadModel):
+    """
+    A dream in search and similarity results (DreamResponse)
+    """
+    model = Dream
+    fields = (
+        "id", "user_id", "title", "description", "dream_type", "emotions",
+        "symbols", "dream_date", "time_of_day", "privacy", "created_at",
+    )
+    __slots__ = fields
+
+
+class PostCard(ReadModel):
+    """
+    A feed post with its author and dream (PostResponse)
+
+    The counters can be overwritten for display, see
+    EngagementCounterService.overlay.
+    """
+    model = SocialPost
+    fields = (
+        "id", "user_id", "dream_id", "caption", "interpretation_included",
+        "likes_count", "comments_count", "created_at",
+    )
+    __slots__ = fields + ("user", "dream")
+
+    @classmethod
+    def columns(cls, prefix: str = "") -> List:
+        return (
+            super().columns(prefix)
+            + AuthorCard.columns(f"{prefix}user__")
+            + DreamCard.columns(f"{prefix}dream__")
+        )
+
+    @classmethod
+    def query(cls):
+        """
+        Select of post cards, joining each post's author and dream
+        """
+        return (
+            select(*cls.columns())
+            .select_from(SocialPost)
+            .join(User, User.id == SocialPost.user_id)
+            .join(Dream, Dream.id == SocialPost.dream_id)
+        )
+
+    @classmethod
+    def from_row(cls, row, prefix: str = ""):
+        post = super().from_row(row, prefix)
+        post.user = AuthorCard.from_row(row, f"{prefix}user__")
+        post.dream = DreamCard.from_row(row, f"{prefix}dream__")
+        return post
@@ -0,0 +1,73 @@
+"""
+Repository - Loading ORM objects with an explicit loader profile
+
+Endpoints and services that modify objects, or need their relationships,
+load them here with the profile for their use case (see profiles), so
+what a code path loads is stated where it loads it. Read-only lists use
+read_models instead.
+"""
+from typing import Dict, Generic, Iterable, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.dream import Dream
+from app.models.interpretation import Interpretation
+from app.models.social import SocialPost
+from app.models.user import User
+
+M = TypeVar("M")
+
+
+class Repository(Generic[M]):
+    """
+    Primary key access to one mapped class
+    """
+
+    def __init__(self, model: Type[M]):
+        self.model = model
+
+    async def get(self, session: AsyncSession, object_id: int, profile: Sequence = ()) -> Optional[M]:
+        """
+        Load one object by primary key
+
+        An object already in the session is returned without a query, and
+        with relationships the profile would load only if they were loaded
+        before.
+
+        Args:
+            session: Database session
+            object_id: Primary key
+            profile: Loader options, e.g. profiles.POST_CARD
+
+        Returns:
+            The object, or None if it does not exist
+        """
+        return await session.get(self.model, object_id, options=list(profile))
+
+    async def get_many(
+        self,
+        session: AsyncSession,
+        object_ids: Iterable[int],
+        profile: Sequence = ()
+    ) -> Dict[int, M]:
+        """
+        Load objects by primary key in one query
+
+        Returns:
+            Objects by primary key; missing keys are left out
+        """
+        object_ids = list(object_ids)
+        if not object_ids:
+            return {}
+        result = await session.execute(
+            select(self.model).options(*profile).where(self.model.id.in_(object_ids))
+        )
+        return {obj.id: obj for obj in result.unique().scalars().all()}
+
+
+# Repositories per model
+dreams = Repository(Dream)
+interpretations = Repository(Interpretation)
+posts = Repository(SocialPost)
+users = Repository(User)
@@ -5,13 +5,72 @@ from app.schemas.interpretation import (
     InterpretationRequest,
     InterpretationResponse,
     IstikharaInterpretationRequest,
+    InterpretationJobRequest,
+    InterpretationJobResponse,
+    BatchInterpretationRequest,
+    InterpretationSections,
+    KeySymbol,
+    TokenUsage,
+)
+from app.schemas.dream import (
+    DreamCreate,
+    DreamResponse,
+    DreamSearchResult,
+    DreamSearchResponse,
+    SimilarDream,
+    SimilarDreamsResponse,
+    TermCount,
+    NightStats,
+    SleepSummary,
+    DreamAnalyticsResponse,
+    ImportRejection,
+    DreamImportResponse,
+)
+from app.schemas.social import (
+    ShareDreamRequest,
+    PostResponse,
+    FeedResponse,
+    FollowResponse,
+    TrendingPost,
+    TrendingResponse,
+    LikeResponse,
+    CommentCreate,
+    CommentResponse,
+    ThreadComment,
+    CommentThreadResponse,
 )
-from app.schemas.dream import DreamCreate, DreamResponse
 
 __all__ = [
     "InterpretationRequest",
     "InterpretationResponse",
     "IstikharaInterpretationRequest",
+    "InterpretationJobRequest",
+    "InterpretationJobResponse",
+    "BatchInterpretationRequest",
+    "InterpretationSections",
+    "KeySymbol",
+    "TokenUsage",
     "DreamCreate",
     "DreamResponse",
+    "DreamSearchResult",
+    "DreamSearchResponse",
+    "SimilarDream",
+    "SimilarDreamsResponse",
+    "TermCount",
+    "NightStats",
+    "SleepSummary",
+    "DreamAnalyticsResponse",
+    "ImportRejection",
+    "DreamImportResponse",
+    "ShareDreamRequest",
+    "PostResponse",
+    "FeedResponse",
+    "FollowResponse",
+    "TrendingPost",
+    "TrendingResponse",
+    "LikeResponse",
+    "CommentCreate",
+    "CommentResponse",
+    "ThreadComment",
+    "CommentThreadResponse",
 ]
@@ -1,7 +1,7 @@
 """
 Pydantic schemas for dreams
 """
-from typing import Optional, List
+from typing import Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -54,3 +54,88 @@ class DreamResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class DreamSearchResult(DreamResponse):
+    """
+    Schema for a dream search result
+    """
+    rank: float = Field(..., description="Relevance; higher is better")
+
+
+class DreamSearchResponse(BaseModel):
+    """
+    One page of dream search results
+    """
+    items: List[DreamSearchResult] = Field(..., description="Dreams, most relevant first")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next page; null on the last page")
+
+
+class SimilarDream(DreamResponse):
+    """
+    Schema for a dream similar to another dream
+    """
+    similarity: float = Field(..., description="Cosine similarity of the dreams' embeddings, up to 1")
+
+
+class SimilarDreamsResponse(BaseModel):
+    """
+    Dreams similar to a given dream
+    """
+    items: List[SimilarDream] = Field(..., description="Dreams, most similar first")
+
+
+class TermCount(BaseModel):
+    """
+    How many dreams mention a symbol or emotion
+    """
+    term: str
+    count: int
+
+
+class NightStats(BaseModel):
+    """
+    Sleep logged on a set of nights
+    """
+    nights: int = Field(..., description="Nights logged")
+    avg_quality: Optional[float] = Field(None, description="Average quality rating (1-5) of rated nights")
+    avg_hours: Optional[float] = Field(None, description="Average sleep duration of nights with a duration")
+
+
+class SleepSummary(BaseModel):
+    """
+    Sleep on nights with and without a dream
+    """
+    dream_nights: NightStats
+    dreamless_nights: NightStats
+
+
+class DreamAnalyticsResponse(BaseModel):
+    """
+    A user's dream journal summary for one month or all time
+    """
+    user_id: int
+    period: str = Field(..., description="\"YYYY-MM\" or \"all\"")
+    dream_count: int = Field(..., description="Dreams recorded in the period")
+    dream_types: Dict[str, int] = Field(..., description="Dreams per dream type")
+    top_symbols: List[TermCount] = Field(..., description="Most frequent symbols, most frequent first")
+    top_emotions: List[TermCount] = Field(..., description="Most frequent emotions, most frequent first")
+    sleep: SleepSummary
+
+
+class ImportRejection(BaseModel):
+    """
+    A record an import skipped
+    """
+    line: Optional[int] = Field(None, description="Line the record starts on; null if the body could not be read")
+    error: str
+
+
+class DreamImportResponse(BaseModel):
+    """
+    Result of a journal import
+    """
+    imported: int = Field(..., description="Dreams added to the journal")
+    failed: int = Field(..., description="Records rejected as invalid")
+    errors: List[ImportRejection] = Field(..., description="The first rejected records and why")
+    complete: bool = Field(..., description="False if the import stopped before the end of the body")
@@ -1,18 +1,67 @@
 """
 Pydantic schemas for dream interpretation
 """
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Literal
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+
+
+# Sections of a structured interpretation
+SectionName = Literal[
+    "interpretation", "key_symbols", "spiritual_guidance", "quranic_references", "hadith_references"
+]
+
+
+class KeySymbol(BaseModel):
+    """
+    A dream symbol and its meaning
+    """
+    symbol: str = Field(..., description="The symbol as seen in the dream")
+    meaning: str = Field("", description="Its meaning in this dream")
+
+
+class InterpretationSections(BaseModel):
+    """
+    A structured interpretation, split into the sections stored per column
+    """
+    interpretation: Optional[str] = Field(None, description="Overall meaning of the dream")
+    key_symbols: Optional[List[KeySymbol]] = Field(None, description="Main symbols and their meanings")
+    spiritual_guidance: Optional[str] = Field(None, description="Spiritual advice")
+    quranic_references: Optional[List[str]] = Field(None, description="Relevant Quran verses")
+    hadith_references: Optional[List[str]] = Field(None, description="Relevant Hadith")
+
+
+class TokenUsage(BaseModel):
+    """
+    Tokens and time spent on one generation, as reported by Ollama
+    """
+    prompt_tokens: int = Field(..., description="Prompt tokens evaluated (0 if reused from the prompt cache)")
+    completion_tokens: int = Field(..., description="Tokens generated")
+    total_duration_ms: Optional[float] = Field(None, description="Total time spent by Ollama")
+    load_duration_ms: Optional[float] = Field(None, description="Time spent loading the model")
+    prompt_eval_duration_ms: Optional[float] = Field(None, description="Time spent evaluating the prompt")
+    eval_duration_ms: Optional[float] = Field(None, description="Time spent generating")
+    stopped_at_limit: bool = Field(False, description="Whether generation stopped at the token budget")
+
 
 class InterpretationRequest(BaseModel):
     """
     Request schema for dream interpretation
     """
-    dream_text: str = Field(..., min_length=10, description="The dream description to interpret")
+    dream_text: str = Field(
+        ...,
+        min_length=10,
+        max_length=settings.INTERPRETATION_MAX_DREAM_CHARS,
+        description="The dream description to interpret"
+    )
     emotions: Optional[List[str]] = Field(None, description="Emotions felt during the dream")
     symbols: Optional[List[str]] = Field(None, description="Key symbols in the dream")
     time_of_day: Optional[str] = Field(None, description="When the dream occurred (morning, night, etc.)")
+    structured: bool = Field(False, description="Return the interpretation split into sections")
+    sections: Optional[List[SectionName]] = Field(
+        None, description="Only return these sections (implies structured)"
+    )
 
     class Config:
         json_schema_extra = {
@@ -20,7 +69,8 @@ class InterpretationRequest(BaseModel):
                 "dream_text": "I saw myself flying over green fields with a bright light guiding me",
                 "emotions": ["peaceful", "hopeful"],
                 "symbols": ["flying", "green fields", "light"],
-                "time_of_day": "before_fajr"
+                "time_of_day": "before_fajr",
+                "structured": False
             }
         }
 
@@ -29,8 +79,15 @@ class IstikharaInterpretationRequest(BaseModel):
     """
     Request schema for Istikhara dream interpretation
     """
-    dream_text: str = Field(..., min_length=10, description="The dream description after Istikhara")
-    decision_context: str = Field(..., min_length=5, description="What decision the Istikhara was about")
+    dream_text: str = Field(
+        ...,
+        min_length=10,
+        max_length=settings.INTERPRETATION_MAX_DREAM_CHARS,
+        description="The dream description after Istikhara"
+    )
+    decision_context: str = Field(
+        ..., min_length=5, max_length=500, description="What decision the Istikhara was about"
+    )
 
     class Config:
         json_schema_extra = {
@@ -49,7 +106,12 @@ class InterpretationResponse(BaseModel):
     interpretation: Optional[str] = Field(None, description="The interpretation text")
     model: Optional[str] = Field(None, description="The LLM model used")
     confidence: Optional[float] = Field(None, description="Confidence score (0-1)")
+    prompt_version: Optional[str] = Field(None, description="Prompt template version used")
     interpretation_type: Optional[str] = Field(None, description="Type of interpretation (regular or istikhara)")
+    cached: Optional[bool] = Field(None, description="Whether the interpretation was served from cache")
+    sections: Optional[InterpretationSections] = Field(None, description="Interpretation sections (structured mode)")
+    usage: Optional[TokenUsage] = Field(None, description="Token usage of the generation (absent when cached)")
+    input_truncated: Optional[bool] = Field(None, description="Whether the dream was shortened to fit the model")
     error: Optional[str] = Field(None, description="Error message if interpretation failed")
 
     class Config:
@@ -59,6 +121,69 @@ class InterpretationResponse(BaseModel):
                 "interpretation": "This dream shows positive signs...",
                 "model": "llama2",
                 "confidence": 0.8,
+                "prompt_version": "dream@v2",
                 "interpretation_type": "regular"
             }
         }
+
+
+class InterpretationJobRequest(BaseModel):
+    """
+    Request schema for submitting a background interpretation job
+    """
+    dream_id: int = Field(..., description="ID of the stored dream to interpret")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "dream_id": 42
+            }
+        }
+
+
+class InterpretationJobResponse(BaseModel):
+    """
+    Response schema describing a background interpretation job
+    """
+    job_id: int = Field(..., description="Job ID (the interpretation ID)")
+    dream_id: int = Field(..., description="ID of the dream being interpreted")
+    status: str = Field(..., description="pending, in_progress, completed or declined")
+    interpretation: Optional[str] = Field(None, description="The interpretation text once completed")
+    model: Optional[str] = Field(None, description="The LLM model used")
+    confidence: Optional[float] = Field(None, description="Confidence score (0-1)")
+    prompt_version: Optional[str] = Field(None, description="Prompt template version used")
+    sections: Optional[InterpretationSections] = Field(None, description="Interpretation sections once completed")
+    error: Optional[str] = Field(None, description="Error message if the job was declined")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": 7,
+                "dream_id": 42,
+                "status": "completed",
+                "interpretation": "This dream shows positive signs...",
+                "model": "llama2",
+                "confidence": 0.8
+            }
+        }
+
+
+class BatchInterpretationRequest(BaseModel):
+    """
+    Request schema for interpreting many stored dreams at once
+    """
+    dream_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_INTERPRETATION_MAX_DREAMS,
+        description="IDs of the stored dreams to interpret"
+    )
+    persist: bool = Field(True, description="Save results to the interpretations table")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "dream_ids": [1, 2, 3],
+                "persist": True
+            }
+        }
@@ -0,0 +1,157 @@
+"""
+Pydantic schemas for social features
+"""
+from typing import Optional, List
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ShareDreamRequest(BaseModel):
+    """
+    Request schema for sharing a dream to the social feed
+    """
+    caption: Optional[str] = Field(None, max_length=2000, description="Caption shown with the dream")
+    include_interpretation: bool = Field(False, description="Share the dream's interpretation as well")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "caption": "Has anyone seen a similar dream?",
+                "include_interpretation": True
+            }
+        }
+
+
+class PostAuthor(BaseModel):
+    """
+    Author summary embedded in feed posts
+    """
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PostDream(BaseModel):
+    """
+    Dream summary embedded in feed posts
+    """
+    id: int
+    title: str
+    description: str
+    dream_type: str
+
+    class Config:
+        from_attributes = True
+
+
+class PostResponse(BaseModel):
+    """
+    Schema for a social post in a feed
+    """
+    id: int
+    user_id: int
+    dream_id: int
+    caption: Optional[str] = None
+    interpretation_included: bool = False
+    likes_count: int = 0
+    comments_count: int = 0
+    created_at: datetime
+    user: Optional[PostAuthor] = None
+    dream: Optional[PostDream] = None
+
+    class Config:
+        from_attributes = True
+
+
+class FeedResponse(BaseModel):
+    """
+    One page of a feed
+    """
+    items: List[PostResponse] = Field(..., description="Posts, newest first")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next page; null on the last page")
+
+
+class TrendingPost(PostResponse):
+    """
+    Schema for a trending post
+    """
+    trending_score: float = Field(..., description="Current time-decayed engagement score")
+
+
+class TrendingResponse(BaseModel):
+    """
+    Top trending posts
+    """
+    items: List[TrendingPost] = Field(..., description="Posts, highest score first")
+
+
+class LikeResponse(BaseModel):
+    """
+    Result of liking or unliking a post
+    """
+    post_id: int
+    liked: bool = Field(..., description="Whether the user now likes the post")
+    likes_count: int = Field(..., description="Total likes on the post")
+
+
+class CommentCreate(BaseModel):
+    """
+    Request schema for commenting on a post
+    """
+    text: str = Field(..., min_length=1, max_length=5000)
+    parent_comment_id: Optional[int] = Field(None, description="Comment being replied to")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "text": "I saw something similar last Ramadan",
+                "parent_comment_id": None
+            }
+        }
+
+
+class CommentResponse(BaseModel):
+    """
+    Schema for a comment
+    """
+    id: int
+    post_id: int
+    user_id: int
+    text: str
+    parent_comment_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ThreadComment(CommentResponse):
+    """
+    Schema for a comment in a thread, with its replies nested
+    """
+    depth: int = Field(..., description="1 for top-level comments")
+    reply_count: int = Field(0, description="Direct replies; more than len(replies) when the thread was cut")
+    user: Optional[PostAuthor] = None
+    replies: List["ThreadComment"] = Field(default_factory=list, description="Replies, oldest first")
+
+
+class CommentThreadResponse(BaseModel):
+    """
+    One page of a post's comment thread
+    """
+    post_id: int
+    items: List[ThreadComment] = Field(..., description="Top-level comments, oldest first")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next page; null on the last page")
+
+
+class FollowResponse(BaseModel):
+    """
+    Result of following or unfollowing a user
+    """
+    follower_id: int
+    followee_id: int
+    following: bool = Field(..., description="Whether the follower now follows the followee")
@@ -0,0 +1,105 @@
+"""
+Batch Interpretation - Interprets many stored dreams per worker cycle
+
+Used by the batch API endpoint and the offline re-interpretation CLI.
+Dreams are dispatched to Ollama with bounded concurrency at BULK priority
+(so interactive requests are served first) and results are written to the
+interpretations table with one multi-row INSERT per chunk.
+"""
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, Tuple
+
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.dream import Dream
+from app.models.interpretation import Interpretation, InterpretationStatus, InterpretationType
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.interpretation_jobs import interpret_stored_dream
+from app.services.scheduler import Priority, SchedulerOverloaded
+from app.services.structured_output import section_columns
+
+
+async def _interpret_with_retry(dream: Dream, use_cache: bool) -> Dict:
+    """
+    Interpret one dream, waiting out scheduler rejections instead of failing
+
+    Waits add up to at most BATCH_INTERPRETATION_MAX_WAIT seconds. An open
+    circuit fails the dream at once: Ollama is down rather than busy.
+    """
+    waited = 0
+    while True:
+        try:
+            return await interpret_stored_dream(dream, priority=Priority.BULK, use_cache=use_cache)
+        except CircuitOpenError:
+            raise
+        except SchedulerOverloaded as e:
+            if waited + e.retry_after > settings.BATCH_INTERPRETATION_MAX_WAIT:
+                raise
+            await asyncio.sleep(e.retry_after)
+            waited += e.retry_after
+
+
+async def interpret_dreams(
+    dreams: Iterable[Dream],
+    concurrency: int = settings.BATCH_INTERPRETATION_CONCURRENCY,
+    use_cache: bool = True
+) -> AsyncIterator[Tuple[Dream, Dict]]:
+    """
+    Interpret dreams concurrently and yield results as they complete
+
+    Args:
+        dreams: Dreams to interpret
+        concurrency: Maximum generations in flight for this batch
+        use_cache: Reuse cached interpretations; False always regenerates
+
+    Yields:
+        (dream, result) pairs in completion order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(dream: Dream) -> Tuple[Dream, Dict]:
+        async with semaphore:
+            try:
+                return dream, await _interpret_with_retry(dream, use_cache)
+            except Exception as e:
+                logger.error(f"Batch interpretation of dream {dream.id} failed: {e}")
+                return dream, {"success": False, "error": str(e)}
+
+    tasks = [asyncio.create_task(run(dream)) for dream in dreams]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding work if the consumer goes away (e.g. client disconnect)
+        for task in tasks:
+            task.cancel()
+
+
+def interpretation_row(dream: Dream, result: Dict) -> Dict:
+    """
+    Column values for an AI interpretation row built from a generation result
+    """
+    return {
+        "user_id": dream.user_id,
+        "dream_id": dream.id,
+        "interpretation_type": InterpretationType.AI,
+        "interpretation_text": result["interpretation"],
+        "model_name": result.get("model"),
+        "confidence_score": result.get("confidence"),
+        "prompt_version": result.get("prompt_version"),
+        **section_columns(result.get("sections") or {}),
+        "status": InterpretationStatus.COMPLETED,
+    }
+
+
+async def bulk_insert_interpretations(session: AsyncSession, rows: List[Dict]) -> None:
+    """
+    Insert interpretation rows in one statement and commit once
+    """
+    if not rows:
+        return
+    await session.execute(insert(Interpretation), rows)
+    await session.commit()
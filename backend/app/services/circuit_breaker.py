@@ -0,0 +1,154 @@
+"""
+Circuit Breaker and Retry Budget for Ollama calls
+
+When Ollama is down, waiting for every request to time out exhausts the
+worker pool. The breaker opens after repeated failures and rejects calls
+immediately until a recovery period has passed, then lets a single probe
+request through (half-open) to decide whether to close again.
+
+The retry budget caps retries to a fraction of overall traffic so retries
+cannot multiply load on an already struggling backend.
+"""
+import enum
+import math
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.scheduler import SchedulerOverloaded
+
+
+class CircuitState(str, enum.Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"  # Normal operation
+    OPEN = "open"  # Failing fast
+    HALF_OPEN = "half_open"  # Probing whether the backend recovered
+
+
+class CircuitOpenError(SchedulerOverloaded):
+    """
+    Raised when the circuit is open
+
+    Callers treat it like an overloaded scheduler: the request is refused
+    immediately with a Retry-After hint.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.OLLAMA_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = settings.OLLAMA_CIRCUIT_RECOVERY_TIMEOUT
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._stats = {"rejected": 0, "opened": 0}
+
+    def before_request(self) -> None:
+        """
+        Admit or refuse a call
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                probe already in flight
+        """
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                self._reject()
+            self.state = CircuitState.HALF_OPEN
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                self._reject()
+            self._probe_in_flight = True
+
+    def release(self) -> None:
+        """
+        Free the half-open probe slot if the call ended without an outcome
+        (e.g. it was cancelled or never reached Ollama)
+        """
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != CircuitState.CLOSED:
+            logger.info("Ollama circuit closed")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                logger.warning(f"Ollama circuit opened after {self.consecutive_failures} failures")
+                self._stats["opened"] += 1
+            self.state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the circuit will allow a probe
+        """
+        if self.state != CircuitState.OPEN:
+            return 1
+        remaining = self.recovery_timeout - (time.monotonic() - self._opened_at)
+        return max(1, math.ceil(remaining))
+
+    def _reject(self) -> None:
+        self._stats["rejected"] += 1
+        raise CircuitOpenError("Interpretation service is temporarily unavailable", self.retry_after())
+
+    def get_stats(self) -> Dict:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after": self.retry_after() if self.state == CircuitState.OPEN else None,
+            **self._stats,
+        }
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a ratio of requests
+
+    Every request deposits `ratio` tokens (up to `max_tokens`); every retry
+    spends one. With ratio 0.2, at most about one retry per five requests
+    is allowed once the initial reserve is used up.
+    """
+
+    def __init__(
+        self,
+        ratio: float = settings.OLLAMA_RETRY_BUDGET_RATIO,
+        max_tokens: float = 10.0
+    ):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._stats = {"retries": 0, "denied": 0}
+
+    def record_request(self) -> None:
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self._stats["retries"] += 1
+            return True
+        self._stats["denied"] += 1
+        return False
+
+    def get_stats(self) -> Dict:
+        return {"tokens": round(self._tokens, 2), "ratio": self.ratio, **self._stats}
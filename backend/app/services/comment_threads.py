@@ -0,0 +1,264 @@
+"""
+Comment Threads - Whole comment trees in one query
+
+Loading a post's thread through the Comment.replies relationship costs one
+query per comment level. Instead, one recursive CTE walks a page of
+top-level comments and their replies down to a maximum depth, the rows
+come back breadth first (depth, created_at, id) with their author and
+direct reply count, and the tree is assembled in a single pass: every
+parent precedes its replies, so each row is appended to its parent as it
+is read.
+
+Top-level comments are paginated by id with opaque cursors; the extra row
+fetched to detect a next page is not expanded. At most
+COMMENT_THREAD_MAX_COMMENTS comments are returned per page; a comment's
+reply_count shows when some of its replies were cut by the depth or size
+limit.
+
+Pages are cached in Redis, all pages of a post under one hash, for
+COMMENT_THREAD_CACHE_TTL seconds. A new comment on a post deletes the
+hash. Without Redis every read goes to PostgreSQL.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import and_, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.social import Comment
+from app.models.user import User
+
+THREAD_PREFIX = "comments:thread:"
+
+
+def encode_cursor(comment_id: int) -> str:
+    """
+    Opaque cursor pointing just past a top-level comment
+    """
+    return base64.urlsafe_b64encode(str(comment_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _visible():
+    return and_(Comment.is_hidden.is_(False), Comment.is_flagged.is_(False))
+
+
+def thread_query(post_id: int, after_id: Optional[int], limit: int, max_depth: int, max_comments: int):
+    """
+    Recursive query for one page of a post's comment tree
+
+    The anchor ranks up to limit + 1 top-level comments; only the first
+    limit are expanded. Rows are ordered breadth first.
+    """
+    top_level = (
+        select(
+            Comment.id,
+            Comment.parent_comment_id,
+            Comment.user_id,
+            Comment.text,
+            Comment.created_at,
+            literal_column("1").label("depth"),
+            func.row_number().over(order_by=Comment.id).label("top_rank"),
+        )
+        .where(Comment.post_id == post_id)
+        .where(Comment.parent_comment_id.is_(None))
+        .where(_visible())
+        .order_by(Comment.id)
+        .limit(limit + 1)
+    )
+    if after_id is not None:
+        top_level = top_level.where(Comment.id > after_id)
+
+    top = top_level.subquery("top_level")
+    thread = select(*top.c).cte("thread", recursive=True)
+    replies = (
+        select(
+            Comment.id,
+            Comment.parent_comment_id,
+            Comment.user_id,
+            Comment.text,
+            Comment.created_at,
+            (thread.c.depth + 1).label("depth"),
+            thread.c.top_rank,
+        )
+        .join(thread, Comment.parent_comment_id == thread.c.id)
+        .where(thread.c.depth < max_depth)
+        .where(thread.c.top_rank <= limit)
+        .where(_visible())
+    )
+    thread = thread.union_all(replies)
+
+    reply_count = (
+        select(func.count())
+        .where(Comment.parent_comment_id == thread.c.id)
+        .where(_visible())
+        .scalar_subquery()
+    )
+    return (
+        select(
+            thread.c.id,
+            thread.c.parent_comment_id,
+            thread.c.user_id,
+            thread.c.text,
+            thread.c.created_at,
+            thread.c.depth,
+            reply_count.label("reply_count"),
+            User.username,
+            User.full_name,
+            User.avatar_url,
+        )
+        .join(User, User.id == thread.c.user_id)
+        .order_by(thread.c.depth, thread.c.created_at, thread.c.id)
+        .limit(max_comments + 1)
+    )
+
+
+def build_tree(rows, post_id: int) -> List[Dict]:
+    """
+    Nest breadth-first comment rows under their parents in one pass
+
+    Returns:
+        Top-level comments in order, each with its "replies"
+    """
+    nodes: Dict[int, Dict] = {}
+    roots = []
+    for row in rows:
+        node = {
+            "id": row.id,
+            "post_id": post_id,
+            "user_id": row.user_id,
+            "text": row.text,
+            "parent_comment_id": row.parent_comment_id,
+            "created_at": row.created_at,
+            "depth": row.depth,
+            "reply_count": row.reply_count,
+            "user": {
+                "id": row.user_id,
+                "username": row.username,
+                "full_name": row.full_name,
+                "avatar_url": row.avatar_url,
+            },
+            "replies": [],
+        }
+        nodes[row.id] = node
+        if row.depth == 1:
+            roots.append(node)
+        elif row.parent_comment_id in nodes:
+            nodes[row.parent_comment_id]["replies"].append(node)
+    return roots
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class CommentThreadService:
+    """
+    Loads comment trees and caches hot ones
+    """
+
+    def __init__(self):
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def get_thread(
+        self,
+        session: AsyncSession,
+        post_id: int,
+        cursor: Optional[str] = None,
+        limit: int = settings.DEFAULT_PAGE_SIZE,
+        max_depth: int = settings.COMMENT_THREAD_MAX_DEPTH
+    ) -> Dict:
+        """
+        One page of top-level comments with their replies nested
+
+        Args:
+            session: Database session
+            post_id: The post
+            cursor: Cursor from the previous page, None for the first page
+            limit: Top-level comments per page
+            max_depth: Levels loaded, 1 for top-level comments only
+
+        Returns:
+            {"post_id": int, "items": [comment, ...], "next_cursor": str or None}
+            where each comment is a dict with nested "replies"
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after_id = decode_cursor(cursor) if cursor else None
+        field = f"{cursor or ''}:{limit}:{max_depth}"
+        key = f"{THREAD_PREFIX}{post_id}"
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                cached = await redis.hget(key, field)
+                if cached is not None:
+                    self._stats["hits"] += 1
+                    return json.loads(cached)
+            except Exception as e:
+                logger.warning(f"Comment thread cache read failed: {e}")
+        self._stats["misses"] += 1
+
+        result = await session.execute(
+            thread_query(post_id, after_id, limit, max_depth, settings.COMMENT_THREAD_MAX_COMMENTS)
+        )
+        roots = build_tree(result.all(), post_id)
+        page = {
+            "post_id": post_id,
+            "items": roots[:limit],
+            "next_cursor": encode_cursor(roots[limit - 1]["id"]) if len(roots) > limit else None,
+        }
+
+        if redis is not None:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(key, field, json.dumps(page, default=_json_default))
+                    pipe.expire(key, settings.COMMENT_THREAD_CACHE_TTL)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Comment thread cache write failed: {e}")
+        return page
+
+    async def invalidate(self, post_id: int) -> None:
+        """
+        Drop every cached page of a post's thread
+        """
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.delete(f"{THREAD_PREFIX}{post_id}")
+            self._stats["invalidations"] += 1
+        except Exception as e:
+            logger.warning(f"Comment thread cache invalidation failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """
+        Cache counters
+        """
+        return dict(self._stats)
+
+
+# Singleton instance
+comment_threads = CommentThreadService()
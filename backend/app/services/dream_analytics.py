@@ -0,0 +1,213 @@
+"""
+Dream Analytics - Journal summaries from precomputed monthly aggregates
+
+A user's most frequent symbols and emotions, dream-type mix and sleep on
+nights with and without dreams are read from per-user monthly aggregate
+tables (dream_term_counts, sleep_period_stats) that database triggers keep
+current on every write to dreams and sleep_logs
+(db/schemas/008_dream_analytics.sql). A month's summary reads a handful of
+aggregate rows through their primary key, however large the journal; the
+all-time summary adds up the user's months.
+
+Summaries are cached in Redis, all of a user's summaries under one hash,
+for ANALYTICS_CACHE_TTL seconds. Code that writes dreams or sleep logs
+through the API calls invalidate(); without Redis every read goes to
+PostgreSQL.
+"""
+import json
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from loguru import logger
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.analytics import DreamTermCount, SleepPeriodStats
+
+CACHE_PREFIX = "analytics:user:"
+
+# Period value for a summary of the whole journal
+ALL_TIME = "all"
+
+
+def parse_period(period: Optional[str]) -> Optional[date]:
+    """
+    First day of the month named "YYYY-MM", the current month if period
+    is None, or None for ALL_TIME
+
+    Raises:
+        ValueError: If the period is malformed
+    """
+    if period is None:
+        return datetime.utcnow().date().replace(day=1)
+    if period == ALL_TIME:
+        return None
+    try:
+        return datetime.strptime(period, "%Y-%m").date()
+    except ValueError:
+        raise ValueError(f"Invalid period: {period} (expected YYYY-MM or {ALL_TIME})")
+
+
+def terms_query(user_id: int, month: Optional[date], top: int):
+    """
+    The top symbols and emotions and every dream type of a user's month,
+    or of all months when month is None
+    """
+    totals = (
+        select(DreamTermCount.kind, DreamTermCount.term, func.sum(DreamTermCount.count).label("count"))
+        .where(DreamTermCount.user_id == user_id)
+        .group_by(DreamTermCount.kind, DreamTermCount.term)
+    )
+    if month is not None:
+        totals = totals.where(DreamTermCount.period == month)
+    totals = totals.subquery("totals")
+
+    rank = func.row_number().over(
+        partition_by=totals.c.kind,
+        order_by=(totals.c.count.desc(), totals.c.term)
+    ).label("rank")
+    ranked = select(totals, rank).subquery("ranked")
+    return (
+        select(ranked.c.kind, ranked.c.term, ranked.c.count)
+        .where(or_(ranked.c.rank <= top, ranked.c.kind == "type"))
+        .order_by(ranked.c.kind, ranked.c.rank)
+    )
+
+
+def sleep_query(user_id: int, month: Optional[date]):
+    """
+    Sleep totals of a user's month (or all months) for nights with and
+    without a dream
+    """
+    query = (
+        select(
+            SleepPeriodStats.had_dream,
+            func.sum(SleepPeriodStats.nights).label("nights"),
+            func.sum(SleepPeriodStats.quality_sum).label("quality_sum"),
+            func.sum(SleepPeriodStats.rated_nights).label("rated_nights"),
+            func.sum(SleepPeriodStats.hours_sum).label("hours_sum"),
+            func.sum(SleepPeriodStats.timed_nights).label("timed_nights"),
+        )
+        .where(SleepPeriodStats.user_id == user_id)
+        .group_by(SleepPeriodStats.had_dream)
+    )
+    if month is not None:
+        query = query.where(SleepPeriodStats.period == month)
+    return query
+
+
+def _night_stats(row) -> Dict:
+    if row is None:
+        return {"nights": 0, "avg_quality": None, "avg_hours": None}
+    return {
+        "nights": row.nights,
+        "avg_quality": round(row.quality_sum / row.rated_nights, 2) if row.rated_nights else None,
+        "avg_hours": round(row.hours_sum / row.timed_nights, 2) if row.timed_nights else None,
+    }
+
+
+class DreamAnalyticsService:
+    """
+    Reads and caches journal summaries
+    """
+
+    def __init__(self):
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def summary(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        period: Optional[str] = None,
+        top: int = settings.ANALYTICS_TOP_TERMS
+    ) -> Dict:
+        """
+        A user's journal summary for one month or all time
+
+        Args:
+            session: Database session
+            user_id: The journal's owner
+            period: "YYYY-MM", "all", or None for the current month
+            top: Symbols and emotions listed
+
+        Returns:
+            {"user_id", "period", "dream_count", "dream_types": {type: count},
+             "top_symbols": [{"term", "count"}, ...], "top_emotions": [...],
+             "sleep": {"dream_nights": {...}, "dreamless_nights": {...}}}
+
+        Raises:
+            ValueError: If the period is malformed
+        """
+        month = parse_period(period)
+        label = month.strftime("%Y-%m") if month else ALL_TIME
+        key = f"{CACHE_PREFIX}{user_id}"
+        field = f"{label}:{top}"
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                cached = await redis.hget(key, field)
+                if cached is not None:
+                    self._stats["hits"] += 1
+                    return json.loads(cached)
+            except Exception as e:
+                logger.warning(f"Analytics cache read failed: {e}")
+        self._stats["misses"] += 1
+
+        terms = {"symbol": [], "emotion": [], "type": []}
+        for kind, term, count in await session.execute(terms_query(user_id, month, top)):
+            terms[kind].append({"term": term, "count": count})
+        nights = {row.had_dream: row for row in await session.execute(sleep_query(user_id, month))}
+
+        dream_types = {entry["term"]: entry["count"] for entry in terms["type"]}
+        result = {
+            "user_id": user_id,
+            "period": label,
+            "dream_count": sum(dream_types.values()),
+            "dream_types": dream_types,
+            "top_symbols": terms["symbol"],
+            "top_emotions": terms["emotion"],
+            "sleep": {
+                "dream_nights": _night_stats(nights.get(True)),
+                "dreamless_nights": _night_stats(nights.get(False)),
+            },
+        }
+
+        if redis is not None:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(key, field, json.dumps(result))
+                    pipe.expire(key, settings.ANALYTICS_CACHE_TTL)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Analytics cache write failed: {e}")
+        return result
+
+    async def invalidate(self, user_id: Optional[int] = None) -> None:
+        """
+        Drop a user's cached summaries, or everyone's when user_id is None
+        """
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            if user_id is not None:
+                await redis.delete(f"{CACHE_PREFIX}{user_id}")
+            else:
+                async for key in redis.scan_iter(match=f"{CACHE_PREFIX}*", count=1000):
+                    await redis.delete(key)
+            self._stats["invalidations"] += 1
+        except Exception as e:
+            logger.warning(f"Analytics cache invalidation failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """
+        Cache counters
+        """
+        return dict(self._stats)
+
+
+# Singleton instance
+dream_analytics = DreamAnalyticsService()
@@ -0,0 +1,293 @@
+"""
+Dream Embeddings - Vector index of dreams for "similar dreams"
+
+Each dream's description and symbols are embedded with the local Ollama
+embedding model and stored as a float32 pgvector in dream_embeddings,
+which has an HNSW index for cosine-distance nearest neighbour queries.
+
+Dreams are indexed incrementally: committing a new dream, or a change to
+its description or symbols, marks the dream as pending, and a background
+task embeds pending dreams in batches of EMBEDDING_BATCH_SIZE per Ollama
+request. Unchanged text (same content hash and model) is never
+re-embedded. Pending dreams live in process only; dreams missed by a
+restart are picked up by `python -m app.cli.embed_dreams`.
+"""
+import asyncio
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import Float, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.dream import Dream
+from app.models.embedding import DreamEmbedding
+from app.repositories.read_models import DreamSummary
+from app.services.ollama_service import ollama_service
+from app.services.search_service import visible_to
+
+# Dream attributes that feed the embedded text
+EMBEDDED_FIELDS = ("description", "symbols")
+
+# Session.info key for dreams changed in the current transaction
+_CHANGED_KEY = "dreams_to_embed"
+
+
+def embedding_text(dream: Dream) -> str:
+    """
+    Text embedded for a dream: its description followed by its symbols
+    """
+    text = dream.description or ""
+    if dream.symbols:
+        text += "\nSymbols: " + ", ".join(str(symbol) for symbol in dream.symbols)
+    return text
+
+
+def content_hash(text: str, model: str) -> str:
+    """
+    Fingerprint of an embedding input, used to skip unchanged dreams
+    """
+    return hashlib.sha256(f"{model}\n{text}".encode()).hexdigest()
+
+
+class DreamEmbeddingIndex:
+    """
+    Keeps dream embeddings up to date and answers similarity queries
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+        flush_interval: float = settings.EMBEDDING_FLUSH_INTERVAL
+    ):
+        self.enabled = settings.EMBEDDING_INDEX_ENABLED
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.model = settings.OLLAMA_EMBEDDING_MODEL
+        self._pending: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"indexed": 0, "unchanged": 0, "batches": 0, "errors": 0}
+
+    async def start(self) -> None:
+        """
+        Start the background indexing task
+        """
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """
+        Stop the background indexing task
+
+        Dreams still pending are left for the next run or the backfill CLI.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._pending:
+            logger.info(f"{len(self._pending)} dreams left unindexed at shutdown")
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Dream embedding flush failed: {e}")
+
+    def mark(self, dream_ids: Iterable[int]) -> None:
+        """
+        Queue dreams for (re-)embedding
+        """
+        if self.enabled:
+            self._pending.update(dream_ids)
+
+    async def flush(self) -> int:
+        """
+        Embed all pending dreams, one batch per Ollama request
+
+        Returns:
+            Number of dreams whose embedding was written
+        """
+        indexed = 0
+        while self._pending:
+            batch = sorted(self._pending)[:self.batch_size]
+            self._pending.difference_update(batch)
+            try:
+                async with AsyncSessionLocal() as session:
+                    dreams = (await session.execute(
+                        select(Dream).where(Dream.id.in_(batch))
+                    )).scalars().all()
+                    indexed += await self.index_dreams(session, dreams)
+            except Exception:
+                # Retry the batch on the next flush
+                self._pending.update(batch)
+                raise
+        return indexed
+
+    async def index_dreams(self, session: AsyncSession, dreams: List[Dream]) -> int:
+        """
+        Embed and upsert dreams whose text changed since they were last indexed
+
+        Args:
+            session: Database session, committed on success
+            dreams: Dreams to index; at most one Ollama request is made for them
+
+        Returns:
+            Number of embeddings written
+
+        Raises:
+            RuntimeError: If Ollama could not embed the batch
+        """
+        if not dreams:
+            return 0
+
+        texts = {dream.id: embedding_text(dream) for dream in dreams}
+        hashes = {dream_id: content_hash(text, self.model) for dream_id, text in texts.items()}
+        result = await session.execute(
+            select(DreamEmbedding.dream_id, DreamEmbedding.content_hash)
+            .where(DreamEmbedding.dream_id.in_(list(texts)))
+        )
+        current = dict(result.all())
+        changed = [dream_id for dream_id in texts if current.get(dream_id) != hashes[dream_id]]
+        self._stats["unchanged"] += len(texts) - len(changed)
+        if not changed:
+            return 0
+
+        embeddings = await ollama_service.embed_batch([texts[dream_id] for dream_id in changed])
+        if embeddings is None:
+            raise RuntimeError(f"Could not embed {len(changed)} dreams")
+        if len(embeddings[0]) != settings.EMBEDDING_DIMENSIONS:
+            raise RuntimeError(
+                f"{self.model} returns {len(embeddings[0])}-dimensional embeddings, "
+                f"EMBEDDING_DIMENSIONS is {settings.EMBEDDING_DIMENSIONS}"
+            )
+
+        statement = insert(DreamEmbedding)
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[DreamEmbedding.dream_id],
+                set_={
+                    "model": statement.excluded.model,
+                    "content_hash": statement.excluded.content_hash,
+                    "embedding": statement.excluded.embedding,
+                },
+            ),
+            [
+                {
+                    "dream_id": dream_id,
+                    "model": self.model,
+                    "content_hash": hashes[dream_id],
+                    "embedding": embedding,
+                }
+                for dream_id, embedding in zip(changed, embeddings)
+            ]
+        )
+        await session.commit()
+
+        self._stats["batches"] += 1
+        self._stats["indexed"] += len(changed)
+        return len(changed)
+
+    async def nearest(
+        self,
+        session: AsyncSession,
+        embedding: List[float],
+        viewer_id: Optional[int] = None,
+        limit: int = 10,
+        exclude_dream_id: Optional[int] = None
+    ) -> List[Tuple[DreamSummary, float]]:
+        """
+        Dreams closest to an embedding that a viewer may see
+
+        The HNSW index returns approximate neighbours; EMBEDDING_EF_SEARCH
+        trades recall for latency.
+
+        Returns:
+            (DreamSummary, cosine similarity) pairs, most similar first
+        """
+        distance = DreamEmbedding.embedding.op("<=>", return_type=Float)(embedding)
+        await session.execute(
+            select(func.set_config("hnsw.ef_search", str(settings.EMBEDDING_EF_SEARCH), True))
+        )
+        query = (
+            select(*DreamSummary.columns(), distance.label("distance"))
+            .join(DreamEmbedding, DreamEmbedding.dream_id == Dream.id)
+            .where(visible_to(viewer_id))
+            .order_by(distance)
+            .limit(limit)
+        )
+        if exclude_dream_id is not None:
+            query = query.where(Dream.id != exclude_dream_id)
+        result = await session.execute(query)
+        return [(DreamSummary.from_row(row), 1 - row.distance) for row in result]
+
+    async def similar_dreams(
+        self,
+        session: AsyncSession,
+        dream_id: int,
+        viewer_id: Optional[int] = None,
+        limit: int = 10
+    ) -> List[Tuple[DreamSummary, float]]:
+        """
+        Dreams most similar to an indexed dream, excluding the dream itself
+
+        Returns:
+            (DreamSummary, cosine similarity) pairs, most similar first; empty if
+            the dream has not been indexed yet
+        """
+        embedding = (await session.execute(
+            select(DreamEmbedding.embedding).where(DreamEmbedding.dream_id == dream_id)
+        )).scalar_one_or_none()
+        if embedding is None:
+            return []
+        return await self.nearest(session, embedding, viewer_id, limit, exclude_dream_id=dream_id)
+
+    def get_stats(self) -> Dict:
+        """
+        Indexing counters
+        """
+        return {
+            "enabled": self.enabled,
+            "model": self.model,
+            "pending": len(self._pending),
+            **self._stats,
+        }
+
+
+# Singleton instance
+dream_index = DreamEmbeddingIndex()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_dreams(session: Session, flush_context) -> None:
+    """
+    Remember dreams whose embedded text was inserted or changed
+    """
+    changed = session.info.setdefault(_CHANGED_KEY, set())
+    for obj in session.new:
+        if isinstance(obj, Dream):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Dream):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in EMBEDDED_FIELDS):
+                changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_changed_dreams(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        dream_index.mark(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_dreams(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
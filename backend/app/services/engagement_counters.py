@@ -0,0 +1,477 @@
+"""
+Engagement Counters - Write-behind like and comment counters
+
+Updating social_posts.likes_count on every like turns a popular post into
+a hot row that every liker has to lock. Instead, like/unlike/comment
+events add a delta to a pending buffer (a Redis hash, or an in-process
+dict without Redis) and a background task periodically applies all
+pending deltas in one batched UPDATE ordered by post id.
+
+Reads add the not-yet-flushed deltas to the stored counters, so counts
+are current immediately. A reconciliation pass periodically recounts the
+likes and comments tables and corrects any drift (e.g. deltas lost when
+a process died before flushing). It holds the flush lock while it
+compares, so no deltas move into social_posts between its reads, and it
+skips posts that are marked as changing: writers mark a post before
+committing a like or comment and clear the mark once its delta is
+recorded, since in between the row is counted but the delta is missing.
+
+The Redis locks hold a random token and are released by a script that
+deletes them only if the token is still theirs, so a flush that outlived
+its lock cannot release another process's lock.
+"""
+import asyncio
+import secrets
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from loguru import logger
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
+from app.models.social import Comment, Like, SocialPost
+from app.repositories.read_models import PostCard
+
+PENDING_KEY = "counters:pending"
+FLUSHING_KEY = "counters:flushing"
+FLUSH_LOCK_KEY = "counters:flush:lock"
+RECONCILE_LOCK_KEY = "counters:reconcile:lock"
+CHANGING_PREFIX = "counters:changing:"
+
+# Seconds a change mark outlives a process that died before clearing it
+CHANGE_MARK_TTL = 60
+
+COUNTERS = ("likes", "comments")
+
+# Delete a lock only while it still holds the caller's token
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Clear one change mark, deleting the key once no change is in progress
+_UNMARK_SCRIPT = """
+if redis.call('DECR', KEYS[1]) <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_posts = SocialPost.__table__
+
+# One executemany statement applying deltas to many posts
+_APPLY_DELTAS = (
+    update(_posts)
+    .where(_posts.c.id == bindparam("post_id"))
+    .values(
+        likes_count=_posts.c.likes_count + bindparam("likes_delta"),
+        comments_count=_posts.c.comments_count + bindparam("comments_delta"),
+    )
+)
+
+
+def _field(counter: str, post_id: int) -> str:
+    return f"{counter}:{post_id}"
+
+
+class EngagementCounters:
+    """
+    Buffers counter deltas and flushes them to social_posts in batches
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = settings.COUNTER_FLUSH_INTERVAL,
+        reconcile_interval: float = settings.COUNTER_RECONCILE_INTERVAL
+    ):
+        self.flush_interval = flush_interval
+        self.reconcile_interval = reconcile_interval
+        # In-process buffer, used when Redis is unavailable
+        self._pending: Dict[Tuple[str, int], int] = defaultdict(int)
+        # In-process change marks, used when Redis is unavailable
+        self._changing: Dict[int, int] = defaultdict(int)
+        # Serializes flushes and reconciliation batches within the process
+        self._flush_lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"flushes": 0, "posts_flushed": 0, "reconciled": 0, "errors": 0}
+
+    async def start(self) -> None:
+        """
+        Start the periodic flush and reconciliation tasks
+        """
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._loop(self.flush, self.flush_interval)))
+        if self.reconcile_interval > 0:
+            self._tasks.append(asyncio.create_task(self._loop(self.reconcile, self.reconcile_interval)))
+
+    async def stop(self) -> None:
+        """
+        Stop the background tasks and flush what is still pending
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.flush()
+
+    async def _loop(self, job, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await job()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Counter {job.__name__} failed: {e}")
+
+    async def add(self, post_id: int, counter: str, delta: int) -> None:
+        """
+        Record a counter change for a post
+
+        Args:
+            post_id: The post
+            counter: "likes" or "comments"
+            delta: Change to apply, e.g. 1 for a like and -1 for an unlike
+        """
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.hincrby(PENDING_KEY, _field(counter, post_id), delta)
+                return
+            except Exception as e:
+                logger.warning(f"Counter update failed in Redis, buffering in process: {e}")
+        self._pending[(counter, post_id)] += delta
+
+    @asynccontextmanager
+    async def changing(self, post_id: int) -> AsyncIterator[None]:
+        """
+        Mark a post's counters as changing for the duration of the block
+
+        Wrap committing a like or comment together with recording its
+        delta with add(); reconciliation leaves marked posts alone. A mark
+        left by a process that died expires after CHANGE_MARK_TTL seconds.
+        """
+        redis = get_redis()
+        key = CHANGING_PREFIX + str(post_id)
+        in_redis = False
+        if redis is not None:
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.incr(key)
+                    pipe.expire(key, CHANGE_MARK_TTL)
+                    await pipe.execute()
+                in_redis = True
+            except Exception as e:
+                logger.warning(f"Could not mark counter change in Redis, marking in process: {e}")
+        if not in_redis:
+            self._changing[post_id] += 1
+
+        try:
+            yield
+        finally:
+            if in_redis:
+                try:
+                    unmark = redis.register_script(_UNMARK_SCRIPT)
+                    await unmark(keys=[key])
+                except Exception as e:
+                    logger.warning(f"Could not clear counter change mark, it will expire: {e}")
+            else:
+                self._changing[post_id] -= 1
+                if not self._changing[post_id]:
+                    del self._changing[post_id]
+
+    async def _changing_posts(self, post_ids: List[int]) -> Set[int]:
+        """
+        Posts with a change in progress in this or another process
+
+        If the marks cannot be read, every post is treated as changing.
+        """
+        changing = {post_id for post_id in post_ids if self._changing.get(post_id)}
+        redis = get_redis()
+        if redis is not None and post_ids:
+            try:
+                marks = await redis.mget([CHANGING_PREFIX + str(post_id) for post_id in post_ids])
+            except Exception as e:
+                logger.warning(f"Could not read counter change marks: {e}")
+                return set(post_ids)
+            changing.update(post_id for post_id, mark in zip(post_ids, marks) if mark and int(mark) > 0)
+        return changing
+
+    async def pending_deltas(self, post_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Deltas recorded but not yet written to social_posts
+
+        Returns:
+            {post_id: {"likes": n, "comments": n}} for posts with pending changes
+        """
+        post_ids = list(dict.fromkeys(post_ids))
+        wanted = set(post_ids)
+        deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        for (counter, post_id), delta in self._pending.items():
+            if post_id in wanted and delta:
+                deltas[post_id][counter] += delta
+
+        redis = get_redis()
+        if redis is not None and post_ids:
+            fields = [_field(counter, post_id) for post_id in post_ids for counter in COUNTERS]
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.hmget(PENDING_KEY, fields)
+                    pipe.hmget(FLUSHING_KEY, fields)
+                    pending, flushing = await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Could not read pending counters: {e}")
+            else:
+                for field, a, b in zip(fields, pending, flushing):
+                    delta = int(a or 0) + int(b or 0)
+                    if delta:
+                        counter, post_id = field.split(":")
+                        deltas[int(post_id)][counter] += delta
+        return dict(deltas)
+
+    async def overlay(self, posts: Iterable[Union[SocialPost, PostCard]]) -> None:
+        """
+        Add pending deltas to loaded posts' counters for display
+
+        On ORM posts the values are set as already committed so the
+        session never writes them back; post cards are plain objects.
+        """
+        posts = list(posts)
+        deltas = await self.pending_deltas(post.id for post in posts)
+        for post in posts:
+            delta = deltas.get(post.id)
+            if delta:
+                set_value = set_committed_value if isinstance(post, SocialPost) else setattr
+                set_value(post, "likes_count", (post.likes_count or 0) + delta["likes"])
+                set_value(post, "comments_count", (post.comments_count or 0) + delta["comments"])
+
+    async def _lock(self, key: str, ttl: int) -> Optional[str]:
+        """
+        Take a Redis lock
+
+        Returns:
+            The lock's token, or None if another process holds it
+        """
+        token = secrets.token_hex(16)
+        if await get_redis().set(key, token, nx=True, ex=ttl):
+            return token
+        return None
+
+    async def _unlock(self, key: str, token: str) -> None:
+        release = get_redis().register_script(_RELEASE_SCRIPT)
+        await release(keys=[key], args=[token])
+
+    async def flush(self) -> int:
+        """
+        Write pending deltas to social_posts in one batched UPDATE
+
+        With Redis, the pending hash is renamed to a flushing hash first so
+        new events keep accumulating while the batch is written, and a lock
+        ensures only one process flushes at a time. A flushing hash left
+        behind by a failed flush is retried before new deltas are taken.
+
+        Returns:
+            Number of posts updated
+        """
+        async with self._flush_lock:
+            return await self._flush()
+
+    async def _flush(self) -> int:
+        flushed = 0
+
+        if self._pending:
+            batch, self._pending = self._pending, defaultdict(int)
+            try:
+                flushed += await self._apply(
+                    {key: delta for key, delta in batch.items() if delta}
+                )
+            except Exception:
+                # Put the batch back so it is retried on the next flush
+                for key, delta in batch.items():
+                    self._pending[key] += delta
+                raise
+
+        redis = get_redis()
+        if redis is not None:
+            token = await self._lock(FLUSH_LOCK_KEY, 60)
+            if token is None:
+                return flushed
+            try:
+                if not await redis.exists(FLUSHING_KEY):
+                    if not await redis.exists(PENDING_KEY):
+                        return flushed
+                    await redis.rename(PENDING_KEY, FLUSHING_KEY)
+                raw = await redis.hgetall(FLUSHING_KEY)
+                batch = {}
+                for field, delta in raw.items():
+                    counter, post_id = field.split(":")
+                    if int(delta):
+                        batch[(counter, int(post_id))] = int(delta)
+                flushed += await self._apply(batch)
+                await redis.delete(FLUSHING_KEY)
+            finally:
+                await self._unlock(FLUSH_LOCK_KEY, token)
+
+        return flushed
+
+    async def _apply(self, batch: Dict[Tuple[str, int], int]) -> int:
+        if not batch:
+            return 0
+
+        rows: Dict[int, Dict] = {}
+        for (counter, post_id), delta in batch.items():
+            row = rows.setdefault(post_id, {"post_id": post_id, "likes_delta": 0, "comments_delta": 0})
+            row[f"{counter}_delta"] += delta
+
+        # Consistent lock order across concurrent flushers
+        params = [rows[post_id] for post_id in sorted(rows)]
+        async with AsyncSessionLocal() as session:
+            await session.execute(_APPLY_DELTAS, params)
+            await session.commit()
+
+        self._stats["flushes"] += 1
+        self._stats["posts_flushed"] += len(params)
+        return len(params)
+
+    async def reconcile(self, session: Optional[AsyncSession] = None) -> int:
+        """
+        Recount likes and comments and correct drifted counters
+
+        Posts are processed in id ranges of COUNTER_RECONCILE_BATCH_SIZE,
+        each under the flush lock. Stored counters are set to the true
+        count minus deltas still pending, so the next flush lands on the
+        correct value. A post whose pending deltas change while its batch
+        is counted, or that is marked as changing, is left for the next pass.
+
+        Returns:
+            Number of posts corrected
+        """
+        if session is None:
+            async with AsyncSessionLocal() as session:
+                return await self.reconcile(session)
+
+        redis = get_redis()
+        token = None
+        if redis is not None:
+            token = await self._lock(RECONCILE_LOCK_KEY, 3600)
+            if token is None:
+                return 0
+
+        try:
+            likes = (
+                select(func.count(Like.id)).where(Like.post_id == SocialPost.id)
+                .correlate(SocialPost).scalar_subquery()
+            )
+            comments = (
+                select(func.count(Comment.id)).where(Comment.post_id == SocialPost.id)
+                .correlate(SocialPost).scalar_subquery()
+            )
+
+            corrected = 0
+            last_id = 0
+            while True:
+                batch = await self._reconcile_batch(session, last_id, likes, comments)
+                if batch is None:
+                    break
+                last_id, fixed = batch
+                corrected += fixed
+
+            if corrected:
+                logger.info(f"Reconciled counters for {corrected} posts")
+            self._stats["reconciled"] += corrected
+            return corrected
+        finally:
+            if token is not None:
+                await self._unlock(RECONCILE_LOCK_KEY, token)
+
+    async def _reconcile_batch(
+        self,
+        session: AsyncSession,
+        after_id: int,
+        likes,
+        comments
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Correct the counters of the next batch of posts
+
+        Returns:
+            (last post id, posts corrected), or None past the last post
+        """
+        async with self._flush_lock:
+            token = None
+            if get_redis() is not None:
+                # Wait out a flush in another process; its lock expires in 60s
+                for _ in range(600):
+                    token = await self._lock(FLUSH_LOCK_KEY, 60)
+                    if token is not None:
+                        break
+                    await asyncio.sleep(0.1)
+                else:
+                    raise TimeoutError("Counter flush lock not released")
+
+            try:
+                post_ids = list(await session.scalars(
+                    select(SocialPost.id)
+                    .where(SocialPost.id > after_id)
+                    .order_by(SocialPost.id)
+                    .limit(settings.COUNTER_RECONCILE_BATCH_SIZE)
+                ))
+                if not post_ids:
+                    return None
+
+                # With flushing held off, pending deltas only change when
+                # an event lands; one landing while the posts are counted
+                # shows up as a difference between the two delta reads. An
+                # event committed before the count whose delta is recorded
+                # after the second read still holds its mark in between.
+                before = await self.pending_deltas(post_ids)
+                result = await session.execute(
+                    select(SocialPost.id, SocialPost.likes_count, SocialPost.comments_count, likes, comments)
+                    .where(SocialPost.id.in_(post_ids))
+                    .order_by(SocialPost.id)
+                )
+                rows = result.all()
+                changing = await self._changing_posts(post_ids)
+                deltas = await self.pending_deltas(post_ids)
+
+                fixes = []
+                for post_id, stored_likes, stored_comments, true_likes, true_comments in rows:
+                    pending = deltas.get(post_id, {"likes": 0, "comments": 0})
+                    if post_id in changing or before.get(post_id, {"likes": 0, "comments": 0}) != pending:
+                        continue
+                    expected_likes = true_likes - pending["likes"]
+                    expected_comments = true_comments - pending["comments"]
+                    if (stored_likes, stored_comments) != (expected_likes, expected_comments):
+                        fixes.append({
+                            "id": post_id,
+                            "likes_count": expected_likes,
+                            "comments_count": expected_comments,
+                        })
+
+                if fixes:
+                    await session.execute(update(SocialPost), fixes)
+                await session.commit()
+                return post_ids[-1], len(fixes)
+            finally:
+                if token is not None:
+                    await self._unlock(FLUSH_LOCK_KEY, token)
+
+    def get_stats(self) -> Dict:
+        """
+        Flush and reconciliation counters
+        """
+        return {
+            "in_process_pending": sum(1 for delta in self._pending.values() if delta),
+            **self._stats,
+        }
+
+
+# Singleton instance
+engagement_counters = EngagementCounters()
@@ -0,0 +1,416 @@
+"""
+Feed Service - Keyset-paginated social feeds
+
+Feeds are ordered by (created_at, id) and paginated with opaque cursors
+encoding the last post's position, so every page is an index range scan
+no matter how deep the reader scrolls.
+
+The following feed is served from per-user timelines precomputed in Redis
+sorted sets (post ID scored by creation time in microseconds):
+
+- Fan-out on write: when a post is shared, its ID is pushed to the
+  timelines of the author's followers, but only to timelines that are
+  currently materialized. The check and the push run in one script, so
+  a timeline expiring in between is not recreated holding one post.
+- Fan-out on read: authors with at least FEED_FANOUT_THRESHOLD followers
+  are not pushed; their posts are merged in by a keyset query at read time.
+- Timelines are built on first read, expire after FEED_TIMELINE_TTL of
+  inactivity and are dropped when the user follows or unfollows someone.
+
+Posts are returned as PostCard read models, each selected together with
+its author and dream in the page's single query.
+
+Hidden or flagged posts are filtered out when posts are loaded, so
+moderation takes effect immediately. Without Redis the following feed is
+answered directly from PostgreSQL.
+"""
+import base64
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import and_, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
+from app.models.social import Follow, SocialPost
+from app.models.user import User
+from app.repositories.read_models import PostCard
+
+TIMELINE_PREFIX = "feed:timeline:"
+
+# Placeholder member so an empty timeline is still materialized
+EMPTY_MARKER = "0"
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Feed position: (created_at in microseconds since the epoch, post id)
+Position = Tuple[int, int]
+
+# Push a post to the given timelines that exist, keeping the newest entries
+_PUSH_SCRIPT = """
+local pushed = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('ZADD', key, ARGV[2], ARGV[1])
+        redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(ARGV[3]) + 1))
+        pushed = pushed + 1
+    end
+end
+return pushed
+"""
+
+
+def _to_micros(created_at: datetime) -> int:
+    return (created_at - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def encode_cursor(post: PostCard) -> str:
+    """
+    Opaque cursor pointing just past a post
+    """
+    raw = f"{_to_micros(post.created_at)}:{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Position:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        micros, post_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return int(micros), int(post_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def visible_filter():
+    """
+    Posts shown to readers and open to likes and comments: neither hidden nor flagged
+    """
+    return and_(SocialPost.is_hidden.is_(False), SocialPost.is_flagged.is_(False))
+
+
+def _before(position: Position):
+    """
+    Posts strictly after position in feed order (i.e. older)
+    """
+    micros, post_id = position
+    return tuple_(SocialPost.created_at, SocialPost.id) < tuple_(_from_micros(micros), post_id)
+
+
+def _not_before(position: Position):
+    micros, post_id = position
+    return tuple_(SocialPost.created_at, SocialPost.id) >= tuple_(_from_micros(micros), post_id)
+
+
+def visible_posts_query(limit: int):
+    """
+    Visible post cards with author and dream, newest first
+    """
+    return (
+        PostCard.query()
+        .where(visible_filter())
+        .order_by(SocialPost.created_at.desc(), SocialPost.id.desc())
+        .limit(limit)
+    )
+
+
+def _cards(result) -> List[PostCard]:
+    return [PostCard.from_row(row) for row in result]
+
+
+def _page(posts: Sequence[PostCard], limit: int) -> Dict:
+    """
+    Trim an over-fetched result (limit + 1 rows) into a page and next cursor
+    """
+    items = list(posts[:limit])
+    next_cursor = encode_cursor(items[-1]) if len(posts) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def global_feed(
+    session: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE
+) -> Dict:
+    """
+    Newest visible posts from everyone
+
+    Args:
+        session: Database session
+        cursor: Cursor from the previous page, None for the first page
+        limit: Page size
+
+    Returns:
+        {"items": [PostCard, ...], "next_cursor": str or None}
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = visible_posts_query(limit + 1)
+    if cursor:
+        query = query.where(_before(decode_cursor(cursor)))
+    result = await session.execute(query)
+    return _page(_cards(result), limit)
+
+
+async def _followed_authors(session: AsyncSession, user_id: int) -> Tuple[List[int], List[int]]:
+    """
+    IDs of followed authors, split into (pushed, pulled) by follower count
+    """
+    result = await session.execute(
+        select(User.id, User.followers_count)
+        .join(Follow, Follow.followee_id == User.id)
+        .where(Follow.follower_id == user_id)
+    )
+    pushed, pulled = [], []
+    for author_id, followers_count in result:
+        if (followers_count or 0) >= settings.FEED_FANOUT_THRESHOLD:
+            pulled.append(author_id)
+        else:
+            pushed.append(author_id)
+    return pushed, pulled
+
+
+async def following_feed(
+    session: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE
+) -> Dict:
+    """
+    Newest visible posts from the authors a user follows
+
+    Args:
+        session: Database session
+        user_id: The reader
+        cursor: Cursor from the previous page, None for the first page
+        limit: Page size
+
+    Returns:
+        {"items": [PostCard, ...], "next_cursor": str or None}
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    position = decode_cursor(cursor) if cursor else None
+    pushed, pulled = await _followed_authors(session, user_id)
+    if not pushed and not pulled:
+        return {"items": [], "next_cursor": None}
+
+    redis = get_redis()
+    if redis is None:
+        return await _following_feed_sql(session, pushed + pulled, position, limit)
+
+    try:
+        key = f"{TIMELINE_PREFIX}{user_id}"
+        if await redis.expire(key, settings.FEED_TIMELINE_TTL):
+            truncated = await redis.zcard(key) >= settings.FEED_TIMELINE_MAX
+        else:
+            truncated = await _build_timeline(session, key, pushed)
+        return await _following_feed_timeline(
+            session, key, pushed + pulled, pulled, truncated, position, limit
+        )
+    except Exception as e:
+        logger.warning(f"Timeline read failed for user {user_id}, using database: {e}")
+        return await _following_feed_sql(session, pushed + pulled, position, limit)
+
+
+async def _following_feed_sql(
+    session: AsyncSession,
+    author_ids: List[int],
+    position: Optional[Position],
+    limit: int
+) -> Dict:
+    """
+    Fan-out on read for every followed author
+    """
+    query = visible_posts_query(limit + 1).where(SocialPost.user_id.in_(author_ids))
+    if position:
+        query = query.where(_before(position))
+    result = await session.execute(query)
+    return _page(_cards(result), limit)
+
+
+async def _following_feed_timeline(
+    session: AsyncSession,
+    key: str,
+    authors: List[int],
+    pulled: List[int],
+    truncated: bool,
+    position: Optional[Position],
+    limit: int
+) -> Dict:
+    """
+    Merge the precomputed timeline with posts from pulled authors
+
+    The timeline is read in windows. Each window bounds a single query
+    that loads the window's posts together with pulled authors' posts in
+    the same range, so no post is skipped or repeated across windows.
+    Readers scrolling past the end of a truncated timeline continue from
+    the database.
+    """
+    redis = get_redis()
+    window_size = 2 * (limit + 1)
+    posts: List[PostCard] = []
+    from_database = False
+
+    while len(posts) <= limit:
+        entries, exhausted = await _timeline_window(redis, key, position, window_size)
+        if not entries and truncated:
+            from_database = True
+            break
+
+        floor = entries[-1] if entries and (not exhausted or truncated) else None
+        sources = []
+        if entries:
+            sources.append(SocialPost.id.in_([post_id for _, post_id in entries]))
+        if pulled:
+            sources.append(SocialPost.user_id.in_(pulled))
+        if sources:
+            query = visible_posts_query(limit + 1 - len(posts)).where(or_(*sources))
+            if position:
+                query = query.where(_before(position))
+            if floor:
+                query = query.where(_not_before(floor))
+            result = await session.execute(query)
+            posts.extend(_cards(result))
+
+        if floor is None:
+            break
+        position = floor
+        if exhausted:
+            from_database = True
+            break
+
+    if from_database and len(posts) <= limit:
+        query = (
+            visible_posts_query(limit + 1 - len(posts))
+            .where(SocialPost.user_id.in_(authors))
+            .where(_before(position))
+        )
+        result = await session.execute(query)
+        posts.extend(_cards(result))
+
+    return _page(posts, limit)
+
+
+async def _timeline_window(
+    redis,
+    key: str,
+    position: Optional[Position],
+    size: int
+) -> Tuple[List[Position], bool]:
+    """
+    Up to size timeline entries older than position
+
+    Returns:
+        (entries, exhausted) where exhausted means the timeline has no
+        entries beyond this window
+    """
+    upper = "+inf" if position is None else position[0]
+    raw = await redis.zrevrangebyscore(key, upper, "-inf", start=0, num=size, withscores=True)
+    exhausted = len(raw) < size
+
+    entries = []
+    for member, score in raw:
+        if member == EMPTY_MARKER:
+            continue
+        entry = (int(score), int(member))
+        # Entries sharing the cursor's timestamp are ordered by post id
+        if position is not None and entry >= position:
+            continue
+        entries.append(entry)
+    entries.sort(reverse=True)
+    return entries, exhausted
+
+
+async def _build_timeline(session: AsyncSession, key: str, pushed: List[int]) -> bool:
+    """
+    Materialize a timeline from the database
+
+    Returns:
+        True if the timeline was truncated to FEED_TIMELINE_MAX posts
+    """
+    rows = []
+    if pushed:
+        result = await session.execute(
+            select(SocialPost.id, SocialPost.created_at)
+            .where(SocialPost.user_id.in_(pushed))
+            .where(visible_filter())
+            .order_by(SocialPost.created_at.desc(), SocialPost.id.desc())
+            .limit(settings.FEED_TIMELINE_MAX)
+        )
+        rows = result.all()
+
+    mapping = {str(post_id): _to_micros(created_at) for post_id, created_at in rows}
+    mapping[EMPTY_MARKER] = 0
+
+    redis = get_redis()
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        pipe.zadd(key, mapping)
+        pipe.expire(key, settings.FEED_TIMELINE_TTL)
+        await pipe.execute()
+    return len(rows) >= settings.FEED_TIMELINE_MAX
+
+
+async def fan_out_post(post_id: int) -> None:
+    """
+    Push a new post to its author's followers' timelines
+
+    Runs as a background task after a dream is shared. Authors above
+    FEED_FANOUT_THRESHOLD followers are skipped (their posts are pulled at
+    read time), as are followers without a materialized timeline.
+    """
+    redis = get_redis()
+    if redis is None:
+        return
+
+    try:
+        async with AsyncSessionLocal() as session:
+            post = await session.get(SocialPost, post_id)
+            if post is None:
+                return
+            author = await session.get(User, post.user_id)
+            if (author.followers_count or 0) >= settings.FEED_FANOUT_THRESHOLD:
+                return
+
+            score = _to_micros(post.created_at)
+            result = await session.stream_scalars(
+                select(Follow.follower_id).where(Follow.followee_id == post.user_id)
+            )
+            async for follower_ids in result.partitions(settings.FEED_FANOUT_BATCH_SIZE):
+                await _push_to_timelines(redis, follower_ids, post_id, score)
+    except Exception as e:
+        logger.error(f"Fan-out of post {post_id} failed: {e}")
+
+
+async def _push_to_timelines(redis, follower_ids: Sequence[int], post_id: int, score: int) -> None:
+    keys = [f"{TIMELINE_PREFIX}{follower_id}" for follower_id in follower_ids]
+    push = redis.register_script(_PUSH_SCRIPT)
+    await push(keys=keys, args=[post_id, score, settings.FEED_TIMELINE_MAX])
+
+
+async def invalidate_timeline(user_id: int) -> None:
+    """
+    Drop a user's timeline so it is rebuilt on the next read
+    """
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.delete(f"{TIMELINE_PREFIX}{user_id}")
+    except Exception as e:
+        logger.warning(f"Could not invalidate timeline for user {user_id}: {e}")
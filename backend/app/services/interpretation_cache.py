@@ -0,0 +1,281 @@
+"""
+Interpretation Cache - Avoids re-generating interpretations for repeated dreams
+
+Two tiers:
+- Exact match on a hash of the normalized prompt, model and sampling options
+- Optional similarity match on dream text embeddings above a threshold
+
+Entries are stored in Redis when available, with an in-process LRU that
+serves as both a near cache and the fallback when Redis is down. Embeddings
+for the similarity tier are indexed in-process only, as unit-length
+float32 vectors grouped by namespace, so a lookup is one matrix-vector
+product over the entries of its namespace.
+"""
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so trivially different submissions share a cache key
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_cache_key(*parts) -> str:
+    """
+    Build a stable hash from JSON-serializable key parts
+    """
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def unit_vector(vector: List[float]) -> Optional[np.ndarray]:
+    """
+    Float32 copy of a vector scaled to unit length, or None for a zero vector
+    """
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else None
+
+
+class LRUCache:
+    """
+    In-process LRU cache with per-entry TTL
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class InterpretationCache:
+    """
+    Two-tier (exact + similarity) cache for generated interpretations
+    """
+
+    KEY_PREFIX = "interp:cache:"
+
+    def __init__(self):
+        self.enabled = settings.INTERPRETATION_CACHE_ENABLED
+        self.ttl = settings.INTERPRETATION_CACHE_TTL
+        self.similarity_enabled = settings.INTERPRETATION_CACHE_SIMILARITY_ENABLED
+        self.similarity_threshold = settings.INTERPRETATION_CACHE_SIMILARITY_THRESHOLD
+
+        self._local = LRUCache(settings.INTERPRETATION_CACHE_MAX_ENTRIES, self.ttl)
+
+        # Similarity index, bounded like the LRU: cache key -> namespace in
+        # insertion order, unit vectors per namespace, and each namespace's
+        # vectors stacked into a matrix (rebuilt after the namespace changes)
+        self._vectors: "OrderedDict[str, str]" = OrderedDict()
+        self._index: Dict[str, Dict[str, np.ndarray]] = {}
+        self._matrices: Dict[str, Tuple[List[str], np.ndarray]] = {}
+
+        self._stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0, "stores": 0, "redis_errors": 0}
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """
+        Exact-match lookup
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            The cached interpretation result, or None on miss
+        """
+        if not self.enabled:
+            return None
+
+        value = self._local.get(key)
+        if value is None:
+            value = await self._redis_get(key)
+            if value is not None:
+                self._local.set(key, value)
+
+        if value is not None:
+            self._stats["exact_hits"] += 1
+        return value
+
+    async def get_similar(self, namespace: str, embedding: List[float]) -> Optional[Dict]:
+        """
+        Similarity lookup among entries sharing the same namespace
+
+        Args:
+            namespace: Hash of everything except the dream text (model,
+                options, context) so only comparable entries are matched
+            embedding: Embedding of the normalized dream text
+
+        Returns:
+            The closest cached result above the threshold, or None
+        """
+        if not (self.enabled and self.similarity_enabled):
+            return None
+
+        query = unit_vector(embedding)
+        if query is None or namespace not in self._index:
+            return None
+
+        keys, matrix = self._matrix(namespace)
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        best_key = keys[best]
+        value = self._local.get(best_key) or await self._redis_get(best_key)
+        if value is not None:
+            self._stats["similar_hits"] += 1
+            return value
+        # Entry expired; drop its vector
+        self._forget_vector(best_key)
+        return None
+
+    def _matrix(self, namespace: str) -> Tuple[List[str], np.ndarray]:
+        """
+        Keys and stacked unit vectors of a namespace's entries
+        """
+        matrix = self._matrices.get(namespace)
+        if matrix is None:
+            entries = self._index[namespace]
+            matrix = (list(entries), np.stack(list(entries.values())))
+            self._matrices[namespace] = matrix
+        return matrix
+
+    def _index_vector(self, key: str, namespace: str, vector: np.ndarray) -> None:
+        self._forget_vector(key)
+        self._vectors[key] = namespace
+        self._index.setdefault(namespace, {})[key] = vector
+        self._matrices.pop(namespace, None)
+
+    def _forget_vector(self, key: str) -> None:
+        namespace = self._vectors.pop(key, None)
+        if namespace is None:
+            return
+        entries = self._index[namespace]
+        del entries[key]
+        if not entries:
+            del self._index[namespace]
+        self._matrices.pop(namespace, None)
+
+    def record_miss(self) -> None:
+        """
+        Count a lookup that fell through every tier
+        """
+        self._stats["misses"] += 1
+
+    async def set(
+        self,
+        key: str,
+        value: Dict,
+        namespace: Optional[str] = None,
+        embedding: Optional[List[float]] = None
+    ) -> None:
+        """
+        Store a result, optionally indexing its embedding for similarity lookups
+        """
+        if not self.enabled:
+            return
+
+        self._local.set(key, value)
+        self._stats["stores"] += 1
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(self.KEY_PREFIX + key, json.dumps(value), ex=self.ttl)
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Interpretation cache write failed: {e}")
+
+        vector = unit_vector(embedding) if self.similarity_enabled and namespace and embedding else None
+        if vector is not None:
+            self._index_vector(key, namespace, vector)
+            while len(self._vectors) > self._local.max_entries:
+                self._forget_vector(next(iter(self._vectors)))
+
+    async def clear(self) -> None:
+        """
+        Drop all local entries and vectors (Redis entries expire via TTL)
+        """
+        self._local.clear()
+        self._vectors.clear()
+        self._index.clear()
+        self._matrices.clear()
+
+    async def _redis_get(self, key: str) -> Optional[Dict]:
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(self.KEY_PREFIX + key)
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            logger.warning(f"Interpretation cache read failed: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    def get_stats(self) -> Dict:
+        """
+        Hit/miss counters and ratios for tuning TTL and similarity threshold
+        """
+        hits = self._stats["exact_hits"] + self._stats["similar_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "backend": "redis+lru" if get_redis() is not None else "lru",
+            "similarity_enabled": self.similarity_enabled,
+            "similarity_threshold": self.similarity_threshold,
+            **self._stats,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "exact_hit_ratio": round(self._stats["exact_hits"] / lookups, 3) if lookups else 0.0,
+            "local_entries": len(self._local),
+            "local_evictions": self._local.evictions,
+            "indexed_vectors": len(self._vectors),
+        }
+
+
+# Singleton instance
+interpretation_cache = InterpretationCache()
@@ -0,0 +1,292 @@
+"""
+Interpretation Jobs - Background interpretation pipeline
+
+Submitting a job creates a PENDING row in the interpretations table and
+returns immediately. A pool of asyncio workers runs the Ollama generation,
+moves the row to IN_PROGRESS and then COMPLETED with the result, so API
+latency no longer depends on LLM latency. The table is the durable job
+state: rows left PENDING by a restart, or IN_PROGRESS for longer than
+INTERPRETATION_JOB_LEASE seconds, are picked up again at startup.
+
+A worker claims a job with a single UPDATE of a row selected FOR UPDATE
+SKIP LOCKED, so when several processes queue the same job only one runs
+it. A claim lasts INTERPRETATION_JOB_LEASE seconds; the row's updated_at
+is the claim time.
+"""
+import asyncio
+from datetime import timedelta
+from typing import Dict, Optional
+
+from loguru import logger
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.dream import Dream, DreamType
+from app.models.interpretation import Interpretation, InterpretationStatus, InterpretationType
+from app.repositories import interpretations, profiles
+from app.services.ollama_service import ollama_service
+from app.services.scheduler import Priority, SchedulerOverloaded
+from app.services.structured_output import section_columns
+
+
+def claimable():
+    """
+    Jobs a worker may claim: PENDING, or IN_PROGRESS with an expired claim
+    """
+    expired = func.localtimestamp() - timedelta(seconds=settings.INTERPRETATION_JOB_LEASE)
+    return or_(
+        Interpretation.status == InterpretationStatus.PENDING,
+        and_(
+            Interpretation.status == InterpretationStatus.IN_PROGRESS,
+            Interpretation.updated_at < expired,
+        ),
+    )
+
+
+def dream_context(dream: Dream) -> Optional[Dict]:
+    """
+    Build the interpretation context from a stored dream
+    """
+    context = {}
+    if dream.emotions:
+        context["emotions"] = ", ".join(dream.emotions)
+    if dream.symbols:
+        context["symbols"] = ", ".join(dream.symbols)
+    if dream.time_of_day:
+        context["time_of_day"] = dream.time_of_day
+    return context if context else None
+
+
+async def interpret_stored_dream(
+    dream: Dream,
+    priority: Priority = Priority.NORMAL,
+    use_cache: bool = True
+) -> Dict:
+    """
+    Run the interpretation matching a stored dream's type
+
+    Regular dreams are interpreted in structured mode so their sections
+    can be stored in the interpretation columns. With use_cache=False a
+    new interpretation is generated even if an identical dream is cached.
+
+    Raises:
+        SchedulerOverloaded: If Ollama is saturated and the queue is full
+    """
+    if dream.dream_type == DreamType.ISTIKHARA and dream.istikhara_decision:
+        return await ollama_service.interpret_istikhara(
+            dream_text=dream.description,
+            decision_context=dream.istikhara_decision,
+            priority=priority
+        )
+    return await ollama_service.interpret_dream(
+        dream_text=dream.description,
+        context=dream_context(dream),
+        priority=priority,
+        structured=True,
+        use_cache=use_cache
+    )
+
+
+class InterpretationJobQueue:
+    """
+    In-process worker pool for interpretation jobs
+    """
+
+    def __init__(self, workers: int = settings.INTERPRETATION_JOB_WORKERS):
+        self.workers = workers
+        self._queue: "asyncio.Queue[int]" = asyncio.Queue()
+        self._tasks = []
+        self._done_events: Dict[int, asyncio.Event] = {}
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "requeued": 0, "skipped": 0}
+
+    async def start(self) -> None:
+        """
+        Start the workers and re-enqueue jobs interrupted by a restart
+
+        Another process may queue the same jobs; whichever claims a job
+        first runs it and the others skip it.
+        """
+        if self._tasks:
+            return
+
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Interpretation.id)
+                    .where(Interpretation.interpretation_type == InterpretationType.AI)
+                    .where(claimable())
+                    .order_by(Interpretation.id)
+                )
+                for job_id in result.scalars():
+                    self._queue.put_nowait(job_id)
+        except Exception as e:
+            logger.warning(f"Could not recover pending interpretation jobs: {e}")
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Cancel the workers; unfinished jobs stay in the table for the next start
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, session: AsyncSession, dream: Dream) -> Interpretation:
+        """
+        Create a PENDING interpretation for a dream and queue it
+
+        Args:
+            session: Database session used to insert the job row
+            dream: The dream to interpret
+
+        Returns:
+            The new Interpretation row; its id is the job id
+        """
+        job = Interpretation(
+            user_id=dream.user_id,
+            dream_id=dream.id,
+            interpretation_type=InterpretationType.AI,
+            interpretation_text="",
+            model_name=ollama_service.model,
+            status=InterpretationStatus.PENDING,
+        )
+        session.add(job)
+        await session.commit()
+
+        self._queue.put_nowait(job.id)
+        self._stats["submitted"] += 1
+        return job
+
+    async def wait(self, job_id: int, timeout: float) -> None:
+        """
+        Wait up to timeout seconds for a job handled by this process to finish
+        """
+        event = self._done_events.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if not event.is_set():
+                self._done_events.pop(job_id, None)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except SchedulerOverloaded as e:
+                # Ollama is saturated; back off and retry the job later
+                self._stats["requeued"] += 1
+                await asyncio.sleep(e.retry_after)
+                self._queue.put_nowait(job_id)
+            except Exception as e:
+                logger.error(f"Interpretation job {job_id} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _claim(self, session: AsyncSession, job_id: int) -> bool:
+        """
+        Move a job to IN_PROGRESS unless it is finished or claimed elsewhere
+        """
+        candidate = (
+            select(Interpretation.id)
+            .where(Interpretation.id == job_id)
+            .where(claimable())
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        claimed = await session.scalar(
+            update(Interpretation)
+            .where(Interpretation.id == candidate)
+            .values(status=InterpretationStatus.IN_PROGRESS)
+            .returning(Interpretation.id)
+        )
+        await session.commit()
+        return claimed is not None
+
+    async def _release(self, job_id: int, status: InterpretationStatus, text: Optional[str] = None) -> None:
+        """
+        Hand a claimed job back (PENDING) or give up on it (DECLINED)
+
+        Uses its own session, since the job's session may be unusable. If
+        this fails too, the claim expires and the next start retries it.
+        """
+        values = {"status": status}
+        if text is not None:
+            values["interpretation_text"] = text
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(Interpretation)
+                    .where(Interpretation.id == job_id)
+                    .where(Interpretation.status == InterpretationStatus.IN_PROGRESS)
+                    .values(**values)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Could not release interpretation job {job_id}: {e}")
+
+    async def _run(self, job_id: int) -> None:
+        claimed = False
+        try:
+            # The job's session is closed, releasing any row lock it holds,
+            # before the job is released
+            try:
+                async with AsyncSessionLocal() as session:
+                    claimed = await self._claim(session, job_id)
+                    if not claimed:
+                        self._stats["skipped"] += 1
+                        return
+                    job = await interpretations.get(session, job_id, profiles.INTERPRETATION_WITH_DREAM)
+                    await self._complete(session, job)
+            except SchedulerOverloaded:
+                await self._release(job_id, InterpretationStatus.PENDING)
+                raise
+            except Exception:
+                if claimed:
+                    self._stats["failed"] += 1
+                    await self._release(job_id, InterpretationStatus.DECLINED, "Failed to generate interpretation")
+                raise
+        finally:
+            event = self._done_events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    async def _complete(self, session: AsyncSession, job: Interpretation) -> None:
+        """
+        Generate a claimed job's interpretation and store the outcome
+        """
+        result = await interpret_stored_dream(job.dream)
+        if result.get("success"):
+            job.status = InterpretationStatus.COMPLETED
+            job.interpretation_text = result["interpretation"]
+            job.model_name = result.get("model")
+            job.confidence_score = result.get("confidence")
+            job.prompt_version = result.get("prompt_version")
+            for column, value in section_columns(result.get("sections") or {}).items():
+                setattr(job, column, value)
+        else:
+            # DECLINED marks an AI job that could not produce an interpretation
+            job.status = InterpretationStatus.DECLINED
+            job.interpretation_text = result.get("error") or "Failed to generate interpretation"
+        await session.commit()
+        self._stats["completed" if result.get("success") else "failed"] += 1
+
+    def get_stats(self) -> Dict:
+        """
+        Worker pool and job counters
+        """
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize(),
+            **self._stats,
+        }
+
+
+# Singleton instance
+interpretation_jobs = InterpretationJobQueue()
@@ -0,0 +1,330 @@
+"""
+Journal Transfer - Streaming import and export of dream journals
+
+Journals move as NDJSON (one JSON object per line) or CSV (a header row,
+list fields joined with ";"), with the fields of DreamCreate. Exports add
+each dream's id and created_at, which an import ignores, so an export can
+be imported again as is.
+
+Neither direction holds a whole journal in memory. An import decodes the
+request body as it arrives, validates each record with DreamCreate and
+inserts valid dreams JOURNAL_IMPORT_BATCH_SIZE at a time, one multi-row
+INSERT and commit per batch; invalid records are counted and skipped. An
+export reads the journal through a server-side cursor,
+JOURNAL_EXPORT_BATCH_SIZE rows per round trip, and yields each batch as
+a chunk of the response.
+"""
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, List, Tuple
+
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.dream import Dream, DreamPrivacy, DreamType
+from app.schemas.dream import DreamCreate
+from app.services.dream_analytics import dream_analytics
+from app.services.dream_embeddings import dream_index
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Columns of an import, in CSV header order
+IMPORT_FIELDS = list(DreamCreate.model_fields)
+EXPORT_FIELDS = ["id", *IMPORT_FIELDS, "created_at"]
+
+# CSV cells of these fields hold a ";"-separated list
+LIST_FIELDS = {"emotions", "symbols", "colors", "people", "tags"}
+LIST_SEPARATOR = ";"
+
+
+async def _lines(chunks: AsyncIterator[bytes], max_length: int) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Numbered lines of a UTF-8 byte stream, without line endings
+
+    Raises:
+        ValueError: If the stream is not UTF-8 or a line exceeds max_length
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip("\r")
+        if len(pending) > max_length:
+            raise ValueError(f"Line {line_no + 1} is longer than {max_length} characters")
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield line_no + 1, pending.rstrip("\r")
+
+
+async def _ndjson_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[Tuple[int, object]]:
+    """
+    (line number, record) per non-blank line; a malformed line yields its
+    ValueError as the record
+    """
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+        except ValueError as e:
+            record = e
+        yield line_no, record
+
+
+async def _csv_records(
+    lines: AsyncIterator[Tuple[int, str]],
+    max_length: int
+) -> AsyncIterator[Tuple[int, object]]:
+    """
+    (first line number, record) per CSV row after the header; a quoted
+    cell may span lines. A malformed row yields its ValueError as the
+    record
+    """
+    header = None
+    row_lines: List[str] = []
+    start = quotes = size = 0
+    async for line_no, line in lines:
+        if not row_lines:
+            if not line.strip():
+                continue
+            start = line_no
+        row_lines.append(line)
+        quotes += line.count('"')
+        size += len(line)
+        if size > max_length:
+            raise ValueError(f"Row at line {start} is longer than {max_length} characters")
+        if quotes % 2:
+            # Inside a quoted cell; "" escapes keep the count even
+            continue
+
+        try:
+            cells = next(csv.reader(["\n".join(row_lines)]))
+        except csv.Error as e:
+            cells = ValueError(f"Malformed CSV: {e}")
+        row_lines, quotes, size = [], 0, 0
+
+        if header is None:
+            if isinstance(cells, ValueError):
+                raise cells
+            header = [name.strip() for name in cells]
+            continue
+        if isinstance(cells, ValueError):
+            yield start, cells
+        elif len(cells) > len(header):
+            yield start, ValueError(f"Expected {len(header)} cells, got {len(cells)}")
+        else:
+            yield start, {
+                name: _csv_value(name, cell) for name, cell in zip(header, cells)
+            }
+
+    if row_lines:
+        raise ValueError(f"Unterminated quoted cell in row at line {start}")
+
+
+def _csv_value(name: str, cell: str):
+    if cell == "":
+        return None
+    if name in LIST_FIELDS:
+        return [item.strip() for item in cell.split(LIST_SEPARATOR) if item.strip()]
+    return cell
+
+
+def dream_row(record: Dict, user_id: int) -> Dict:
+    """
+    Validate an imported record and build its dreams row
+
+    Raises:
+        ValueError: If the record is not a valid dream
+    """
+    try:
+        dream = DreamCreate.model_validate(record)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}"
+            for error in e.errors()
+        ))
+    row = dream.model_dump()
+    for field, enum_class in (("dream_type", DreamType), ("privacy", DreamPrivacy)):
+        try:
+            row[field] = enum_class(row[field])
+        except ValueError:
+            raise ValueError(f"{field}: expected one of {', '.join(member.value for member in enum_class)}")
+    row["user_id"] = user_id
+    return row
+
+
+async def _insert(session: AsyncSession, rows: List[Dict]) -> int:
+    """
+    Insert and commit one batch of dreams, queueing them for embedding
+
+    Inserts go through Core, not the ORM, so the embedding index is told
+    about them here rather than by its session hooks.
+    """
+    if not rows:
+        return 0
+    ids = list(await session.scalars(insert(Dream).returning(Dream.id), rows))
+    await session.commit()
+    dream_index.mark(ids)
+    return len(ids)
+
+
+async def import_dreams(
+    session: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    user_id: int,
+    fmt: str = "ndjson",
+    batch_size: int = settings.JOURNAL_IMPORT_BATCH_SIZE
+) -> Dict:
+    """
+    Stream dreams into a user's journal
+
+    Each batch is committed as it fills, so dreams inserted before a
+    failure stay imported; the result says how far the import got.
+
+    Args:
+        session: Database session
+        chunks: Request body
+        user_id: The journal's owner
+        fmt: "ndjson" or "csv"
+        batch_size: Dreams per INSERT
+
+    Returns:
+        {"imported", "failed", "errors": [{"line", "error"}, ...], "complete"}
+        with up to JOURNAL_IMPORT_MAX_ERRORS errors listed; "complete" is
+        false if the body could not be read to the end or exceeded
+        JOURNAL_IMPORT_MAX_DREAMS
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+    max_length = settings.JOURNAL_IMPORT_MAX_LINE_LENGTH
+    lines = _lines(chunks, max_length)
+    records = _ndjson_records(lines) if fmt == "ndjson" else _csv_records(lines, max_length)
+
+    imported = failed = 0
+    errors: List[Dict] = []
+    batch: List[Dict] = []
+    complete = True
+
+    def reject(line_no: int, error: str) -> None:
+        if len(errors) < settings.JOURNAL_IMPORT_MAX_ERRORS:
+            errors.append({"line": line_no, "error": error})
+
+    try:
+        async for line_no, record in records:
+            if imported + len(batch) + failed >= settings.JOURNAL_IMPORT_MAX_DREAMS:
+                reject(line_no, f"Import stopped after {settings.JOURNAL_IMPORT_MAX_DREAMS} records")
+                complete = False
+                break
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                batch.append(dream_row(record, user_id))
+            except ValueError as e:
+                failed += 1
+                reject(line_no, str(e))
+                continue
+
+            if len(batch) >= batch_size:
+                imported += await _insert(session, batch)
+                batch = []
+    except ValueError as e:
+        # The body itself is unreadable; keep what was parsed before it
+        reject(None, str(e))
+        complete = False
+
+    imported += await _insert(session, batch)
+    if imported:
+        await dream_analytics.invalidate(user_id)
+    logger.info(f"Imported {imported} dreams for user {user_id} ({failed} rejected)")
+    return {"imported": imported, "failed": failed, "errors": errors, "complete": complete}
+
+
+def export_query(user_id: int):
+    """
+    A user's dreams in id order, with the exported columns
+    """
+    return (
+        select(*(getattr(Dream, field) for field in EXPORT_FIELDS))
+        .where(Dream.user_id == user_id)
+        .order_by(Dream.id)
+    )
+
+
+def _export_record(row) -> Dict:
+    record = dict(row._mapping)
+    record["dream_type"] = record["dream_type"].value if record["dream_type"] else None
+    record["privacy"] = record["privacy"].value if record["privacy"] else None
+    record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+    return record
+
+
+def _csv_cell(name: str, value):
+    if value is None:
+        return ""
+    if name in LIST_FIELDS:
+        return LIST_SEPARATOR.join(str(item) for item in value)
+    return value
+
+
+async def export_dreams(
+    user_id: int,
+    fmt: str = "ndjson",
+    batch_size: int = settings.JOURNAL_EXPORT_BATCH_SIZE
+) -> AsyncIterator[str]:
+    """
+    Stream a user's journal, one chunk per batch of dreams
+
+    Opens its own session, since a request-scoped session is closed once
+    a streamed response starts.
+
+    Args:
+        user_id: The journal's owner
+        fmt: "ndjson" or "csv"
+        batch_size: Rows fetched per cursor round trip
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(EXPORT_FIELDS)
+
+    exported = 0
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(export_query(user_id).execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            for row in rows:
+                record = _export_record(row)
+                if fmt == "ndjson":
+                    buffer.write(json.dumps(record, ensure_ascii=False) + "\n")
+                else:
+                    writer.writerow([_csv_cell(name, record[name]) for name in EXPORT_FIELDS])
+            exported += len(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        # CSV header of an empty journal
+        yield buffer.getvalue()
+    logger.info(f"Exported {exported} dreams for user {user_id}")
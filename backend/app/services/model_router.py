@@ -0,0 +1,114 @@
+"""
+Model Router - Picks the Ollama model for each interpretation
+
+Models are grouped into tiers: a small fast model for short dreams, the
+default model, and a larger model for long dreams and Istikhara, where a
+better answer is worth the extra latency. The tier is chosen with a cheap
+heuristic on the request (dream length and interpretation type) and can be
+overridden by the caller, e.g. for a user's plan. Tiers without a
+configured model fall back to OLLAMA_MODEL, so with no routing settings
+every request uses one model as before.
+
+Each tier also has a context window (num_ctx). Ollama reloads a model
+whenever num_ctx changes, so a model shared by several tiers always gets
+the largest of their windows.
+"""
+import enum
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+
+class ModelTier(str, enum.Enum):
+    """Model size classes"""
+    FAST = "fast"
+    STANDARD = "standard"
+    LARGE = "large"
+
+
+class ModelRouter:
+    """
+    Maps requests to a model tier and tiers to model names
+    """
+
+    def __init__(
+        self,
+        default_model: str = settings.OLLAMA_MODEL,
+        fast_model: Optional[str] = settings.OLLAMA_FAST_MODEL,
+        large_model: Optional[str] = settings.OLLAMA_LARGE_MODEL,
+        fast_max_chars: int = settings.OLLAMA_FAST_MAX_CHARS,
+        large_min_chars: int = settings.OLLAMA_LARGE_MIN_CHARS,
+        context_sizes: Optional[Dict[ModelTier, int]] = None
+    ):
+        self.models = {
+            ModelTier.FAST: fast_model or default_model,
+            ModelTier.STANDARD: default_model,
+            ModelTier.LARGE: large_model or default_model,
+        }
+        self.context_sizes = context_sizes or {
+            ModelTier.FAST: settings.OLLAMA_NUM_CTX_FAST,
+            ModelTier.STANDARD: settings.OLLAMA_NUM_CTX_STANDARD,
+            ModelTier.LARGE: settings.OLLAMA_NUM_CTX_LARGE,
+        }
+        self.fast_max_chars = fast_max_chars
+        self.large_min_chars = large_min_chars
+        self._routed = {tier.value: 0 for tier in ModelTier}
+
+    @property
+    def distinct_models(self) -> List[str]:
+        """
+        Every model a request can be routed to, without duplicates
+        """
+        return list(dict.fromkeys(self.models.values()))
+
+    def num_ctx(self, model: str) -> int:
+        """
+        Context window for a model, the largest of the tiers that use it
+        """
+        return max(
+            (size for tier, size in self.context_sizes.items() if self.models[tier] == model),
+            default=self.context_sizes[ModelTier.STANDARD]
+        )
+
+    def tier_for(self, dream_text: str, istikhara: bool = False) -> ModelTier:
+        """
+        Complexity heuristic: Istikhara and long dreams need the large model,
+        short dreams are answered well enough by the fast one
+        """
+        length = len(dream_text)
+        if istikhara or length >= self.large_min_chars:
+            return ModelTier.LARGE
+        if length <= self.fast_max_chars:
+            return ModelTier.FAST
+        return ModelTier.STANDARD
+
+    def route(
+        self,
+        dream_text: str,
+        istikhara: bool = False,
+        tier: Optional[ModelTier] = None
+    ) -> str:
+        """
+        Model to use for a request
+
+        Args:
+            dream_text: The dream description
+            istikhara: Whether this is an Istikhara interpretation
+            tier: Explicit tier, overriding the heuristic
+
+        Returns:
+            Ollama model name
+        """
+        tier = tier or self.tier_for(dream_text, istikhara)
+        self._routed[tier.value] += 1
+        return self.models[tier]
+
+    def get_stats(self) -> Dict:
+        """
+        Tier-to-model mapping, context windows and requests routed per tier
+        """
+        return {
+            "models": {tier.value: model for tier, model in self.models.items()},
+            "num_ctx": {model: self.num_ctx(model) for model in self.distinct_models},
+            "routed": dict(self._routed),
+        }
@@ -0,0 +1,175 @@
+"""
+Ollama Balancer - Routes requests across several Ollama hosts
+
+Each request goes to the healthy node with the fewest outstanding
+requests. A background prober checks every node periodically, ejecting
+nodes after repeated failures and re-admitting them once they answer
+again. Request failures count towards ejection as well, so a dead node is
+taken out of rotation without waiting for the next probe, and a retried
+request goes to a node it has not tried yet.
+"""
+import asyncio
+import statistics
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Awaitable, Collection, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+class OllamaNode:
+    """
+    One Ollama host with its routing state and statistics
+    """
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.healthy = True
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.avg_latency: Optional[float] = None  # EWMA, seconds
+        self.last_error: Optional[str] = None
+        self.last_checked: Optional[float] = None
+
+    def record_success(self, latency: float) -> None:
+        self.consecutive_failures = 0
+        self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+
+    def record_failure(self, error: str, eject_after: int) -> None:
+        self.errors += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.healthy and self.consecutive_failures >= eject_after:
+            self.healthy = False
+            logger.warning(f"Ejecting Ollama node {self.url}: {error}")
+
+    def readmit(self) -> None:
+        if not self.healthy:
+            logger.info(f"Re-admitting Ollama node {self.url}")
+        self.healthy = True
+        self.consecutive_failures = 0
+
+    def get_stats(self) -> Dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_failures": self.consecutive_failures,
+            "avg_latency_ms": round(self.avg_latency * 1000, 1) if self.avg_latency is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class OllamaBalancer:
+    """
+    Least-outstanding-requests routing with health-aware node ejection
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        eject_after: int = settings.OLLAMA_EJECT_AFTER_FAILURES,
+        probe_interval: float = settings.OLLAMA_HEALTH_CHECK_INTERVAL
+    ):
+        self.nodes = [OllamaNode(url) for url in urls]
+        self.eject_after = eject_after
+        self.probe_interval = probe_interval
+        self._prober: Optional[asyncio.Task] = None
+
+    def pick(self, exclude: Collection[str] = ()) -> OllamaNode:
+        """
+        Choose the node for the next request
+
+        Healthy nodes are preferred, and nodes whose URLs are in exclude
+        (already tried for this request) are skipped while there is
+        another choice. If every node is ejected, all of them are
+        considered so requests still get a chance to reach a recovered host.
+        Nodes without latency samples rank at the median of the others, so
+        a new or re-admitted node does not take all the traffic.
+        """
+        healthy = [node for node in self.nodes if node.healthy] or self.nodes
+        candidates = [node for node in healthy if node.url not in exclude] or healthy
+        known = [node.avg_latency for node in self.nodes if node.avg_latency is not None]
+        unknown_latency = statistics.median(known) if known else 0.0
+        return min(
+            candidates,
+            key=lambda node: (
+                node.outstanding,
+                unknown_latency if node.avg_latency is None else node.avg_latency,
+            )
+        )
+
+    @asynccontextmanager
+    async def route(self, exclude: Collection[str] = ()) -> AsyncIterator[OllamaNode]:
+        """
+        Hold a node for one request and record its outcome
+
+        Args:
+            exclude: URLs of nodes to avoid, e.g. those a retried request
+                already failed on
+        """
+        node = self.pick(exclude)
+        node.outstanding += 1
+        node.requests += 1
+        started = time.perf_counter()
+        try:
+            yield node
+        except Exception as e:
+            node.record_failure(str(e) or type(e).__name__, self.eject_after)
+            raise
+        else:
+            node.record_success(time.perf_counter() - started)
+        finally:
+            node.outstanding -= 1
+
+    async def probe(self, check: Callable[[str], Awaitable[bool]]) -> bool:
+        """
+        Check every node once, ejecting or re-admitting as needed
+
+        Args:
+            check: Coroutine function returning True if the node at a URL is up
+
+        Returns:
+            True if at least one node is healthy
+        """
+        results = await asyncio.gather(*(check(node.url) for node in self.nodes))
+        for node, ok in zip(self.nodes, results):
+            node.last_checked = time.time()
+            if ok:
+                node.readmit()
+            else:
+                node.record_failure("health check failed", self.eject_after)
+        return any(node.healthy for node in self.nodes)
+
+    def start_prober(self, check: Callable[[str], Awaitable[bool]]) -> None:
+        """
+        Start probing nodes in the background every probe_interval seconds
+        """
+        if self._prober is None and self.probe_interval > 0:
+            self._prober = asyncio.create_task(self._probe_loop(check))
+
+    async def stop_prober(self) -> None:
+        if self._prober is not None:
+            self._prober.cancel()
+            await asyncio.gather(self._prober, return_exceptions=True)
+            self._prober = None
+
+    async def _probe_loop(self, check: Callable[[str], Awaitable[bool]]) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await self.probe(check)
+            except Exception as e:
+                logger.error(f"Ollama health probe failed: {e}")
+
+    def get_stats(self) -> List[Dict]:
+        """
+        Per-node routing and health statistics
+        """
+        return [node.get_stats() for node in self.nodes]
@@ -1,11 +1,58 @@
 """
 Ollama Service - Handles communication with local Ollama LLM for dream interpretation
 """
+import asyncio
+import json
+import random
+import time
 import httpx
-from typing import Dict, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from loguru import logger
 
 from app.core.config import settings
+from app.services.model_router import ModelRouter, ModelTier
+from app.services.interpretation_cache import (
+    interpretation_cache,
+    make_cache_key,
+    normalize_text,
+)
+from app.services.circuit_breaker import CircuitBreaker, RetryBudget
+from app.services.ollama_balancer import OllamaBalancer
+from app.services.prompt_templates import (
+    DREAM_TEMPLATE,
+    ISTIKHARA_TEMPLATE,
+    STRUCTURED_DREAM_TEMPLATE,
+    PromptTemplate,
+    render_context,
+    render_references,
+)
+from app.services.scheduler import GenerationScheduler, Priority, SchedulerOverloaded
+from app.services.single_flight import SingleFlight
+from app.services.structured_output import INTERPRETATION_SCHEMA, StreamingJSONParser, parse_sections
+from app.services.symbol_dictionary import symbol_dictionary
+from app.services.token_budget import TokenUsageStats, dream_token_budget, truncate_text
+
+
+class OllamaError(Exception):
+    """
+    Raised when Ollama answers a request with an error status
+    """
+
+
+# Failures where the request never reached Ollama, so retrying is safe
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _http2_available() -> bool:
+    """
+    HTTP/2 support in httpx requires the optional h2 package
+    """
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
 
 
 class OllamaService:
@@ -13,76 +60,559 @@ class OllamaService:
     Service class for interacting with Ollama API
     """
 
+    # Sampling options and generation budget per interpretation type;
+    # num_ctx is added per model by _budget()
+    DREAM_OPTIONS = {
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "num_predict": settings.OLLAMA_NUM_PREDICT_DREAM,
+    }
+    STRUCTURED_DREAM_OPTIONS = {
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "num_predict": settings.OLLAMA_NUM_PREDICT_STRUCTURED,
+    }
+    ISTIKHARA_OPTIONS = {
+        "temperature": 0.6,  # Lower temperature for more focused responses
+        "top_p": 0.85,
+        "num_predict": settings.OLLAMA_NUM_PREDICT_ISTIKHARA,
+    }
+
     def __init__(self):
-        self.base_url = settings.OLLAMA_HOST
+        # Requests are balanced across all configured hosts; base_url is the primary
+        self.balancer = OllamaBalancer(settings.OLLAMA_HOSTS or [settings.OLLAMA_HOST])
+        self.base_url = self.balancer.nodes[0].url
         self.model = settings.OLLAMA_MODEL
         self.timeout = settings.OLLAMA_TIMEOUT
 
+        # Chooses the model tier per request; self.model is the default tier
+        self.router = ModelRouter()
+        self._preloaded: List[str] = []
+
+        # Prompt/completion token counts and durations reported by Ollama
+        self.token_usage = TokenUsageStats()
+
+        # Shared connection pool, created in startup() and closed in shutdown()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._http2 = False
+
+        # Coalesces concurrent generations for the same prompt key
+        self._inflight = SingleFlight()
+
+        # Caps concurrent generations and queues the rest by priority
+        self.scheduler = GenerationScheduler()
+
+        # Fails fast while Ollama is down; retries are capped by a budget
+        self.breaker = CircuitBreaker()
+        self.retry_budget = RetryBudget()
+
+        # Pool utilization counters
+        self._requests_total = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    async def startup(self) -> None:
+        """
+        Create the shared pooled HTTP client used for all Ollama calls
+        """
+        if self._client is not None:
+            return
+
+        self._http2 = settings.OLLAMA_HTTP2 and _http2_available()
+        if settings.OLLAMA_HTTP2 and not self._http2:
+            logger.info("h2 package not installed, using HTTP/1.1 for Ollama")
+
+        self._client = httpx.AsyncClient(
+            # Connecting should be quick; only generation needs the long read timeout
+            timeout=httpx.Timeout(
+                self.timeout,
+                connect=settings.OLLAMA_CONNECT_TIMEOUT,
+                pool=settings.OLLAMA_POOL_TIMEOUT,
+            ),
+            http2=self._http2,
+            limits=httpx.Limits(
+                max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OLLAMA_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self.balancer.start_prober(self._check_node)
+
+    async def preload_models(self) -> List[str]:
+        """
+        Load every routed model on every node so first requests don't wait
+
+        Ollama loads a model when asked to generate with no prompt; keep_alive
+        then keeps it resident between requests (for ever with "-1m").
+
+        Returns:
+            Models that were loaded on at least one node
+        """
+        client = await self._get_client()
+
+        async def load(base_url: str, model: str) -> Optional[str]:
+            try:
+                response = await client.post(
+                    f"{base_url}/api/generate",
+                    json={
+                        "model": model,
+                        "keep_alive": settings.OLLAMA_KEEP_ALIVE,
+                        # Load with the window requests will use, or the first one reloads it
+                        "options": {"num_ctx": self.router.num_ctx(model)},
+                    },
+                )
+                if response.status_code == 200:
+                    return model
+                logger.warning(f"Could not preload {model} on {base_url}: {response.status_code}")
+            except httpx.HTTPError as e:
+                logger.warning(f"Could not preload {model} on {base_url}: {e}")
+            return None
+
+        results = await asyncio.gather(*(
+            load(node.url, model)
+            for node in self.balancer.nodes
+            for model in self.router.distinct_models
+        ))
+        self._preloaded = [model for model in self.router.distinct_models if model in results]
+        return self._preloaded
+
+    async def shutdown(self) -> None:
+        """
+        Close the shared HTTP client and release pooled connections
+        """
+        await self.balancer.stop_prober()
+        await self._inflight.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared client, creating it lazily if startup() was not called
+        """
+        if self._client is None:
+            await self.startup()
+        return self._client
+
+    @asynccontextmanager
+    async def _request_slot(
+        self,
+        tried: Optional[Set[str]] = None
+    ) -> AsyncIterator[Tuple[httpx.AsyncClient, str]]:
+        """
+        Yield the shared client and the base URL of the node chosen by the
+        balancer, tracking in-flight request counts
+
+        Exceptions raised inside the block count as failures of that node.
+
+        Args:
+            tried: Base URLs of nodes this request already used; the chosen
+                node is avoided if possible and then added to it
+        """
+        client = await self._get_client()
+        async with self.balancer.route(tried or ()) as node:
+            if tried is not None:
+                tried.add(node.url)
+            self._requests_total += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                yield client, node.url
+            finally:
+                self._in_flight -= 1
+
+    def get_pool_stats(self) -> Dict:
+        """
+        Connection pool utilization metrics
+
+        Returns:
+            Dictionary with configured limits, request counters and,
+            when available from the transport, open/idle connection counts
+        """
+        stats = {
+            "started": self._client is not None,
+            "http2": self._http2,
+            "max_connections": settings.OLLAMA_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+            "requests_total": self._requests_total,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "utilization": round(self._in_flight / settings.OLLAMA_MAX_CONNECTIONS, 3),
+        }
+
+        # httpcore does not expose pool state publicly; read it best-effort
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+
+        return stats
+
+    def get_resilience_stats(self) -> Dict:
+        """
+        Circuit breaker state and retry budget
+        """
+        return {
+            "circuit": self.breaker.get_stats(),
+            "retry_budget": self.retry_budget.get_stats(),
+        }
+
+    def get_single_flight_stats(self) -> Dict:
+        """
+        Request coalescing metrics
+        """
+        return self._inflight.get_stats()
+
+    def get_token_stats(self) -> Dict:
+        """
+        Token counts, durations and throughput per model
+        """
+        return self.token_usage.get_stats()
+
+    def get_routing_stats(self) -> Dict:
+        """
+        Model tiers, per-tier request counts and preloaded models
+        """
+        return {**self.router.get_stats(), "preloaded": self._preloaded}
+
+    def _generate_payload(
+        self,
+        prompt: str,
+        system: str,
+        options: Dict,
+        stream: bool = False,
+        output_format: Optional[Dict] = None,
+        model: Optional[str] = None
+    ) -> Dict:
+        """
+        Build the request body for Ollama's /api/generate endpoint
+
+        The static preamble goes in `system` so every request shares the same
+        prompt prefix, and keep_alive keeps the model (and that prefix) loaded.
+        An output_format JSON schema constrains the response to matching JSON.
+        """
+        payload = {
+            "model": model or self.model,
+            "system": system,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options,
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE,
+        }
+        if output_format is not None:
+            payload["format"] = output_format
+        return payload
+
     async def check_health(self) -> bool:
         """
         Check if Ollama service is running and accessible
+
+        Probes every configured node, updating which ones receive traffic.
+
+        Returns:
+            True if at least one node is healthy
+        """
+        return await self.balancer.probe(self._check_node)
+
+    async def _check_node(self, base_url: str) -> bool:
+        """
+        Check if the Ollama node at base_url is running and accessible
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/tags",
-                    timeout=5.0
-                )
-                return response.status_code == 200
+            client = await self._get_client()
+            response = await client.get(f"{base_url}/api/tags", timeout=5.0)
+            return response.status_code == 200
         except Exception as e:
-            logger.error(f"Ollama health check failed: {e}")
+            logger.error(f"Ollama health check failed for {base_url}: {e}")
             return False
 
+    async def _generate(
+        self,
+        prompt: str,
+        system: str,
+        options: Dict,
+        priority: Priority = Priority.NORMAL,
+        output_format: Optional[Dict] = None,
+        model: Optional[str] = None
+    ) -> Dict:
+        """
+        Run a non-streaming generation and return Ollama's parsed response
+
+        Connection failures are retried on another node with jittered
+        backoff while the retry budget allows.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            SchedulerOverloaded: If no generation slot could be obtained
+            OllamaError: If Ollama answers with a non-200 status
+            httpx.HTTPError: On connection failures and timeouts
+        """
+        self.breaker.before_request()
+        try:
+            async with self.scheduler.slot(priority):
+                self.retry_budget.record_request()
+                attempt = 0
+                tried: Set[str] = set()
+                while True:
+                    try:
+                        async with self._request_slot(tried) as (client, base_url):
+                            response = await client.post(
+                                f"{base_url}/api/generate",
+                                json=self._generate_payload(
+                                    prompt, system, options,
+                                    output_format=output_format, model=model
+                                )
+                            )
+                            self._check_response(response, base_url)
+                        break
+                    except RETRYABLE_ERRORS as e:
+                        if not self._may_retry(attempt):
+                            self.breaker.record_failure()
+                            raise
+                        attempt += 1
+                        logger.warning(f"Retrying Ollama generation (attempt {attempt}): {e}")
+                        await self._backoff(attempt)
+                    except (httpx.TransportError, OllamaError):
+                        self.breaker.record_failure()
+                        raise
+
+            self.breaker.record_success()
+            data = response.json()
+            data["usage"] = self.token_usage.record(model or self.model, data)
+            return data
+        finally:
+            self.breaker.release()
+
+    def _check_response(self, response: httpx.Response, base_url: str) -> None:
+        """
+        Raise OllamaError for non-200 responses
+        """
+        if response.status_code != 200:
+            logger.error(f"Ollama API error from {base_url}: {response.status_code}")
+            raise OllamaError(f"Ollama returned status {response.status_code}")
+
+    def _may_retry(self, attempt: int) -> bool:
+        """
+        Whether another attempt is allowed by the retry limit and budget
+        """
+        return attempt < settings.OLLAMA_MAX_RETRIES and self.retry_budget.try_spend()
+
+    async def _backoff(self, attempt: int) -> None:
+        """
+        Sleep with exponential backoff and full jitter
+        """
+        await asyncio.sleep(random.uniform(0, settings.OLLAMA_RETRY_BASE_DELAY * 2 ** attempt))
+
+    def _budget(self, options: Dict, model: str) -> Dict:
+        """
+        Options with the context window of the model that will serve them
+        """
+        return {**options, "num_ctx": self.router.num_ctx(model)}
+
+    def _fit_input(self, dream_text: str, model: str, system: str, options: Dict) -> str:
+        """
+        Shorten a dream that would not fit the context window with its answer
+        """
+        max_tokens = dream_token_budget(options["num_ctx"], options["num_predict"], system)
+        fitted = truncate_text(dream_text, max_tokens)
+        if fitted != dream_text:
+            self.token_usage.record_truncated_input(model)
+            logger.info(f"Dream of {len(dream_text)} characters shortened to fit {model} context")
+        return fitted
+
+    def _dream_mode(self, structured: bool) -> Tuple[PromptTemplate, Dict, Optional[Dict]]:
+        """
+        Template, sampling options and output format for a dream interpretation
+        """
+        if structured:
+            return STRUCTURED_DREAM_TEMPLATE, self.STRUCTURED_DREAM_OPTIONS, INTERPRETATION_SCHEMA
+        return DREAM_TEMPLATE, self.DREAM_OPTIONS, None
+
+    def _dream_cache_keys(
+        self,
+        prompt: str,
+        context: Optional[Dict],
+        template: PromptTemplate = DREAM_TEMPLATE,
+        options: Optional[Dict] = None,
+        model: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Exact cache key and similarity namespace for a dream interpretation
+        """
+        options = options or self.DREAM_OPTIONS
+        model = model or self.model
+        key = make_cache_key(normalize_text(prompt), model, template.id, options)
+        namespace = make_cache_key(context, model, template.id, options)
+        return key, namespace
+
+    def _dream_result(self, text: str, template: PromptTemplate, model: str) -> Dict:
+        """
+        Successful interpretation result for generated text
+
+        Structured generations are split into their sections; the
+        interpretation section is also returned as the interpretation text.
+        """
+        result = {
+            "success": True,
+            "interpretation": text,
+            "model": model,
+            "prompt_version": template.id,
+        }
+        if template is STRUCTURED_DREAM_TEMPLATE:
+            result["sections"] = parse_sections(text)
+            result["interpretation"] = result["sections"]["interpretation"]
+        result["confidence"] = self._calculate_confidence(result["interpretation"])
+        return result
+
+    async def _cache_lookup(
+        self,
+        dream_text: str,
+        key: str,
+        namespace: str
+    ) -> Tuple[Optional[Dict], Optional[List[float]]]:
+        """
+        Look up a dream in the exact tier, then the similarity tier
+
+        Returns:
+            (cached result or None, dream embedding if one was computed)
+        """
+        cached = await interpretation_cache.get(key)
+        if cached is not None:
+            return cached, None
+
+        embedding = None
+        if interpretation_cache.similarity_enabled:
+            embedding = await self.embed(normalize_text(dream_text))
+            if embedding:
+                cached = await interpretation_cache.get_similar(namespace, embedding)
+                if cached is not None:
+                    return cached, embedding
+
+        interpretation_cache.record_miss()
+        return None, embedding
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """
+        Embed text with the local Ollama embedding model
+
+        Returns:
+            The embedding vector, or None if embedding failed
+        """
+        try:
+            async with self._request_slot() as (client, base_url):
+                response = await client.post(
+                    f"{base_url}/api/embeddings",
+                    json={"model": settings.OLLAMA_EMBEDDING_MODEL, "prompt": text},
+                    timeout=30.0
+                )
+            if response.status_code != 200:
+                logger.error(f"Ollama embeddings error: {response.status_code}")
+                return None
+            return response.json().get("embedding")
+        except Exception as e:
+            logger.error(f"Embedding error: {e}")
+            return None
+
+    async def embed_batch(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """
+        Embed several texts in one request to the local Ollama embedding model
+
+        Uses Ollama's batch /api/embed endpoint, which returns unit-length
+        vectors in input order.
+
+        Returns:
+            One embedding per text, or None if embedding failed
+        """
+        try:
+            async with self._request_slot() as (client, base_url):
+                response = await client.post(
+                    f"{base_url}/api/embed",
+                    json={
+                        "model": settings.OLLAMA_EMBEDDING_MODEL,
+                        "input": texts,
+                        "keep_alive": settings.OLLAMA_KEEP_ALIVE,
+                    },
+                    timeout=60.0
+                )
+            if response.status_code != 200:
+                logger.error(f"Ollama embed error: {response.status_code}")
+                return None
+            embeddings = response.json().get("embeddings")
+            if not embeddings or len(embeddings) != len(texts):
+                logger.error("Ollama embed returned an unexpected number of embeddings")
+                return None
+            return embeddings
+        except Exception as e:
+            logger.error(f"Embedding error: {e}")
+            return None
+
     async def interpret_dream(
         self,
         dream_text: str,
-        context: Optional[Dict] = None
+        context: Optional[Dict] = None,
+        priority: Priority = Priority.NORMAL,
+        structured: bool = False,
+        tier: Optional[ModelTier] = None,
+        use_cache: bool = True
     ) -> Dict:
         """
         Send dream to Ollama for interpretation
 
+        Identical (after normalization) or, if enabled, sufficiently similar
+        dreams are served from the interpretation cache, and concurrent
+        identical requests are coalesced into one generation.
+
         Args:
             dream_text: The dream description
             context: Additional context (emotions, symbols, etc.)
+            priority: Scheduling class for the generation
+            structured: Generate JSON and return its sections under "sections"
+            tier: Model tier to use instead of the routing heuristic
+            use_cache: Serve a cached interpretation if there is one; when
+                False a new one is always generated (and then cached)
 
         Returns:
             Dictionary containing interpretation and metadata
+
+        Raises:
+            SchedulerOverloaded: If Ollama is saturated and the queue is full
         """
         try:
             # Construct the prompt with Islamic context
-            prompt = self._build_interpretation_prompt(dream_text, context)
-
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.7,
-                            "top_p": 0.9,
-                        }
-                    }
+            template, options, output_format = self._dream_mode(structured)
+            model = self.router.route(dream_text, tier=tier)
+            options = self._budget(options, model)
+            fitted = self._fit_input(dream_text, model, template.system, options)
+            prompt = self._build_interpretation_prompt(fitted, context, template)
+
+            cache_key, namespace = self._dream_cache_keys(prompt, context, template, options, model)
+            cached = embedding = None
+            if use_cache:
+                cached, embedding = await self._cache_lookup(fitted, cache_key, namespace)
+            if cached is not None:
+                return {**cached, "cached": True, "input_truncated": fitted != dream_text}
+
+            # Concurrent identical requests share a single generation
+            result = await self._inflight.do(
+                cache_key if use_cache else f"{cache_key}:fresh",
+                lambda: self._generate(
+                    prompt, template.system, options, priority, output_format, model
                 )
+            )
 
-                if response.status_code == 200:
-                    result = response.json()
-                    interpretation = result.get("response", "")
-
-                    return {
-                        "success": True,
-                        "interpretation": interpretation,
-                        "model": self.model,
-                        "confidence": self._calculate_confidence(interpretation)
-                    }
-                else:
-                    logger.error(f"Ollama API error: {response.status_code}")
-                    return {
-                        "success": False,
-                        "error": "Failed to generate interpretation"
-                    }
+            response = self._dream_result(result.get("response", ""), template, model)
+            await interpretation_cache.set(cache_key, response, namespace, embedding)
+            # Usage belongs to this generation, not to later cache hits
+            return {**response, "usage": result.get("usage"), "input_truncated": fitted != dream_text}
 
+        except SchedulerOverloaded:
+            raise
+        except OllamaError:
+            return {
+                "success": False,
+                "error": "Failed to generate interpretation"
+            }
         except Exception as e:
             logger.error(f"Dream interpretation error: {e}")
             return {
@@ -90,10 +620,247 @@ class OllamaService:
                 "error": str(e)
             }
 
+    async def stream_interpretation(
+        self,
+        dream_text: str,
+        context: Optional[Dict] = None,
+        priority: Priority = Priority.NORMAL,
+        structured: bool = False,
+        tier: Optional[ModelTier] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream a dream interpretation token by token
+
+        Uses Ollama's streaming generate API so callers can forward text
+        as soon as it is produced instead of waiting for the full response.
+        Concurrent requests for the same prompt share one upstream stream.
+
+        Args:
+            dream_text: The dream description
+            context: Additional context (emotions, symbols, etc.)
+            priority: Scheduling class for the generation
+            structured: Generate JSON and stream whole sections instead of tokens
+            tier: Model tier to use instead of the routing heuristic
+
+        Yields:
+            {"event": "queued", "position": n} if the request has to wait,
+            {"event": "token", "token": ...} for each generated chunk, or in
+            structured mode {"event": "section", "name": ..., "value": ...}
+            as each section completes, then a single {"event": "done", ...}
+            with timing stats, or {"event": "error", "error": ...} if
+            generation failed
+        """
+        template, options, output_format = self._dream_mode(structured)
+        model = self.router.route(dream_text, tier=tier)
+        options = self._budget(options, model)
+        fitted = self._fit_input(dream_text, model, template.system, options)
+        prompt = self._build_interpretation_prompt(fitted, context, template)
+        parser = StreamingJSONParser() if structured else None
+        started = time.perf_counter()
+        first_token_at: Optional[float] = None
+        chunks = 0
+        interpretation_parts = []
+
+        try:
+            cache_key, namespace = self._dream_cache_keys(prompt, context, template, options, model)
+            cached, embedding = await self._cache_lookup(fitted, cache_key, namespace)
+            if cached is not None:
+                # Replay the cached interpretation as a single token or its sections
+                if structured:
+                    for name, value in cached["sections"].items():
+                        yield {"event": "section", "name": name, "value": value}
+                else:
+                    yield {"event": "token", "token": cached["interpretation"]}
+                yield {
+                    "event": "done",
+                    "model": cached["model"],
+                    "prompt_version": cached.get("prompt_version"),
+                    "confidence": cached["confidence"],
+                    "cached": True,
+                    "time_to_first_token_ms": round((time.perf_counter() - started) * 1000, 1),
+                }
+                return
+
+            events = self._inflight.stream(
+                f"stream:{cache_key}",
+                lambda: self._stream_generate(
+                    prompt, template, options, output_format, model,
+                    cache_key, namespace, embedding, priority
+                )
+            )
+            async for event in events:
+                if event["event"] == "token":
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    chunks += 1
+                    interpretation_parts.append(event["token"])
+                    if parser is None:
+                        yield event
+                        continue
+                    for name, value in parser.feed(event["token"]):
+                        yield {"event": "section", "name": name, "value": value}
+                elif event["event"] == "done":
+                    result = self._dream_result("".join(interpretation_parts), template, model)
+                    if parser is not None:
+                        # Text that never formed a section, e.g. JSON ignored by the model
+                        for name, value in result["sections"].items():
+                            if name not in parser.sections:
+                                yield {"event": "section", "name": name, "value": value}
+                    yield {
+                        **self._stream_summary(event, started, first_token_at, chunks, result),
+                        "input_truncated": fitted != dream_text,
+                    }
+                    return
+                elif event["event"] == "queued":
+                    yield event
+                else:
+                    yield event
+                    return
+
+        except Exception as e:
+            logger.error(f"Streaming interpretation error: {e}")
+            yield {"event": "error", "error": str(e)}
+
+    async def _stream_generate(
+        self,
+        prompt: str,
+        template: PromptTemplate,
+        options: Dict,
+        output_format: Optional[Dict],
+        model: str,
+        cache_key: str,
+        namespace: str,
+        embedding: Optional[List[float]],
+        priority: Priority = Priority.NORMAL
+    ) -> AsyncIterator[Dict]:
+        """
+        Run one upstream streaming generation and cache the completed text
+
+        Yields a queued event if the scheduler has to hold the request,
+        raw token events and a final done event carrying Ollama's closing
+        chunk (eval_count, durations); per-caller timing is added
+        by stream_interpretation.
+        """
+        interpretation_parts = []
+
+        self.breaker.before_request()
+        reservation = None
+        try:
+            # Report the position only once this request holds its place
+            reservation = self.scheduler.reserve(priority)
+            if reservation.position:
+                yield {"event": "queued", "position": reservation.position}
+
+            async with reservation:
+                self.retry_budget.record_request()
+                attempt = 0
+                tried: Set[str] = set()
+                while True:
+                    try:
+                        async with self._request_slot(tried) as (client, base_url):
+                            async with client.stream(
+                                "POST",
+                                f"{base_url}/api/generate",
+                                json=self._generate_payload(
+                                    prompt, template.system, options,
+                                    stream=True, output_format=output_format, model=model
+                                )
+                            ) as response:
+                                self._check_response(response, base_url)
+
+                                async for line in response.aiter_lines():
+                                    if not line:
+                                        continue
+                                    chunk = json.loads(line)
+
+                                    if chunk.get("error"):
+                                        self.breaker.record_failure()
+                                        yield {"event": "error", "error": chunk["error"]}
+                                        return
+
+                                    token = chunk.get("response", "")
+                                    if token:
+                                        interpretation_parts.append(token)
+                                        yield {"event": "token", "token": token}
+
+                                    if chunk.get("done"):
+                                        self.breaker.record_success()
+                                        usage = self.token_usage.record(model, chunk)
+                                        await interpretation_cache.set(
+                                            cache_key,
+                                            self._dream_result(
+                                                "".join(interpretation_parts), template, model
+                                            ),
+                                            namespace,
+                                            embedding
+                                        )
+                                        yield {"event": "done", **chunk, "usage": usage}
+                                        return
+                        break
+                    except RETRYABLE_ERRORS as e:
+                        # Only retry if nothing has been streamed to callers yet
+                        if interpretation_parts or not self._may_retry(attempt):
+                            self.breaker.record_failure()
+                            raise
+                        attempt += 1
+                        logger.warning(f"Retrying Ollama stream (attempt {attempt}): {e}")
+                        await self._backoff(attempt)
+                    except (httpx.TransportError, OllamaError):
+                        self.breaker.record_failure()
+                        raise
+        finally:
+            if reservation is not None:
+                reservation.cancel()
+            self.breaker.release()
+
+        # Connection closed before Ollama reported completion
+        self.breaker.record_failure()
+        yield {"event": "error", "error": "Ollama stream ended unexpectedly"}
+
+    def _stream_summary(
+        self,
+        final_chunk: Dict,
+        started: float,
+        first_token_at: Optional[float],
+        chunks: int,
+        result: Dict
+    ) -> Dict:
+        """
+        Build the final "done" event for a streamed interpretation
+        """
+        elapsed = time.perf_counter() - started
+
+        # Prefer Ollama's own token accounting (durations are in nanoseconds)
+        eval_count = final_chunk.get("eval_count") or chunks
+        eval_duration = final_chunk.get("eval_duration")
+        if eval_duration:
+            tokens_per_second = eval_count / (eval_duration / 1e9)
+        elif first_token_at is not None and elapsed > first_token_at - started:
+            tokens_per_second = eval_count / (elapsed - (first_token_at - started))
+        else:
+            tokens_per_second = 0.0
+
+        return {
+            "event": "done",
+            "model": result["model"],
+            "prompt_version": result["prompt_version"],
+            "confidence": result["confidence"],
+            "time_to_first_token_ms": (
+                round((first_token_at - started) * 1000, 1)
+                if first_token_at is not None else None
+            ),
+            "total_time_ms": round(elapsed * 1000, 1),
+            "tokens": eval_count,
+            "tokens_per_second": round(tokens_per_second, 2),
+            "usage": final_chunk.get("usage"),
+        }
+
     async def interpret_istikhara(
         self,
         dream_text: str,
-        decision_context: str
+        decision_context: str,
+        priority: Priority = Priority.HIGH,
+        tier: Optional[ModelTier] = None
     ) -> Dict:
         """
         Specialized interpretation for Istikhara dreams
@@ -101,43 +868,43 @@ class OllamaService:
         Args:
             dream_text: The dream description
             decision_context: What decision was the Istikhara about
+            priority: Scheduling class, Istikhara is served ahead of regular dreams
+            tier: Model tier to use instead of the large tier
 
         Returns:
             Dictionary containing Istikhara interpretation
+
+        Raises:
+            SchedulerOverloaded: If Ollama is saturated and the queue is full
         """
         try:
-            prompt = self._build_istikhara_prompt(dream_text, decision_context)
+            model = self.router.route(dream_text, istikhara=True, tier=tier)
+            options = self._budget(self.ISTIKHARA_OPTIONS, model)
+            fitted = self._fit_input(dream_text, model, ISTIKHARA_TEMPLATE.system, options)
+            prompt = self._build_istikhara_prompt(fitted, decision_context)
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.6,  # Lower temperature for more focused responses
-                            "top_p": 0.85,
-                        }
-                    }
-                )
+            result = await self._generate(
+                prompt, ISTIKHARA_TEMPLATE.system, options, priority, model=model
+            )
+            interpretation = result.get("response", "")
 
-                if response.status_code == 200:
-                    result = response.json()
-                    interpretation = result.get("response", "")
-
-                    return {
-                        "success": True,
-                        "interpretation": interpretation,
-                        "model": self.model,
-                        "type": "istikhara"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": "Failed to generate Istikhara interpretation"
-                    }
+            return {
+                "success": True,
+                "interpretation": interpretation,
+                "model": model,
+                "prompt_version": ISTIKHARA_TEMPLATE.id,
+                "type": "istikhara",
+                "usage": result.get("usage"),
+                "input_truncated": fitted != dream_text
+            }
 
+        except SchedulerOverloaded:
+            raise
+        except OllamaError:
+            return {
+                "success": False,
+                "error": "Failed to generate Istikhara interpretation"
+            }
         except Exception as e:
             logger.error(f"Istikhara interpretation error: {e}")
             return {
@@ -148,37 +915,23 @@ class OllamaService:
     def _build_interpretation_prompt(
         self,
         dream_text: str,
-        context: Optional[Dict] = None
+        context: Optional[Dict] = None,
+        template: PromptTemplate = DREAM_TEMPLATE
     ) -> str:
         """
-        Build a comprehensive prompt for dream interpretation
-        """
-        base_prompt = f"""You are an Islamic dream interpretation expert trained in classical Islamic dream interpretation traditions, including the works of Ibn Sirin, Al-Nabulsi, and other renowned scholars.
+        Build the per-request part of a dream interpretation prompt
 
-Please provide a thoughtful interpretation of the following dream from an Islamic perspective:
-
-Dream: {dream_text}
-"""
-
-        if context:
-            if context.get("emotions"):
-                base_prompt += f"\nEmotions felt: {context['emotions']}"
-            if context.get("symbols"):
-                base_prompt += f"\nKey symbols: {context['symbols']}"
-            if context.get("time_of_day"):
-                base_prompt += f"\nTime when dreamed: {context['time_of_day']}"
-
-        base_prompt += """
-
-Please provide:
-1. A general interpretation of the dream
-2. Key symbols and their meanings in Islamic tradition
-3. Spiritual guidance based on the dream
-4. Any relevant Quranic verses or Hadith (if applicable)
-
-Keep the interpretation balanced, hopeful, and grounded in Islamic teachings."""
-
-        return base_prompt
+        Classical meanings of the symbols found in the dream text and the
+        user's symbols are looked up in the symbol dictionary and included,
+        so the model interprets from them instead of recalling meanings.
+        The instructions live in the template's system text and are sent separately.
+        """
+        meanings = symbol_dictionary.lookup(dream_text, [(context or {}).get("symbols") or ""])
+        return template.render(
+            dream_text=dream_text,
+            context=render_context(context),
+            references=render_references(meanings),
+        )
 
     def _build_istikhara_prompt(
         self,
@@ -186,22 +939,9 @@ Keep the interpretation balanced, hopeful, and grounded in Islamic teachings."""
         decision_context: str
     ) -> str:
         """
-        Build specialized prompt for Istikhara dream interpretation
+        Build the per-request part of an Istikhara interpretation prompt
         """
-        return f"""You are an Islamic dream interpretation expert specializing in Istikhara (seeking guidance) dreams.
-
-The person performed Istikhara prayer regarding: {decision_context}
-
-They saw the following dream after the Istikhara:
-{dream_text}
-
-Please provide a thoughtful interpretation specifically for this Istikhara dream:
-1. What the dream might indicate about the decision
-2. Positive and negative signs in the dream
-3. Islamic guidance on how to proceed
-4. Important reminder that the interpretation should be considered alongside other factors and consultation with knowledgeable people
-
-Remember: Not all dreams after Istikhara are direct divine guidance. Some dreams are from oneself or other sources. Provide balanced, wise counsel."""
+        return ISTIKHARA_TEMPLATE.render(dream_text=dream_text, decision_context=decision_context)
 
     def _calculate_confidence(self, interpretation: str) -> float:
         """
@@ -0,0 +1,136 @@
+"""
+Prompt Templates - Versioned, precompiled prompts for Ollama
+
+Each template splits a prompt into a static system preamble, sent through
+Ollama's `system` field, and a short per-request part that only carries the
+dream. Because the preamble is identical for every request it forms a
+stable prompt prefix that Ollama can reuse from its KV cache instead of
+re-evaluating it, which shortens time-to-first-token.
+
+Templates are parsed once at import time. Every template has a version;
+bump it whenever the wording changes so cached interpretations produced by
+the old wording are not served and stored interpretations record which
+template produced them (see Interpretation.prompt_version).
+"""
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.symbol_dictionary import SymbolMeaning
+
+
+class PromptTemplate:
+    """
+    A named, versioned prompt compiled into literal and field segments
+    """
+
+    def __init__(self, name: str, version: int, system: str, prompt: str):
+        self.name = name
+        self.version = version
+        self.system = system
+        self._segments: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(prompt)
+        ]
+        self.fields = [field for _, field in self._segments if field]
+
+    @property
+    def id(self) -> str:
+        """
+        Identifier recorded with cache entries and stored interpretations
+        """
+        return f"{self.name}@v{self.version}"
+
+    def render(self, **values: str) -> str:
+        """
+        Fill the per-request part of the prompt
+
+        Raises:
+            KeyError: If a template field is missing from values
+        """
+        parts = []
+        for literal, field in self._segments:
+            parts.append(literal)
+            if field:
+                parts.append(str(values[field]))
+        return "".join(parts)
+
+
+DREAM_TEMPLATE = PromptTemplate(
+    name="dream",
+    version=2,
+    system="""You are an Islamic dream interpreter following the classical tradition of Ibn Sirin and Al-Nabulsi.
+
+You will be given a dream, optionally with the emotions felt, key symbols, the time it was dreamed and the classical meanings of symbols that appear in it. Base symbol meanings on the classical meanings given; do not attribute other meanings to scholars. Interpret symbols without a given meaning briefly and cautiously.
+
+Answer in under 250 words, in four short sections:
+1. Interpretation: the overall meaning of the dream
+2. Symbols: each key symbol and its meaning
+3. Guidance: spiritual advice based on the dream
+4. References: a relevant Quranic verse or Hadith, only if one clearly applies
+
+Keep the interpretation balanced, hopeful, and grounded in Islamic teachings.""",
+    prompt="Dream: {dream_text}{context}{references}",
+)
+
+STRUCTURED_DREAM_TEMPLATE = PromptTemplate(
+    name="dream_structured",
+    version=1,
+    system="""You are an Islamic dream interpreter following the classical tradition of Ibn Sirin and Al-Nabulsi.
+
+You will be given a dream, optionally with the emotions felt, key symbols, the time it was dreamed and the classical meanings of symbols that appear in it. Base symbol meanings on the classical meanings given; do not attribute other meanings to scholars. Interpret symbols without a given meaning briefly and cautiously.
+
+Answer with a JSON object with these fields, in under 250 words overall:
+- interpretation: the overall meaning of the dream
+- key_symbols: each key symbol with its meaning
+- spiritual_guidance: spiritual advice based on the dream
+- quranic_references: relevant Quranic verses, only if one clearly applies
+- hadith_references: relevant Hadith, only if one clearly applies
+
+Keep the interpretation balanced, hopeful, and grounded in Islamic teachings.""",
+    prompt="Dream: {dream_text}{context}{references}",
+)
+
+ISTIKHARA_TEMPLATE = PromptTemplate(
+    name="istikhara",
+    version=1,
+    system="""You are an Islamic dream interpretation expert specializing in Istikhara (seeking guidance) dreams.
+
+You will be told what decision the person performed Istikhara prayer about and the dream they saw afterwards. Provide a thoughtful interpretation specifically for this Istikhara dream:
+1. What the dream might indicate about the decision
+2. Positive and negative signs in the dream
+3. Islamic guidance on how to proceed
+4. Important reminder that the interpretation should be considered alongside other factors and consultation with knowledgeable people
+
+Remember: Not all dreams after Istikhara are direct divine guidance. Some dreams are from oneself or other sources. Provide balanced, wise counsel.""",
+    prompt="""The person performed Istikhara prayer regarding: {decision_context}
+
+They saw the following dream after the Istikhara:
+{dream_text}""",
+)
+
+# Optional dream context lines, in prompt order
+CONTEXT_LINES = (
+    ("emotions", "Emotions felt: "),
+    ("symbols", "Key symbols: "),
+    ("time_of_day", "Time when dreamed: "),
+)
+
+
+def render_context(context: Optional[Dict]) -> str:
+    """
+    Format the optional dream context as prompt lines
+    """
+    if not context:
+        return ""
+    return "".join(
+        f"\n{label}{context[key]}" for key, label in CONTEXT_LINES if context.get(key)
+    )
+
+
+def render_references(meanings: Iterable[SymbolMeaning]) -> str:
+    """
+    Format retrieved classical symbol meanings as prompt lines
+    """
+    lines = [f"\n- {entry.symbol.capitalize()} ({entry.source}): {entry.meaning}" for entry in meanings]
+    if not lines:
+        return ""
+    return "\n\nClassical meanings:" + "".join(lines)
@@ -0,0 +1,315 @@
+"""
+Response Cache - Shared HTTP response cache for read-heavy routes
+
+Routes opt in with a CachePolicy, registered by path at the end of this
+module: the global feed (the community's public dreams), trending and the
+Ollama health check. Dream search and similar dreams depend on the
+viewer and are not cached. A cached GET response is served from an in-process LRU, then from Redis,
+and only then by the route itself; every cacheable response carries an
+ETag (a hash of its body) and a Cache-Control header, and a request whose
+If-None-Match names the current ETag gets an empty 304 instead.
+
+Entries are invalidated by tag rather than deleted: each policy names the
+tags its responses depend on ("feed", "trending"), every tag has a version
+counter, and the versions are part of the cache key, so bumping a tag
+orphans every entry built from it, in every process. Versions live in
+Redis (one MGET per cached request) and in process without it. Committing
+a change to a model registered with invalidate_on() bumps its tags;
+code that writes through Core calls invalidate() itself. Anything else,
+such as like counts, is refreshed when the entry's TTL runs out.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models import Dream, SocialPost, User
+from app.services.interpretation_cache import LRUCache
+
+ENTRY_PREFIX = "respcache:entry:"
+TAG_PREFIX = "respcache:tag:"
+
+# Session.info key for cache tags touched in the current transaction
+_TAGS_KEY = "response_cache_tags"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How one route's responses are cached
+
+    ttl is how long the server keeps a response; max_age is how long
+    clients and proxies may reuse it without revalidating (defaults to
+    ttl). Responses vary by the full query string.
+    """
+    ttl: int
+    tags: Tuple[str, ...] = ()
+    max_age: Optional[int] = None
+    public: bool = True
+
+    @property
+    def cache_control(self) -> str:
+        max_age = self.ttl if self.max_age is None else self.max_age
+        return f"{'public' if self.public else 'private'}, max-age={max_age}"
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Strong ETag of a response body
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header names the ETag (weak comparison)
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+class ResponseCache:
+    """
+    Per-route response caching with tag-based invalidation
+    """
+
+    def __init__(self):
+        self.enabled = settings.RESPONSE_CACHE_ENABLED
+        self.max_body_bytes = settings.RESPONSE_CACHE_MAX_BODY_BYTES
+        self._policies: Dict[str, CachePolicy] = {}
+        self._model_tags: Dict[type, Tuple[str, ...]] = {}
+        # Entries expire individually; the LRU's own TTL is only an upper bound
+        self._local = LRUCache(settings.RESPONSE_CACHE_LOCAL_MAX_ENTRIES, settings.RESPONSE_CACHE_MAX_TTL)
+        self._versions: Dict[str, int] = {}
+        self._pending: Set[asyncio.Task] = set()
+        self._stats = {
+            "local_hits": 0, "redis_hits": 0, "misses": 0, "not_modified": 0,
+            "uncacheable": 0, "invalidations": 0, "redis_errors": 0,
+        }
+
+    def register(self, path: str, policy: CachePolicy) -> None:
+        """
+        Cache GET responses of a route path (without path parameters)
+        """
+        if policy.ttl > settings.RESPONSE_CACHE_MAX_TTL:
+            raise ValueError(f"TTL of {path} exceeds RESPONSE_CACHE_MAX_TTL")
+        self._policies[path] = policy
+
+    def invalidate_on(self, model: type, *tags: str) -> None:
+        """
+        Invalidate tags whenever instances of a model are committed
+        """
+        self._model_tags[model] = tags
+
+    def policy_for(self, request: Request) -> Optional[CachePolicy]:
+        if not self.enabled or request.method != "GET":
+            return None
+        return self._policies.get(request.url.path)
+
+    async def _tag_versions(self, tags: Tuple[str, ...]) -> List[int]:
+        redis = get_redis()
+        if redis is not None and tags:
+            try:
+                return [int(version or 0) for version in await redis.mget([TAG_PREFIX + tag for tag in tags])]
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Response cache version read failed: {e}")
+        return [self._versions.get(tag, 0) for tag in tags]
+
+    async def _key(self, request: Request, policy: CachePolicy) -> str:
+        query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+        versions = await self._tag_versions(policy.tags)
+        raw = json.dumps([request.url.path, query, versions])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def _lookup(self, key: str) -> Optional[Dict]:
+        entry = self._local.get(key)
+        if entry is not None and entry["expires"] > time.time():
+            self._stats["local_hits"] += 1
+            return entry
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(ENTRY_PREFIX + key)
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Response cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                entry = json.loads(raw)
+                self._local.set(key, entry)
+                self._stats["redis_hits"] += 1
+                return entry
+        return None
+
+    async def _store(self, key: str, entry: Dict, ttl: int) -> None:
+        self._local.set(key, entry)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(ENTRY_PREFIX + key, json.dumps(entry), ex=ttl)
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Response cache write failed: {e}")
+
+    def _respond(self, request: Request, policy: CachePolicy, entry: Dict, source: str) -> Response:
+        headers = {"ETag": entry["etag"], "Cache-Control": policy.cache_control, "X-Cache": source}
+        if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+            self._stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry["body"].encode("utf-8"), media_type=entry["media_type"], headers=headers)
+
+    async def handle(self, request: Request, call_next) -> Response:
+        """
+        Middleware: serve a route's response from the cache, or cache it
+        """
+        policy = self.policy_for(request)
+        if policy is None:
+            return await call_next(request)
+
+        key = await self._key(request, policy)
+        entry = await self._lookup(key)
+        if entry is not None:
+            return self._respond(request, policy, entry, "HIT")
+        self._stats["misses"] += 1
+
+        response = await call_next(request)
+        length = response.headers.get("content-length")
+        if (
+            response.status_code != 200
+            or not response.headers.get("content-type", "").startswith("application/json")
+            or length is None
+            or int(length) > self.max_body_bytes
+        ):
+            self._stats["uncacheable"] += 1
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = {
+            "body": body.decode("utf-8"),
+            "etag": make_etag(body),
+            "media_type": response.headers["content-type"],
+            "expires": time.time() + policy.ttl,
+        }
+        await self._store(key, entry, policy.ttl)
+        return self._respond(request, policy, entry, "MISS")
+
+    def _bump_local(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+        self._stats["invalidations"] += 1
+
+    async def _bump_redis(self, tags: Iterable[str]) -> None:
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(TAG_PREFIX + tag)
+                await pipe.execute()
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            logger.warning(f"Response cache invalidation failed: {e}")
+
+    async def invalidate(self, *tags: str) -> None:
+        """
+        Orphan every cached response that depends on any of the tags
+        """
+        self._bump_local(tags)
+        await self._bump_redis(tags)
+
+    def invalidate_soon(self, tags: Iterable[str]) -> None:
+        """
+        Invalidate from synchronous code, such as session event hooks
+
+        This process stops serving the old entries at once; other
+        processes do once the Redis versions are bumped, in a task.
+        """
+        tags = tuple(tags)
+        self._bump_local(tags)
+        try:
+            task = asyncio.get_running_loop().create_task(self._bump_redis(tags))
+        except RuntimeError:
+            # No event loop; nothing in this process can have shared entries in Redis
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def tags_for(self, objects: Iterable[object]) -> Set[str]:
+        tags: Set[str] = set()
+        for obj in objects:
+            tags.update(self._model_tags.get(type(obj), ()))
+        return tags
+
+    def get_stats(self) -> Dict:
+        """
+        Hit, miss and invalidation counters
+        """
+        hits = self._stats["local_hits"] + self._stats["redis_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "backend": "redis+lru" if get_redis() is not None else "lru",
+            "routes": sorted(self._policies),
+            **self._stats,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "local_entries": len(self._local),
+            "local_evictions": self._local.evictions,
+        }
+
+
+# Singleton instance
+response_cache = ResponseCache()
+
+# Read-heavy routes; each policy names the tags that invalidate it
+response_cache.register(
+    "/api/v1/social/feed",
+    CachePolicy(ttl=settings.RESPONSE_CACHE_FEED_TTL, tags=("feed",))
+)
+response_cache.register(
+    "/api/v1/social/trending",
+    CachePolicy(ttl=settings.RESPONSE_CACHE_TRENDING_TTL, tags=("trending",))
+)
+response_cache.register(
+    "/api/v1/interpretations/health",
+    CachePolicy(ttl=settings.RESPONSE_CACHE_HEALTH_TTL)
+)
+# Posts, dreams and authors appear on feed and trending cards
+response_cache.invalidate_on(SocialPost, "feed", "trending")
+response_cache.invalidate_on(Dream, "feed", "trending")
+response_cache.invalidate_on(User, "feed", "trending")
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tags(session: Session, flush_context) -> None:
+    """
+    Remember the cache tags of models inserted, changed or deleted
+    """
+    tags = response_cache.tags_for([*session.new, *session.dirty, *session.deleted])
+    if tags:
+        session.info.setdefault(_TAGS_KEY, set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_tags(session: Session) -> None:
+    tags = session.info.pop(_TAGS_KEY, None)
+    if tags:
+        response_cache.invalidate_soon(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_tags(session: Session) -> None:
+    session.info.pop(_TAGS_KEY, None)
@@ -0,0 +1,250 @@
+"""
+Generation Scheduler - Admission control in front of Ollama
+
+Ollama can only run a few generations at once. The scheduler caps
+concurrent generations, holds extra requests in a bounded priority queue
+and rejects new work immediately when the queue is full or a request has
+waited too long, instead of letting every request slow down and time out.
+When the queue is full, a request displaces the newest waiter of a lower
+priority, so bulk work never makes interactive requests fail.
+"""
+import asyncio
+import enum
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class Priority(enum.IntEnum):
+    """Scheduling classes, lower values are served first"""
+    HIGH = 0  # Istikhara, Imam and paying users
+    NORMAL = 1  # Regular interactive interpretations
+    BULK = 2  # Batch and re-interpretation jobs
+
+
+class SchedulerOverloaded(Exception):
+    """
+    Raised when a request cannot be admitted
+
+    Attributes:
+        retry_after: Suggested seconds before the client retries
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GenerationScheduler:
+    """
+    Concurrency limit plus bounded priority wait queue
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.OLLAMA_MAX_CONCURRENCY,
+        max_queue: int = settings.OLLAMA_MAX_QUEUE,
+        queue_timeout: float = settings.OLLAMA_QUEUE_TIMEOUT
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._running = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+        # Exponentially weighted average generation time, for Retry-After
+        self._avg_duration = 10.0
+
+        self._stats = {
+            "admitted": 0, "queued": 0, "rejected_full": 0, "rejected_timeout": 0, "displaced": 0,
+        }
+
+    @property
+    def queue_length(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def is_full(self, priority: Priority = Priority.NORMAL) -> bool:
+        """
+        Whether a new request of this priority would be rejected right now
+        """
+        if self._running < self.max_concurrency or self.queue_length < self.max_queue:
+            return False
+        return not any(
+            waiter_priority > priority and not future.done()
+            for waiter_priority, _, future in self._waiters
+        )
+
+    def retry_after(self) -> int:
+        """
+        Estimated seconds until a queue slot frees up
+        """
+        waves = (self.queue_length + 1) / max(self.max_concurrency, 1)
+        return max(1, math.ceil(waves * self._avg_duration))
+
+    def reserve(self, priority: Priority = Priority.NORMAL) -> "Reservation":
+        """
+        Take a generation slot now or a place in the queue, without waiting
+
+        Enter the returned reservation to wait for the slot and hold it for
+        the duration of the block; its position says how many requests are
+        served first. A reservation that is not entered must be cancelled.
+
+        Raises:
+            SchedulerOverloaded: If the queue is full
+        """
+        if self._running < self.max_concurrency and self.queue_length == 0:
+            self._running += 1
+            self._stats["admitted"] += 1
+            return Reservation(self, None, 0)
+
+        if self.queue_length >= self.max_queue and not self._displace(priority):
+            self._stats["rejected_full"] += 1
+            raise SchedulerOverloaded("Interpretation queue is full", self.retry_after())
+
+        if len(self._waiters) > 2 * self.max_queue:
+            # Drop abandoned waiters so the heap doesn't grow unbounded
+            self._waiters = [waiter for waiter in self._waiters if not waiter[2].done()]
+            heapq.heapify(self._waiters)
+
+        waiter = (int(priority), next(self._sequence), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, waiter)
+        self._stats["queued"] += 1
+        position = sum(1 for other in self._waiters if other[:2] <= waiter[:2] and not other[2].done())
+        return Reservation(self, waiter[2], position)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.NORMAL) -> AsyncIterator[None]:
+        """
+        Hold one generation slot for the duration of the block
+
+        Raises:
+            SchedulerOverloaded: If the queue is full or the wait times out
+        """
+        async with self.reserve(priority):
+            yield
+
+    async def _wait(self, future: asyncio.Future) -> None:
+        """
+        Wait for a queued request's slot to be handed over
+        """
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(future)
+            self._stats["rejected_timeout"] += 1
+            raise SchedulerOverloaded("Timed out waiting for an interpretation slot", self.retry_after())
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+
+        self._stats["admitted"] += 1
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        if self._holds_slot(future):
+            # Slot was handed over just as the wait ended; give it back
+            self._release()
+        future.cancel()
+
+    def _finished(self, started: float) -> None:
+        duration = time.monotonic() - started
+        self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+        self._release()
+
+    def _displace(self, priority: Priority) -> bool:
+        """
+        Fail the newest waiter of the lowest priority below this one
+
+        Returns:
+            True if a waiter gave up its place in the queue
+        """
+        live = [waiter for waiter in self._waiters if not waiter[2].done()]
+        if not live:
+            return False
+        waiter_priority, _, future = max(live, key=lambda waiter: waiter[:2])
+        if waiter_priority <= priority:
+            return False
+        future.set_exception(SchedulerOverloaded(
+            "Displaced from the interpretation queue by a higher-priority request", self.retry_after()
+        ))
+        self._stats["displaced"] += 1
+        return True
+
+    @staticmethod
+    def _holds_slot(future: asyncio.Future) -> bool:
+        # A slot was handed over, rather than the wait being cancelled or displaced
+        return future.done() and not future.cancelled() and future.exception() is None
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next live waiter, if any
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    def get_stats(self) -> Dict:
+        """
+        Current load and admission counters
+        """
+        depth = {priority.name.lower(): 0 for priority in Priority}
+        for waiter_priority, _, future in self._waiters:
+            if not future.done():
+                depth[Priority(waiter_priority).name.lower()] += 1
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "queued_now": self.queue_length,
+            "queued_by_priority": depth,
+            "avg_generation_seconds": round(self._avg_duration, 2),
+            **self._stats,
+        }
+
+
+class Reservation:
+    """
+    A generation slot, or a place in the queue for one, from reserve()
+    """
+
+    def __init__(self, scheduler: GenerationScheduler, future: Optional[asyncio.Future], position: int):
+        self.scheduler = scheduler
+        # Requests served before this one; 0 if it was admitted at once
+        self.position = position
+        self._future = future
+        self._started: Optional[float] = None
+        self._done = False
+
+    async def __aenter__(self) -> "Reservation":
+        if self._future is not None:
+            try:
+                await self.scheduler._wait(self._future)
+            except BaseException:
+                self._done = True
+                raise
+        self._started = time.monotonic()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._done = True
+        self.scheduler._finished(self._started)
+
+    def cancel(self) -> None:
+        """
+        Give up a reservation that was never entered; no-op otherwise
+        """
+        if self._done or self._started is not None:
+            return
+        self._done = True
+        if self._future is None:
+            self.scheduler._release()
+        else:
+            self.scheduler._abandon(self._future)
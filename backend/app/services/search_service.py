@@ -0,0 +1,166 @@
+"""
+Search Service - Full-text and fuzzy symbol search over dreams
+
+Dreams carry two search columns maintained by a database trigger
+(db/schemas/005_dream_search.sql):
+
+- search_vector: weighted tsvector of the title and symbols/tags (A) and
+  description (B) with English stemming, plus title and description
+  unstemmed with the 'simple' configuration (D) so Arabic and
+  transliterated words match as written
+- symbols_text: lower-cased symbols and tags, trigram-indexed so a
+  misspelled symbol ("snak") still finds "snake"
+
+Both columns are GIN-indexed, so a search is a BitmapOr of the two indexes
+followed by the privacy filter. Results are ranked by ts_rank_cd plus
+symbol similarity and paginated with a (rank, id) keyset cursor.
+
+The columns are not mapped on the Dream model; they are referenced here
+only, which keeps the model usable on databases without them.
+"""
+import base64
+from typing import Dict, Optional
+
+from sqlalchemy import Float, Text, and_, cast, exists, func, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.dream import Dream, DreamPrivacy
+from app.models.social import Follow
+from app.repositories.read_models import DreamSummary
+
+SCOPES = ("all", "mine")
+
+_search_vector = literal_column("dreams.search_vector", TSVECTOR)
+_symbols_text = literal_column("dreams.symbols_text", Text)
+
+# Text search configurations, inlined so plans can be EXPLAINed with literal values
+_ENGLISH = literal_column("'english'")
+_SIMPLE = literal_column("'simple'")
+
+# ts_rank_cd normalization: rank / (rank + 1), keeps ranks in [0, 1)
+_RANK_NORMALIZATION = 32
+
+
+def encode_cursor(rank: float, dream_id: int) -> str:
+    """
+    Opaque cursor pointing just past a search result
+    """
+    raw = f"{rank!r}:{dream_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, dream_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return float(rank), int(dream_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def visible_to(viewer_id: Optional[int]):
+    """
+    Privacy filter: dreams a viewer is allowed to see
+
+    Public dreams, the viewer's own dreams, and friends-only dreams of
+    users the viewer follows and is followed by. Anonymous viewers only
+    see public dreams.
+    """
+    public = Dream.privacy == DreamPrivacy.PUBLIC
+    if viewer_id is None:
+        return public
+
+    follows_author = exists().where(Follow.follower_id == viewer_id, Follow.followee_id == Dream.user_id)
+    followed_by_author = exists().where(Follow.follower_id == Dream.user_id, Follow.followee_id == viewer_id)
+    return or_(
+        public,
+        Dream.user_id == viewer_id,
+        and_(Dream.privacy == DreamPrivacy.FRIENDS, follows_author, followed_by_author),
+    )
+
+
+def search_query(
+    q: str,
+    viewer_id: Optional[int] = None,
+    scope: str = "all",
+    cursor: Optional[str] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE
+):
+    """
+    Build the ranked search query, selecting DreamSummary columns and rank
+
+    Fetches limit + 1 rows so the caller can tell whether another page
+    exists. Arguments are as for search_dreams.
+
+    Raises:
+        ValueError: If the scope or cursor is invalid
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown scope: {scope}")
+    if scope == "mine" and viewer_id is None:
+        raise ValueError("Searching your own dreams requires user_id")
+
+    ts_query = func.websearch_to_tsquery(_ENGLISH, q).op("||")(func.websearch_to_tsquery(_SIMPLE, q))
+    matches = or_(
+        _search_vector.op("@@")(ts_query),
+        _symbols_text.op("%>")(q),
+    )
+    rank = cast(
+        func.ts_rank_cd(_search_vector, ts_query, _RANK_NORMALIZATION)
+        + func.coalesce(func.word_similarity(q, _symbols_text), 0),
+        Float
+    )
+
+    query = (
+        select(*DreamSummary.columns(), rank.label("rank"))
+        .where(matches)
+        .order_by(rank.desc(), Dream.id.desc())
+        .limit(limit + 1)
+    )
+    if scope == "mine":
+        query = query.where(Dream.user_id == viewer_id)
+    else:
+        query = query.where(visible_to(viewer_id))
+    if cursor:
+        query = query.where(tuple_(rank, Dream.id) < tuple_(*decode_cursor(cursor)))
+    return query
+
+
+async def search_dreams(
+    session: AsyncSession,
+    q: str,
+    viewer_id: Optional[int] = None,
+    scope: str = "all",
+    cursor: Optional[str] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE
+) -> Dict:
+    """
+    Search dream titles, descriptions, symbols and tags
+
+    Args:
+        session: Database session
+        q: Search text; supports web search syntax ("quoted phrases", -exclude, or)
+        viewer_id: The searching user, None for anonymous searches
+        scope: "all" for every dream the viewer may see, "mine" for their own journal
+        cursor: Cursor from the previous page, None for the first page
+        limit: Page size
+
+    Returns:
+        {"items": [(DreamSummary, rank), ...], "next_cursor": str or None}
+
+    Raises:
+        ValueError: If the scope or cursor is invalid
+    """
+    query = search_query(q, viewer_id=viewer_id, scope=scope, cursor=cursor, limit=limit)
+    rows = (await session.execute(query)).all()
+    items = [(DreamSummary.from_row(row), row.rank) for row in rows[:limit]]
+    next_cursor = encode_cursor(items[-1][1], items[-1][0].id) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
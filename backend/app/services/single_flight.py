@@ -0,0 +1,141 @@
+"""
+Single-flight - Coalesces concurrent identical requests into one upstream call
+"""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Set
+
+
+class _Broadcast:
+    """
+    Buffered fan-out of one event stream to any number of subscribers
+
+    Late subscribers replay the events published so far and then follow
+    the live stream, so every caller sees the complete sequence.
+    """
+
+    def __init__(self):
+        self.events: List[Dict] = []
+        self.closed = False
+        self._condition = asyncio.Condition()
+
+    async def publish(self, event: Dict) -> None:
+        async with self._condition:
+            self.events.append(event)
+            self._condition.notify_all()
+
+    async def close(self) -> None:
+        async with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict]:
+        position = 0
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(
+                    lambda: position < len(self.events) or self.closed
+                )
+                batch = self.events[position:]
+                position = len(self.events)
+                finished = self.closed and position == len(self.events)
+
+            for event in batch:
+                yield event
+            if finished:
+                return
+
+
+class SingleFlight:
+    """
+    Deduplicate in-flight work by key
+
+    The first caller for a key starts the work; callers arriving while it
+    is still running await the same result instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        # The event loop only keeps weak references to tasks
+        self._pumps: Set[asyncio.Task] = set()
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once per key among concurrent callers and share its result
+
+        Exceptions raised by fn() propagate to every waiting caller. A
+        cancelled caller does not cancel the shared call for the others.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(self._calls, key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    async def stream(
+        self,
+        key: str,
+        fn: Callable[[], AsyncIterator[Dict]]
+    ) -> AsyncIterator[Dict]:
+        """
+        Consume fn() once per key and fan its events out to every subscriber
+
+        The upstream stream runs to completion in a background task even if
+        all subscribers disconnect, so its side effects (e.g. caching) happen.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            pump = asyncio.ensure_future(self._pump(key, broadcast, fn()))
+            self._pumps.add(pump)
+            pump.add_done_callback(self._pumps.discard)
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        async for event in broadcast.subscribe():
+            yield event
+
+    async def _pump(self, key: str, broadcast: _Broadcast, source: AsyncIterator[Dict]) -> None:
+        try:
+            async for event in source:
+                await broadcast.publish(event)
+        except Exception as e:
+            await broadcast.publish({"event": "error", "error": str(e)})
+        finally:
+            self._forget(self._streams, key, broadcast)
+            await broadcast.close()
+
+    async def close(self) -> None:
+        """
+        Cancel upstream streams still running; their subscribers see the
+        stream end
+        """
+        pumps = list(self._pumps)
+        for pump in pumps:
+            pump.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
+
+    @staticmethod
+    def _forget(registry: Dict, key: str, entry: Any) -> None:
+        if registry.get(key) is entry:
+            del registry[key]
+
+    def get_stats(self) -> Dict:
+        """
+        Counters for upstream calls started vs. callers that were coalesced
+        """
+        return {
+            "in_flight_calls": len(self._calls),
+            "in_flight_streams": len(self._streams),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
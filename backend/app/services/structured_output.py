@@ -0,0 +1,172 @@
+"""
+Structured Output - Sectioned dream interpretations as JSON
+
+In structured mode Ollama is asked for a JSON object matching
+INTERPRETATION_SCHEMA (passed as the request `format`, which constrains
+decoding), so the interpretation arrives already split into the sections
+stored in the Interpretation columns.
+
+StreamingJSONParser reads the generated JSON as it streams and reports
+each top-level section as soon as its value is complete, so clients can
+render sections one by one and no second pass over the text is needed.
+Sections completed before a truncated response are kept.
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Sections in generation order
+SECTION_NAMES = (
+    "interpretation",
+    "key_symbols",
+    "spiritual_guidance",
+    "quranic_references",
+    "hadith_references",
+)
+
+# JSON schema sent to Ollama as the `format` of structured generations
+INTERPRETATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "interpretation": {"type": "string"},
+        "key_symbols": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "symbol": {"type": "string"},
+                    "meaning": {"type": "string"},
+                },
+                "required": ["symbol", "meaning"],
+            },
+        },
+        "spiritual_guidance": {"type": "string"},
+        "quranic_references": {"type": "array", "items": {"type": "string"}},
+        "hadith_references": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": list(SECTION_NAMES),
+}
+
+# Sections stored as JSON arrays in their Text column
+_LIST_SECTIONS = ("key_symbols", "quranic_references", "hadith_references")
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a streamed JSON object
+
+    Tracks nesting and string state character by character and decodes
+    each top-level member once the comma or closing brace after it
+    arrives, so every character is scanned once however the text is
+    split into chunks.
+    """
+
+    def __init__(self):
+        self.sections: Dict[str, Any] = {}
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Add generated text
+
+        Returns:
+            (name, value) for each top-level member completed by this chunk
+        """
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = pos + 1
+            elif char in "}]":
+                if self._depth == 1:
+                    self._close_member(pos, completed)
+                self._depth = max(self._depth - 1, 0)
+            elif char == "," and self._depth == 1:
+                self._close_member(pos, completed)
+                self._member_start = pos + 1
+        self._pos = len(buffer)
+        return completed
+
+    def _close_member(self, end: int, completed: List[Tuple[str, Any]]) -> None:
+        if self._member_start is None:
+            return
+        member = self._buffer[self._member_start:end].strip()
+        self._member_start = None
+        if not member:
+            return
+        try:
+            decoded = json.loads("{" + member + "}")
+        except ValueError:
+            return
+        for name, value in decoded.items():
+            self.sections[name] = value
+            completed.append((name, value))
+
+
+def parse_sections(text: str) -> Dict[str, Any]:
+    """
+    Sections of a complete (or truncated) structured generation
+
+    Text that contains no complete section, e.g. from a model that ignored
+    the requested format, is returned whole as the interpretation.
+    """
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    sections = {name: value for name, value in parser.sections.items() if name in SECTION_NAMES}
+    if not sections.get("interpretation"):
+        sections["interpretation"] = text.strip()
+    return sections
+
+
+def section_columns(sections: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """
+    Interpretation column values for parsed sections
+    """
+    columns = {}
+    for name in SECTION_NAMES[1:]:
+        value = sections.get(name)
+        if value in (None, "", []):
+            columns[name] = None
+        elif name in _LIST_SECTIONS:
+            columns[name] = json.dumps(value, ensure_ascii=False)
+        else:
+            columns[name] = str(value)
+    return columns
+
+
+def sections_from_columns(interpretation) -> Dict[str, Any]:
+    """
+    Sections of a stored Interpretation, the reverse of section_columns
+
+    Columns written by hand rather than from a structured generation
+    are returned as single-item lists.
+    """
+    sections = {"interpretation": interpretation.interpretation_text}
+    for name in SECTION_NAMES[1:]:
+        value = getattr(interpretation, name)
+        if value is None:
+            continue
+        if name in _LIST_SECTIONS:
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = [{"symbol": value, "meaning": ""}] if name == "key_symbols" else [value]
+        sections[name] = value
+    return sections
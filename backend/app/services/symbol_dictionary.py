@@ -0,0 +1,164 @@
+"""
+Symbol Dictionary - Classical dream symbol meanings for grounded prompts
+
+The dictionary (app/data/dream_symbols.json) maps dream symbols and their
+aliases to paraphrased meanings from Ibn Sirin, Al-Nabulsi, the Quran and
+Hadith. It is loaded once, at startup or on the first lookup, into an
+Aho-Corasick automaton, so the dream text and the user's symbols are
+scanned for every known term in a single pass over the characters,
+however many terms the dictionary holds.
+
+Only whole words match ("cat" does not match "education"); simple plurals
+("snakes", "horses") are added automatically. Symbols that are also common
+words in other senses set "match_symbol": false and list only phrases in
+the symbol's sense as aliases ("a well", not "as well").
+"""
+import json
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class SymbolMeaning:
+    """
+    A dictionary entry
+    """
+    symbol: str
+    meaning: str
+    source: str
+
+
+def _plurals(term: str) -> List[str]:
+    """
+    The term and its simple English plurals
+    """
+    if " " in term or not term.isalpha() or term.endswith("s"):
+        return [term]
+    return [term, term + "s", term + "es"]
+
+
+class SymbolMatcher:
+    """
+    Aho-Corasick automaton over lower-cased terms, matching whole words only
+    """
+
+    def __init__(self, terms: Dict[str, SymbolMeaning]):
+        # Trie as per-node transition dicts; node 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Terms ending at each node (including via fail links), as (length, entry)
+        self._output: List[List[tuple]] = [[]]
+
+        for term, entry in terms.items():
+            node = 0
+            for char in term:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._output[node].append((len(term), entry))
+
+        # Breadth-first fail links: longest proper suffix that is also a trie path
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[SymbolMeaning]:
+        """
+        Entries whose terms occur in text as whole words, in order of first occurrence
+        """
+        text = text.lower()
+        found: Dict[str, SymbolMeaning] = {}
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, entry in self._output[node]:
+                start = end - length + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (
+                    end + 1 == len(text) or not text[end + 1].isalnum()
+                ):
+                    found.setdefault(entry.symbol, entry)
+        return list(found.values())
+
+
+def _terms(entries: Iterable[dict]) -> Dict[str, SymbolMeaning]:
+    """
+    Lower-cased symbols, aliases and their plurals mapped to their entries
+
+    A symbol with "match_symbol": false is matched by its aliases only.
+    """
+    terms: Dict[str, SymbolMeaning] = {}
+    for item in entries:
+        entry = SymbolMeaning(item["symbol"], item["meaning"], item.get("source", ""))
+        names = [item["symbol"]] if item.get("match_symbol", True) else []
+        for term in [*names, *item.get("aliases", [])]:
+            for variant in _plurals(term.lower().strip()):
+                terms.setdefault(variant, entry)
+    return terms
+
+
+class SymbolDictionary:
+    """
+    Dream symbol meanings with a matcher over symbols and aliases
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version: Optional[int] = None
+        self.size = 0
+        self._matcher: Optional[SymbolMatcher] = None
+
+    def load(self) -> None:
+        """
+        Load the dictionary file, if not loaded yet
+
+        A missing or invalid file gives an empty dictionary.
+        """
+        if self._matcher is not None:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            terms, version = _terms(data["symbols"]), data.get("version", 1)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load dream symbol dictionary {self.path}: {e}")
+            terms, version = {}, 1
+        self.version = version
+        self.size = len({entry.symbol for entry in terms.values()})
+        self._matcher = SymbolMatcher(terms)
+        if terms:
+            logger.info(f"Loaded {self.size} dream symbols from {self.path}")
+
+    def lookup(self, dream_text: str, symbols: Optional[Iterable[str]] = None) -> List[SymbolMeaning]:
+        """
+        Meanings of known symbols mentioned in a dream or listed by the user
+
+        The user's symbols come first, then those found in the dream text;
+        at most SYMBOL_REFERENCES_MAX entries are returned.
+        """
+        self.load()
+        text = "\n".join([*(symbols or []), dream_text])
+        return self._matcher.find(text)[:settings.SYMBOL_REFERENCES_MAX]
+
+
+# Singleton instance, loaded by the startup handler or the first lookup
+symbol_dictionary = SymbolDictionary(
+    settings.SYMBOL_DICTIONARY_PATH or str(Path(__file__).resolve().parent.parent / "data" / "dream_symbols.json")
+)
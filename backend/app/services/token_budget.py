@@ -0,0 +1,149 @@
+"""
+Token Budget - Generation limits, input fitting and token accounting
+
+Every generation is bounded: `num_predict` caps the tokens generated per
+endpoint and `num_ctx` fixes the context window per model tier, so a
+rambling model cannot hold an Ollama slot until the read timeout. Dream
+text too long for the window is shortened before the prompt is built,
+keeping its beginning and end.
+
+TokenUsageStats aggregates the counts and durations Ollama reports with
+each completed generation (prompt_eval_count, eval_count and the
+*_duration fields, in nanoseconds) per model, for capacity planning.
+"""
+import math
+from typing import Dict, Optional
+
+# Conservative characters-per-token estimate; Arabic and transliterated
+# terms split into more tokens than English prose
+CHARS_PER_TOKEN = 3
+
+# Tokens kept free for the dream context and classical meanings lines
+PROMPT_RESERVE_TOKENS = 256
+
+TRUNCATION_MARKER = "\n[...]\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count, without calling a tokenizer
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def dream_token_budget(num_ctx: int, num_predict: int, system: str) -> int:
+    """
+    Tokens left for the dream text once the system prompt, the generated
+    answer and the context lines are accounted for
+    """
+    return max(num_ctx - num_predict - estimate_tokens(system) - PROMPT_RESERVE_TOKENS, 0)
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """
+    Shorten text to about max_tokens, keeping the first two thirds and the
+    last third of the allowance and cutting at whitespace
+
+    The opening of a dream usually sets the scene and its end holds the
+    outcome, so both are kept.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+
+    budget = max(max_chars - len(TRUNCATION_MARKER), 0)
+    head = text[:budget * 2 // 3]
+    tail = text[len(text) - (budget - len(head)):] if budget > len(head) else ""
+    if " " in head:
+        head = head[:head.rindex(" ")]
+    if " " in tail:
+        tail = tail[tail.index(" ") + 1:]
+    return head.rstrip() + TRUNCATION_MARKER + tail.lstrip()
+
+
+def _ms(nanoseconds: Optional[int]) -> Optional[float]:
+    return round(nanoseconds / 1e6, 1) if nanoseconds is not None else None
+
+
+class TokenUsageStats:
+    """
+    Per-model token counts and generation time
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Dict] = {}
+
+    def _model_stats(self, model: str) -> Dict:
+        return self._models.setdefault(model, {
+            "generations": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "prompt_eval_seconds": 0.0,
+            "eval_seconds": 0.0,
+            "load_seconds": 0.0,
+            "stopped_at_limit": 0,
+            "inputs_truncated": 0,
+        })
+
+    def record(self, model: str, final_chunk: Dict) -> Dict:
+        """
+        Add the accounting of a completed generation
+
+        Args:
+            model: The model that generated
+            final_chunk: Ollama's response (or last streamed chunk)
+
+        Returns:
+            Token usage of this generation, durations in milliseconds
+        """
+        stats = self._model_stats(model)
+        prompt_tokens = final_chunk.get("prompt_eval_count") or 0
+        completion_tokens = final_chunk.get("eval_count") or 0
+        stopped_at_limit = final_chunk.get("done_reason") == "length"
+
+        stats["generations"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["prompt_eval_seconds"] += (final_chunk.get("prompt_eval_duration") or 0) / 1e9
+        stats["eval_seconds"] += (final_chunk.get("eval_duration") or 0) / 1e9
+        stats["load_seconds"] += (final_chunk.get("load_duration") or 0) / 1e9
+        stats["stopped_at_limit"] += stopped_at_limit
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_duration_ms": _ms(final_chunk.get("total_duration")),
+            "load_duration_ms": _ms(final_chunk.get("load_duration")),
+            "prompt_eval_duration_ms": _ms(final_chunk.get("prompt_eval_duration")),
+            "eval_duration_ms": _ms(final_chunk.get("eval_duration")),
+            "stopped_at_limit": stopped_at_limit,
+        }
+
+    def record_truncated_input(self, model: str) -> None:
+        """
+        Count a dream shortened to fit the model's context window
+        """
+        self._model_stats(model)["inputs_truncated"] += 1
+
+    def get_stats(self) -> Dict:
+        """
+        Totals, averages and throughput per model
+        """
+        result = {}
+        for model, stats in self._models.items():
+            generations = stats["generations"] or 1
+            result[model] = {
+                **{key: round(value, 3) if isinstance(value, float) else value
+                   for key, value in stats.items()},
+                "avg_prompt_tokens": round(stats["prompt_tokens"] / generations, 1),
+                "avg_completion_tokens": round(stats["completion_tokens"] / generations, 1),
+                "prompt_tokens_per_second": (
+                    round(stats["prompt_tokens"] / stats["prompt_eval_seconds"], 1)
+                    if stats["prompt_eval_seconds"] else None
+                ),
+                "completion_tokens_per_second": (
+                    round(stats["completion_tokens"] / stats["eval_seconds"], 1)
+                    if stats["eval_seconds"] else None
+                ),
+            }
+        return result
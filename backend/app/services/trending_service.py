@@ -0,0 +1,211 @@
+"""
+Trending Service - Time-decayed trending posts
+
+Every like, comment or share adds weight to a post's score, and older
+weight decays with a half-life of TRENDING_HALF_LIFE_HOURS. Instead of
+decaying every score over time, each event's weight is scaled up by how
+late it happened:
+
+    score = log2(sum(weight * 2 ** ((event_time - EPOCH) / half_life)))
+
+Scaling every post by the same factor does not change their order, so
+stored scores never need to be rewritten and a single event is an O(log N)
+sorted set update. Scores are kept in log space to avoid overflow.
+
+Only the top TRENDING_MAX_POSTS are kept, in a Redis sorted set when
+available or in process otherwise, so GET /social/trending reads the top K
+directly without scanning the posts table.
+"""
+import heapq
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.social import SocialPost
+from app.repositories.read_models import PostCard
+from app.services.feed_service import visible_posts_query
+
+TRENDING_KEY = "trending:posts"
+
+# Reference point for event times; any fixed instant works
+EPOCH = datetime(2024, 1, 1)
+
+# Weight of each engagement event
+EVENT_WEIGHTS = {
+    "share": 1.0,
+    "like": 1.0,
+    "comment": 2.0,
+}
+
+# Atomic log-space add: score = log2(2 ** score + 2 ** increment), then trim
+_ADD_SCRIPT = """
+local current = redis.call('ZSCORE', KEYS[1], ARGV[1])
+local increment = tonumber(ARGV[2])
+local score = increment
+if current then
+    current = tonumber(current)
+    local high = math.max(current, increment)
+    local low = math.min(current, increment)
+    score = high + math.log(1 + 2 ^ (low - high)) / math.log(2)
+end
+redis.call('ZADD', KEYS[1], score, ARGV[1])
+local excess = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[3])
+if excess > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, excess - 1)
+end
+return tostring(score)
+"""
+
+
+def _log_add(a: float, b: float) -> float:
+    """
+    log2(2 ** a + 2 ** b) without overflow
+    """
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+class TrendingService:
+    """
+    Maintains the top trending posts by time-decayed engagement
+    """
+
+    def __init__(
+        self,
+        half_life_hours: float = settings.TRENDING_HALF_LIFE_HOURS,
+        max_posts: int = settings.TRENDING_MAX_POSTS
+    ):
+        self.half_life = half_life_hours * 3600
+        self.max_posts = max_posts
+        # In-process scores, used when Redis is unavailable
+        self._scores: Dict[int, float] = {}
+        self._script = None
+
+    def _log_weight(self, weight: float, at: Optional[datetime] = None) -> float:
+        """
+        Log-space score contribution of an event at a given time
+        """
+        seconds = ((at or datetime.utcnow()) - EPOCH).total_seconds()
+        return math.log2(weight) + seconds / self.half_life
+
+    def decayed_score(self, score: float) -> float:
+        """
+        Convert a stored score to the current decayed engagement value
+        """
+        now = (datetime.utcnow() - EPOCH).total_seconds()
+        return 2 ** (score - now / self.half_life)
+
+    async def record(self, post_id: int, event: str, at: Optional[datetime] = None) -> None:
+        """
+        Add an engagement event to a post's trending score
+
+        Args:
+            post_id: The post that received the event
+            event: "share", "like" or "comment"
+            at: When the event happened (defaults to now, naive UTC)
+        """
+        increment = self._log_weight(EVENT_WEIGHTS[event], at)
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                if self._script is None:
+                    self._script = redis.register_script(_ADD_SCRIPT)
+                await self._script(keys=[TRENDING_KEY], args=[post_id, increment, self.max_posts])
+                return
+            except Exception as e:
+                logger.warning(f"Trending update failed in Redis, using in-process scores: {e}")
+
+        current = self._scores.get(post_id)
+        self._scores[post_id] = increment if current is None else _log_add(current, increment)
+        if len(self._scores) > 2 * self.max_posts:
+            self._scores = dict(
+                heapq.nlargest(self.max_posts, self._scores.items(), key=lambda item: item[1])
+            )
+
+    async def top(self, limit: int) -> List[Tuple[int, float]]:
+        """
+        The highest scoring posts
+
+        Returns:
+            (post_id, stored score) pairs, best first
+        """
+        redis = get_redis()
+        if redis is not None:
+            try:
+                entries = await redis.zrevrange(TRENDING_KEY, 0, limit - 1, withscores=True)
+                return [(int(post_id), score) for post_id, score in entries]
+            except Exception as e:
+                logger.warning(f"Trending read failed in Redis, using in-process scores: {e}")
+
+        return heapq.nlargest(limit, self._scores.items(), key=lambda item: item[1])
+
+    async def trending_posts(self, session: AsyncSession, limit: int) -> List[Tuple[PostCard, float]]:
+        """
+        The top trending visible posts with their current decayed scores
+
+        Posts are loaded by primary key; hidden or flagged posts are skipped.
+        """
+        # Over-fetch a little so moderated posts do not shorten the list
+        entries = await self.top(limit + limit // 2 + 1)
+        if not entries:
+            return []
+
+        result = await session.execute(
+            visible_posts_query(len(entries)).where(SocialPost.id.in_([post_id for post_id, _ in entries]))
+        )
+        posts = {row.id: PostCard.from_row(row) for row in result}
+        ranked = [
+            (posts[post_id], self.decayed_score(score))
+            for post_id, score in entries if post_id in posts
+        ]
+        return ranked[:limit]
+
+    async def rebuild(self, session: AsyncSession) -> int:
+        """
+        Seed scores from stored counters if no trending state exists
+
+        Used at startup (e.g. after Redis was flushed). Only posts from the
+        last TRENDING_REBUILD_DAYS are considered; their engagement is
+        attributed to the post's creation time.
+
+        Returns:
+            Number of posts seeded
+        """
+        redis = get_redis()
+        if redis is not None:
+            if await redis.exists(TRENDING_KEY):
+                return 0
+        elif self._scores:
+            return 0
+
+        since = datetime.utcnow() - timedelta(days=settings.TRENDING_REBUILD_DAYS)
+        result = await session.execute(
+            select(SocialPost.id, SocialPost.created_at, SocialPost.likes_count, SocialPost.comments_count)
+            .where(SocialPost.created_at >= since)
+        )
+        scores = {}
+        for post_id, created_at, likes, comments in result:
+            weight = (
+                EVENT_WEIGHTS["share"]
+                + EVENT_WEIGHTS["like"] * (likes or 0)
+                + EVENT_WEIGHTS["comment"] * (comments or 0)
+            )
+            scores[post_id] = self._log_weight(weight, created_at)
+
+        top = heapq.nlargest(self.max_posts, scores.items(), key=lambda item: item[1])
+        if redis is not None and top:
+            await redis.zadd(TRENDING_KEY, dict(top))
+        else:
+            self._scores = dict(top)
+        return len(top)
+
+
+# Singleton instance
+trending_service = TrendingService()
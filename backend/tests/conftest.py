@@ -0,0 +1,110 @@
+"""
+Test fixtures
+
+Tests run against the PostgreSQL and Redis named by DATABASE_URL and
+REDIS_URL (the CI service containers). The schema is rebuilt from
+db/schemas once per run, and every test starts with empty tables, an
+empty Redis database and fresh connections on its own event loop.
+"""
+import asyncio
+from pathlib import Path
+
+import asyncpg
+import httpx
+import pytest
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.redis import close_redis, init_redis
+from app.main import app
+from app.services.interpretation_cache import LRUCache, interpretation_cache
+from tests.fake_ollama import FakeOllama
+
+SCHEMA_DIR = Path(__file__).resolve().parents[2] / "db" / "schemas"
+
+
+def _asyncpg_dsn() -> str:
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def _create_schema() -> None:
+    connection = await asyncpg.connect(_asyncpg_dsn())
+    try:
+        await connection.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+        for path in sorted(SCHEMA_DIR.glob("*.sql")):
+            await connection.execute(path.read_text())
+    finally:
+        await connection.close()
+
+
+async def _truncate_tables() -> None:
+    connection = await asyncpg.connect(_asyncpg_dsn())
+    try:
+        tables = await connection.fetch("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
+        if tables:
+            names = ", ".join(f'"{row["tablename"]}"' for row in tables)
+            await connection.execute(f"TRUNCATE {names} RESTART IDENTITY CASCADE")
+    finally:
+        await connection.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database_schema():
+    asyncio.run(_create_schema())
+
+
+@pytest.fixture(autouse=True)
+async def clean_state():
+    await _truncate_tables()
+    redis = await init_redis()
+    if redis is not None:
+        await redis.flushdb()
+    yield
+    await close_redis()
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+
+
+
+@pytest.fixture
+async def session():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+
+@pytest.fixture
+async def client():
+    """
+    HTTP client for the app; startup and shutdown handlers do not run
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def ollama(monkeypatch):
+    """
+    Two fake Ollama hosts, no retry backoff, and an interpretation cache
+    without the entries, vectors and counters of earlier tests
+    """
+    monkeypatch.setattr(settings, "OLLAMA_RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(interpretation_cache, "enabled", True)
+    monkeypatch.setattr(interpretation_cache, "similarity_enabled", False)
+    monkeypatch.setattr(interpretation_cache, "_local", LRUCache(100, interpretation_cache.ttl))
+    monkeypatch.setattr(interpretation_cache, "_stats", dict.fromkeys(interpretation_cache._stats, 0))
+    await interpretation_cache.clear()
+    yield FakeOllama()
+    await interpretation_cache.clear()
+
+
+@pytest.fixture
+async def ollama_service(ollama):
+    """
+    An OllamaService talking to the fake hosts
+    """
+    service = ollama.service()
+    yield service
+    await service.shutdown()
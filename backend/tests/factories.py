@@ -0,0 +1,37 @@
+"""
+Test data helpers
+"""
+from app.core.database import AsyncSessionLocal
+from app.models import Dream, User
+
+
+async def create_user(session, username: str = "dreamer", **fields) -> User:
+    user = User(email=f"{username}@example.com", username=username, hashed_password="-", **fields)
+    session.add(user)
+    await session.commit()
+    return user
+
+
+async def create_dream(session, user: User, description: str = "I saw a snake in my house", **fields) -> Dream:
+    dream = Dream(user_id=user.id, title="A dream", description=description, **fields)
+    session.add(dream)
+    await session.commit()
+    return dream
+
+
+async def share_dreams(client, count: int, username: str = "author"):
+    """
+    Create a user with count dreams and share each through the API
+
+    Returns:
+        (user, post ids in sharing order)
+    """
+    async with AsyncSessionLocal() as session:
+        user = await create_user(session, username)
+        dreams = [await create_dream(session, user, f"Dream number {n}") for n in range(count)]
+    post_ids = []
+    for dream in dreams:
+        response = await client.post(f"/api/v1/social/dreams/{dream.id}/share", json={})
+        assert response.status_code == 201
+        post_ids.append(response.json()["id"])
+    return user, post_ids
@@ -0,0 +1,120 @@
+"""
+In-process fake Ollama hosts
+
+Requests from the service's pooled client are answered through an
+httpx.MockTransport, so no sockets are opened. Each host can be taken
+down (connections are refused), made to fail with a status code, or
+slowed down, and counts the requests it saw. Every text embeds to the
+host's fixed embedding vector.
+"""
+import asyncio
+import json
+from typing import Dict, List
+
+import httpx
+
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.ollama_balancer import OllamaBalancer
+from app.services.ollama_service import OllamaService
+from app.services.scheduler import GenerationScheduler
+
+INTERPRETATION = "Clear water is a sign of knowledge and a pure livelihood."
+
+
+class FakeOllamaHost:
+    """
+    One fake Ollama node
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.up = True
+        self.status = 200
+        self.delay = 0.0
+        self.embedding = [1.0, 0.0, 0.0]
+        self.connections = 0
+        self.generations = 0
+
+    def generate_body(self, payload: Dict) -> httpx.Response:
+        final = {"done": True, "prompt_eval_count": 40, "eval_count": 12, "eval_duration": 120_000_000}
+        if not payload.get("stream"):
+            return httpx.Response(200, json={"response": INTERPRETATION, **final})
+        words = INTERPRETATION.split(" ")
+        chunks = [{"response": word + " ", "done": False} for word in words[:-1]]
+        chunks.append({"response": words[-1], **final})
+        return httpx.Response(200, content="".join(json.dumps(chunk) + "\n" for chunk in chunks).encode())
+
+
+class FakeOllama:
+    """
+    A cluster of fake nodes behind one transport
+    """
+
+    def __init__(self, hosts: int = 2):
+        self.hosts = [FakeOllamaHost(f"http://ollama-{n}:11434") for n in range(hosts)]
+        self.active = 0
+        self.peak_active = 0
+        # Host URL of every generate request, including refused ones
+        self.attempts: List[str] = []
+
+    def configure(self, **behaviour) -> None:
+        """
+        Set attributes such as delay or status on every host
+        """
+        for host in self.hosts:
+            for name, value in behaviour.items():
+                setattr(host, name, value)
+
+    def host(self, url: str) -> FakeOllamaHost:
+        return next(host for host in self.hosts if url.startswith(host.url))
+
+    @property
+    def generations(self) -> int:
+        return sum(host.generations for host in self.hosts)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host = self.host(str(request.url))
+        host.connections += 1
+        if request.url.path == "/api/generate":
+            self.attempts.append(host.url)
+        if not host.up:
+            raise httpx.ConnectError("Connection refused", request=request)
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": []})
+        if request.url.path == "/api/embeddings":
+            return httpx.Response(200, json={"embedding": host.embedding})
+        if request.url.path != "/api/generate":
+            return httpx.Response(404)
+
+        host.generations += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(host.delay)
+        finally:
+            self.active -= 1
+        if host.status != 200:
+            return httpx.Response(host.status, json={"error": "model failed"})
+        return host.generate_body(json.loads(request.content))
+
+    def service(
+        self,
+        max_concurrency: int = 4,
+        max_queue: int = 10,
+        failure_threshold: int = 5,
+        eject_after: int = 2
+    ) -> OllamaService:
+        """
+        An OllamaService whose client talks to these hosts
+        """
+        service = OllamaService()
+        service.balancer = OllamaBalancer([host.url for host in self.hosts], eject_after=eject_after, probe_interval=0)
+        service.base_url = service.balancer.nodes[0].url
+        service.scheduler = GenerationScheduler(max_concurrency, max_queue, queue_timeout=5)
+        service.breaker = CircuitBreaker(failure_threshold, recovery_timeout=60)
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+        return service
+
+
+def dreams(count: int) -> List[str]:
+    return [f"I drank clear water from well number {n} in my village" for n in range(count)]
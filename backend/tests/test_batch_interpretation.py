@@ -0,0 +1,58 @@
+"""
+Batch interpretation: waiting out a busy Ollama, failing fast on a down one
+"""
+import pytest
+
+from app.models import Dream
+from app.services import batch_interpretation as batch_module
+from app.services.batch_interpretation import interpret_dreams
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.scheduler import SchedulerOverloaded
+
+RESULT = {"success": True, "interpretation": "Water is knowledge.", "model": "llama2", "confidence": 0.8}
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """
+    Replace the Ollama call with one that raises or returns queued outcomes
+    """
+    outcomes = []
+
+    async def interpret(dream, priority=None, use_cache=True):
+        outcome = outcomes.pop(0) if outcomes else RESULT
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(batch_module, "interpret_stored_dream", interpret)
+    monkeypatch.setattr(batch_module.settings, "BATCH_INTERPRETATION_MAX_WAIT", 1)
+    return outcomes
+
+
+async def results(count: int):
+    return [result async for _, result in interpret_dreams([Dream(id=n) for n in range(count)], concurrency=1)]
+
+
+async def test_full_queue_is_waited_out(responses):
+    responses.append(SchedulerOverloaded("busy", retry_after=1))
+
+    assert await results(1) == [RESULT]
+    assert responses == []
+
+
+async def test_wait_is_capped(responses):
+    responses.extend([SchedulerOverloaded("busy", retry_after=1)] * 2)
+
+    (result,) = await results(1)
+
+    assert result == {"success": False, "error": "busy"}
+
+
+async def test_open_circuit_fails_the_dream_at_once(responses):
+    responses.append(CircuitOpenError("down", retry_after=30))
+
+    first, second = await results(2)
+
+    assert first == {"success": False, "error": "down"}
+    assert second == RESULT
@@ -0,0 +1,117 @@
+"""
+Likes and write-behind engagement counters: pending deltas, flush and reconciliation
+"""
+from sqlalchemy import select, update
+
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
+from app.models import SocialPost
+from app.services.engagement_counters import CHANGING_PREFIX, FLUSH_LOCK_KEY, PENDING_KEY, engagement_counters
+from tests.factories import create_user, share_dreams
+
+
+async def stored_likes(post_id: int) -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(SocialPost.likes_count).where(SocialPost.id == post_id))
+
+
+async def test_like_and_unlike_are_idempotent(client):
+    author, (post_id,) = await share_dreams(client, 1)
+    async with AsyncSessionLocal() as session:
+        reader = await create_user(session, "reader")
+    like = f"/api/v1/social/posts/{post_id}/like"
+
+    for _ in range(2):
+        response = await client.post(like, params={"user_id": reader.id})
+        assert response.json() == {"post_id": post_id, "liked": True, "likes_count": 1}
+    # Counted from the pending delta before any flush
+    assert await stored_likes(post_id) == 0
+
+    for _ in range(2):
+        response = await client.delete(like, params={"user_id": reader.id})
+        assert response.json() == {"post_id": post_id, "liked": False, "likes_count": 0}
+
+
+async def test_flush_writes_pending_deltas(client):
+    _, (post_id,) = await share_dreams(client, 1)
+    for n in range(3):
+        async with AsyncSessionLocal() as session:
+            reader = await create_user(session, f"reader{n}")
+        await client.post(f"/api/v1/social/posts/{post_id}/like", params={"user_id": reader.id})
+
+    assert await engagement_counters.flush() == 1
+    assert await stored_likes(post_id) == 3
+    assert not await get_redis().exists(PENDING_KEY)
+    assert await engagement_counters.pending_deltas([post_id]) == {}
+
+
+async def test_reconcile_corrects_drift_around_pending_deltas(client):
+    _, (post_id,) = await share_dreams(client, 1)
+    async with AsyncSessionLocal() as session:
+        reader = await create_user(session, "reader")
+    await client.post(f"/api/v1/social/posts/{post_id}/like", params={"user_id": reader.id})
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(SocialPost).where(SocialPost.id == post_id).values(likes_count=7))
+        await session.commit()
+
+    assert await engagement_counters.reconcile() == 1
+    # The true count minus the delta still pending
+    assert await stored_likes(post_id) == 0
+    await engagement_counters.flush()
+    assert await stored_likes(post_id) == 1
+
+
+async def test_flush_respects_another_process_lock(client):
+    _, (post_id,) = await share_dreams(client, 1)
+    await engagement_counters.add(post_id, "likes", 1)
+    await get_redis().set(FLUSH_LOCK_KEY, "other-process", ex=60)
+
+    assert await engagement_counters.flush() == 0
+    assert await get_redis().get(FLUSH_LOCK_KEY) == "other-process"
+
+    await engagement_counters._unlock(FLUSH_LOCK_KEY, "stale-token")
+    assert await get_redis().get(FLUSH_LOCK_KEY) == "other-process"
+
+
+async def test_reconcile_during_a_like_does_not_count_it_twice(client, monkeypatch):
+    _, (post_id,) = await share_dreams(client, 1)
+    async with AsyncSessionLocal() as session:
+        reader = await create_user(session, "reader")
+    add = engagement_counters.add
+    reconciled = []
+
+    async def reconcile_then_add(*args):
+        # The like is committed but its delta not yet recorded
+        reconciled.append(await engagement_counters.reconcile())
+        await add(*args)
+
+    monkeypatch.setattr(engagement_counters, "add", reconcile_then_add)
+    await client.post(f"/api/v1/social/posts/{post_id}/like", params={"user_id": reader.id})
+    await engagement_counters.flush()
+
+    assert reconciled == [0]
+    assert await stored_likes(post_id) == 1
+    assert not await get_redis().exists(f"{CHANGING_PREFIX}{post_id}")
+
+
+async def test_flagged_posts_cannot_be_liked_or_commented_on(client):
+    _, (post_id,) = await share_dreams(client, 1)
+    async with AsyncSessionLocal() as session:
+        reader = await create_user(session, "reader")
+        await session.execute(update(SocialPost).where(SocialPost.id == post_id).values(is_flagged=True))
+        await session.commit()
+    params = {"user_id": reader.id}
+
+    assert (await client.post(f"/api/v1/social/posts/{post_id}/like", params=params)).status_code == 404
+    response = await client.post(f"/api/v1/social/posts/{post_id}/comments", params=params, json={"text": "Ameen"})
+    assert response.status_code == 404
+
+
+async def test_unknown_user_cannot_like_or_comment(client):
+    _, (post_id,) = await share_dreams(client, 1)
+    params = {"user_id": 999}
+
+    assert (await client.post(f"/api/v1/social/posts/{post_id}/like", params=params)).status_code == 404
+    response = await client.post(f"/api/v1/social/posts/{post_id}/comments", params=params, json={"text": "Ameen"})
+    assert response.status_code == 404
+    assert await engagement_counters.pending_deltas([post_id]) == {}
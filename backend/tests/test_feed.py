@@ -0,0 +1,70 @@
+"""
+Social feeds: cursor pagination and fan-out to follower timelines
+"""
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
+from app.services.feed_service import TIMELINE_PREFIX
+from app.services.response_cache import response_cache
+from tests.factories import create_dream, create_user, share_dreams
+
+
+@pytest.fixture(autouse=True)
+def uncached(monkeypatch):
+    # These tests read the routes, not the response cache
+    monkeypatch.setattr(response_cache, "enabled", False)
+
+
+async def test_feed_pages_through_every_post_once(client):
+    _, post_ids = await share_dreams(client, 5)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/v1/social/feed", params=params)).json()
+        seen += [post["id"] for post in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == list(reversed(post_ids))
+
+
+async def test_feed_rejects_malformed_cursor(client):
+    response = await client.get("/api/v1/social/feed", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_fan_out_reaches_materialized_timelines_only(client):
+    async with AsyncSessionLocal() as session:
+        author = await create_user(session, "author")
+        reader = await create_user(session, "reader")
+        lurker = await create_user(session, "lurker")
+        dream = await create_dream(session, author)
+    for follower in (reader, lurker):
+        await client.post(f"/api/v1/social/users/{author.id}/follow", params={"user_id": follower.id})
+    # Reading the following feed materializes the reader's timeline
+    await client.get("/api/v1/social/feed/following", params={"user_id": reader.id})
+
+    post_id = (await client.post(f"/api/v1/social/dreams/{dream.id}/share", json={})).json()["id"]
+
+    assert await get_redis().zscore(f"{TIMELINE_PREFIX}{reader.id}", str(post_id)) is not None
+    assert not await get_redis().exists(f"{TIMELINE_PREFIX}{lurker.id}")
+    page = (await client.get("/api/v1/social/feed/following", params={"user_id": reader.id})).json()
+    assert [post["id"] for post in page["items"]] == [post_id]
+
+
+async def test_follow_is_idempotent_and_checks_both_users(client):
+    async with AsyncSessionLocal() as session:
+        author = await create_user(session, "author")
+        reader = await create_user(session, "reader")
+    follow = f"/api/v1/social/users/{author.id}/follow"
+
+    for _ in range(2):
+        response = await client.post(follow, params={"user_id": reader.id})
+        assert response.json()["following"] is True
+
+    assert (await client.post(follow, params={"user_id": 999})).status_code == 404
+    response = await client.post("/api/v1/social/users/999/follow", params={"user_id": reader.id})
+    assert response.status_code == 404
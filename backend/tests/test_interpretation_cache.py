@@ -0,0 +1,93 @@
+"""
+Interpretation cache: exact and similarity hits in front of fake Ollama hosts
+"""
+from app.services.interpretation_cache import LRUCache, interpretation_cache
+from tests.fake_ollama import INTERPRETATION
+
+DREAM = "I drank clear water from a well in my village"
+
+
+async def test_repeat_dream_is_served_from_cache(ollama, ollama_service):
+    first = await ollama_service.interpret_dream(DREAM)
+    second = await ollama_service.interpret_dream(DREAM)
+
+    assert "cached" not in first
+    assert second["cached"] is True
+    assert second["interpretation"] == first["interpretation"] == INTERPRETATION
+    assert ollama.generations == 1
+    stats = interpretation_cache.get_stats()
+    assert (stats["exact_hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+
+async def test_case_and_whitespace_do_not_change_the_key(ollama, ollama_service):
+    await ollama_service.interpret_dream(DREAM)
+
+    result = await ollama_service.interpret_dream(f"  {DREAM.upper()}\n")
+
+    assert result["cached"] is True
+    assert ollama.generations == 1
+
+
+async def test_context_is_part_of_the_key(ollama, ollama_service):
+    await ollama_service.interpret_dream(DREAM, context={"emotions": "calm"})
+
+    result = await ollama_service.interpret_dream(DREAM, context={"emotions": "fear"})
+
+    assert "cached" not in result
+    assert ollama.generations == 2
+
+
+async def test_use_cache_false_regenerates_and_refreshes(ollama, ollama_service):
+    await ollama_service.interpret_dream(DREAM)
+
+    fresh = await ollama_service.interpret_dream(DREAM, use_cache=False)
+
+    assert "cached" not in fresh
+    assert ollama.generations == 2
+    assert (await ollama_service.interpret_dream(DREAM))["cached"] is True
+    assert interpretation_cache.get_stats()["stores"] == 2
+
+
+async def test_entries_are_shared_through_redis(ollama, ollama_service, monkeypatch):
+    await ollama_service.interpret_dream(DREAM)
+    # Another process starts with an empty in-process LRU
+    monkeypatch.setattr(interpretation_cache, "_local", LRUCache(100, interpretation_cache.ttl))
+
+    result = await ollama_service.interpret_dream(DREAM)
+
+    assert result["cached"] is True
+    assert ollama.generations == 1
+
+
+async def test_similar_dream_is_served_from_similarity_tier(ollama, ollama_service, monkeypatch):
+    monkeypatch.setattr(interpretation_cache, "similarity_enabled", True)
+    await ollama_service.interpret_dream(DREAM)
+
+    similar = await ollama_service.interpret_dream("I drank cool water from the well of my village")
+    ollama.configure(embedding=[0.0, 1.0, 0.0])
+    unrelated = await ollama_service.interpret_dream("A lion walked into the mosque")
+
+    assert similar["cached"] is True
+    assert "cached" not in unrelated
+    assert ollama.generations == 2
+    assert interpretation_cache.get_stats()["similar_hits"] == 1
+
+
+async def test_stream_replays_a_cached_interpretation(ollama, ollama_service):
+    await ollama_service.interpret_dream(DREAM)
+
+    events = [event async for event in ollama_service.stream_interpretation(DREAM)]
+
+    assert events[0] == {"event": "token", "token": INTERPRETATION}
+    assert events[-1]["cached"] is True
+    assert ollama.generations == 1
+
+
+async def test_disabled_cache_always_generates(ollama, ollama_service, monkeypatch):
+    monkeypatch.setattr(interpretation_cache, "enabled", False)
+
+    for _ in range(2):
+        assert "cached" not in await ollama_service.interpret_dream(DREAM)
+
+    assert ollama.generations == 2
+    assert interpretation_cache.get_stats()["stores"] == 0
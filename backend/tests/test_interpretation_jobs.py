@@ -0,0 +1,141 @@
+"""
+Background interpretation jobs: lifecycle, claiming and recovery
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+from app.models import Interpretation, InterpretationStatus
+from app.services import interpretation_jobs as jobs_module
+from app.services.interpretation_jobs import InterpretationJobQueue
+from app.services.scheduler import SchedulerOverloaded
+from tests.factories import create_dream, create_user
+
+RESULT = {
+    "success": True,
+    "interpretation": "A snake often stands for an enemy.",
+    "model": "llama2",
+    "confidence": 0.8,
+    "prompt_version": "dream@v1",
+    "sections": {"key_symbols": ["snake"], "spiritual_guidance": "Seek refuge in Allah."},
+}
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    """
+    Replace the Ollama call; returns the list of dreams interpreted
+    """
+    calls = []
+
+    async def interpret(dream, priority=None, use_cache=True):
+        calls.append(dream.id)
+        await asyncio.sleep(0.05)
+        return RESULT
+
+    monkeypatch.setattr(jobs_module, "interpret_stored_dream", interpret)
+    return calls
+
+
+async def job_row(job_id: int) -> Interpretation:
+    async with AsyncSessionLocal() as session:
+        return await session.get(Interpretation, job_id)
+
+
+async def submit_job(queue: InterpretationJobQueue, username: str = "dreamer") -> int:
+    async with AsyncSessionLocal() as session:
+        user = await create_user(session, username)
+        dream = await create_dream(session, user)
+        job = await queue.submit(session, dream)
+    return job.id
+
+
+async def test_job_runs_from_pending_to_completed(generations):
+    queue = InterpretationJobQueue(workers=1)
+    job_id = await submit_job(queue)
+    assert (await job_row(job_id)).status == InterpretationStatus.PENDING
+
+    await queue.start()
+    try:
+        await queue.wait(job_id, timeout=5)
+    finally:
+        await queue.stop()
+
+    job = await job_row(job_id)
+    assert job.status == InterpretationStatus.COMPLETED
+    assert job.interpretation_text == RESULT["interpretation"]
+    assert job.prompt_version == "dream@v1"
+    assert job.key_symbols == '["snake"]'
+    assert queue.get_stats()["completed"] == 1
+
+
+async def test_job_is_run_by_one_worker_only(generations):
+    first, second = InterpretationJobQueue(), InterpretationJobQueue()
+    job_id = await submit_job(first)
+
+    await asyncio.gather(first._run(job_id), second._run(job_id))
+
+    assert generations == [generations[0]]
+    assert (await job_row(job_id)).status == InterpretationStatus.COMPLETED
+    assert first.get_stats()["skipped"] + second.get_stats()["skipped"] == 1
+
+
+async def test_overloaded_job_returns_to_pending(monkeypatch):
+    async def overloaded(dream, priority=None, use_cache=True):
+        raise SchedulerOverloaded("busy", retry_after=1)
+
+    monkeypatch.setattr(jobs_module, "interpret_stored_dream", overloaded)
+    queue = InterpretationJobQueue()
+    job_id = await submit_job(queue)
+
+    with pytest.raises(SchedulerOverloaded):
+        await queue._run(job_id)
+    assert (await job_row(job_id)).status == InterpretationStatus.PENDING
+
+
+async def test_failed_save_declines_job(monkeypatch):
+    async def unstorable(dream, priority=None, use_cache=True):
+        return {**RESULT, "confidence": "not a number"}
+
+    monkeypatch.setattr(jobs_module, "interpret_stored_dream", unstorable)
+    queue = InterpretationJobQueue()
+    job_id = await submit_job(queue)
+
+    with pytest.raises(Exception):
+        await queue._run(job_id)
+    job = await job_row(job_id)
+    assert job.status == InterpretationStatus.DECLINED
+    assert queue.get_stats()["failed"] == 1
+
+
+async def test_start_recovers_pending_and_expired_jobs(generations, monkeypatch):
+    monkeypatch.setattr(jobs_module.settings, "INTERPRETATION_JOB_LEASE", 60)
+    queue = InterpretationJobQueue(workers=1)
+    pending, running, abandoned = [await submit_job(queue, f"dreamer{n}") for n in range(3)]
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            text("UPDATE interpretations SET status = 'in_progress' WHERE id IN (:running, :abandoned)"),
+            {"running": running, "abandoned": abandoned},
+        )
+        # The trigger stamps updated_at; backdate after it has run
+        await session.execute(text("ALTER TABLE interpretations DISABLE TRIGGER update_interpretations_updated_at"))
+        await session.execute(
+            text("UPDATE interpretations SET updated_at = LOCALTIMESTAMP - INTERVAL '1 hour' WHERE id = :id"),
+            {"id": abandoned},
+        )
+        await session.execute(text("ALTER TABLE interpretations ENABLE TRIGGER update_interpretations_updated_at"))
+        await session.commit()
+
+    fresh = InterpretationJobQueue(workers=1)
+    await fresh.start()
+    try:
+        await fresh.wait(pending, timeout=5)
+        await fresh.wait(abandoned, timeout=5)
+    finally:
+        await fresh.stop()
+
+    assert (await job_row(pending)).status == InterpretationStatus.COMPLETED
+    assert (await job_row(abandoned)).status == InterpretationStatus.COMPLETED
+    assert (await job_row(running)).status == InterpretationStatus.IN_PROGRESS
@@ -0,0 +1,81 @@
+"""
+Dream journal import and export through the API
+"""
+import json
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from tests.factories import create_user
+
+RECORDS = [
+    {
+        "title": "Snake in the garden",
+        "description": "A black snake, quiet, under the \"old\" tree",
+        "dream_type": "regular",
+        "emotions": ["fear"],
+        "symbols": ["snake", "tree"],
+        "tags": ["garden"],
+        "privacy": "private",
+    },
+    {
+        "title": "Clear water",
+        "description": "I drank clear water from a well;\nit was sweet",
+        "dream_type": "istikhara",
+        "istikhara_decision": "Whether to move cities",
+        "privacy": "public",
+    },
+]
+
+
+@pytest.fixture
+async def owner():
+    async with AsyncSessionLocal() as session:
+        return await create_user(session, "journaler")
+
+
+def ndjson(records) -> bytes:
+    return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+
+async def export(client, user_id: int, fmt: str) -> str:
+    response = await client.get("/api/v1/dreams/export", params={"user_id": user_id, "format": fmt})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson" if fmt == "ndjson" else "text/csv")
+    return response.text
+
+
+def comparable(record):
+    return {field: record.get(field) for field in RECORDS[0] | RECORDS[1]}
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+async def test_export_imports_back_unchanged(client, owner, fmt):
+    response = await client.post("/api/v1/dreams/import", params={"user_id": owner.id}, content=ndjson(RECORDS))
+    assert response.json() == {"imported": 2, "failed": 0, "errors": [], "complete": True}
+    exported = await export(client, owner.id, fmt)
+
+    async with AsyncSessionLocal() as session:
+        copy = await create_user(session, "copy")
+    headers = {"content-type": "text/csv"} if fmt == "csv" else {}
+    response = await client.post("/api/v1/dreams/import", params={"user_id": copy.id},
+                                 content=exported.encode(), headers=headers)
+    assert response.json()["imported"] == 2
+
+    records = [json.loads(line) for line in (await export(client, copy.id, "ndjson")).splitlines()]
+    assert [comparable(record) for record in records] == [comparable(record) for record in RECORDS]
+
+
+async def test_invalid_records_are_reported_and_skipped(client, owner):
+    body = ndjson([RECORDS[0], {"title": "No description"}]) + b"not json\n" + ndjson([RECORDS[1]])
+
+    result = (await client.post("/api/v1/dreams/import", params={"user_id": owner.id}, content=body)).json()
+
+    assert (result["imported"], result["failed"], result["complete"]) == (2, 2, True)
+    assert [error["line"] for error in result["errors"]] == [2, 3]
+
+
+async def test_unknown_user_is_not_found(client):
+    assert (await client.get("/api/v1/dreams/export", params={"user_id": 999})).status_code == 404
+    response = await client.post("/api/v1/dreams/import", params={"user_id": 999}, content=ndjson(RECORDS))
+    assert response.status_code == 404
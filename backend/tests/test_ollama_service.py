@@ -0,0 +1,181 @@
+"""
+Ollama calls against fake hosts: balancing, ejection, circuit breaking,
+admission control and streaming
+"""
+import asyncio
+
+import pytest
+
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.ollama_balancer import OllamaNode
+from app.services.scheduler import GenerationScheduler, Priority, SchedulerOverloaded
+from tests.fake_ollama import INTERPRETATION, dreams
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+async def test_requests_go_to_the_least_busy_node(ollama, ollama_service):
+    ollama.configure(delay=0.05)
+
+    results = await asyncio.gather(*(ollama_service.interpret_dream(dream, use_cache=False) for dream in dreams(4)))
+
+    assert all(result["success"] for result in results)
+    assert [host.generations for host in ollama.hosts] == [2, 2]
+    assert ollama_service.get_pool_stats()["requests_total"] == 4
+
+
+async def test_down_node_is_retried_elsewhere_and_ejected(ollama, ollama_service):
+    down, up = ollama.hosts
+    down.up = False
+
+    results = [await ollama_service.interpret_dream(dream, use_cache=False) for dream in dreams(4)]
+
+    assert all(result["interpretation"] == INTERPRETATION for result in results)
+    # Each retry goes to the other host; eject_after=2 takes the down one out
+    assert ollama.attempts == [down.url, up.url, down.url, up.url, up.url, up.url]
+    assert [node["healthy"] for node in ollama_service.balancer.get_stats()] == [False, True]
+
+
+async def test_retry_skips_the_node_that_failed(ollama):
+    service = ollama.service(eject_after=10)
+    down, up = ollama.hosts
+    down.up = False
+
+    for dream in dreams(3):
+        assert (await service.interpret_dream(dream, use_cache=False))["success"]
+
+    # Never ejected, so every request tries it first but retries elsewhere
+    assert ollama.attempts == [down.url, up.url] * 3
+    await service.shutdown()
+
+
+async def test_node_without_latency_ranks_at_the_median(ollama, ollama_service):
+    first, second = ollama_service.balancer.nodes
+    first.avg_latency, second.avg_latency = 0.2, 0.4
+    ollama_service.balancer.nodes.append(OllamaNode("http://ollama-new:11434"))
+
+    # The new node ranks at 0.3s: behind the fastest node, ahead of the slowest
+    assert ollama_service.balancer.pick() is first
+    first.outstanding = 1
+
+    assert ollama_service.balancer.pick().url == "http://ollama-new:11434"
+
+
+async def test_health_probe_readmits_a_recovered_node(ollama, ollama_service):
+    down = ollama.hosts[0]
+    down.up = False
+    assert await ollama_service.check_health()
+    assert await ollama_service.check_health()
+    assert not ollama_service.balancer.nodes[0].healthy
+
+    down.up = True
+    assert await ollama_service.check_health()
+
+    assert all(node.healthy for node in ollama_service.balancer.nodes)
+
+
+async def test_open_circuit_fails_fast(ollama):
+    service = ollama.service(failure_threshold=2)
+    ollama.configure(status=500)
+
+    for dream in dreams(2):
+        assert (await service.interpret_dream(dream, use_cache=False))["success"] is False
+    with pytest.raises(CircuitOpenError) as refused:
+        await service.interpret_dream("A third dream about rain", use_cache=False)
+
+    assert ollama.generations == 2
+    assert refused.value.retry_after > 0
+    assert service.get_resilience_stats()["circuit"]["state"] == "open"
+    await service.shutdown()
+
+
+async def test_generations_are_capped_at_max_concurrency(ollama):
+    service = ollama.service(max_concurrency=2)
+    ollama.configure(delay=0.03)
+
+    results = await asyncio.gather(*(service.interpret_dream(dream, use_cache=False) for dream in dreams(6)))
+
+    assert all(result["success"] for result in results)
+    assert ollama.peak_active == 2
+    assert service.scheduler.get_stats()["queued"] == 4
+    await service.shutdown()
+
+
+async def test_full_queue_rejects_and_high_priority_displaces_bulk(ollama):
+    service = ollama.service(max_concurrency=1, max_queue=1)
+    ollama.configure(delay=0.2)
+    first, bulk = dreams(2)
+
+    running = asyncio.create_task(service.interpret_dream(first, use_cache=False))
+    await wait_until(lambda: ollama.active == 1)
+    queued = asyncio.create_task(service.interpret_dream(bulk, priority=Priority.BULK, use_cache=False))
+    await wait_until(lambda: service.scheduler.queue_length == 1)
+
+    with pytest.raises(SchedulerOverloaded):
+        await service.interpret_dream("A dream of the same priority", priority=Priority.BULK, use_cache=False)
+    urgent = await service.interpret_dream("An Istikhara dream of a door", priority=Priority.HIGH, use_cache=False)
+
+    assert urgent["success"]
+    assert (await running)["success"]
+    with pytest.raises(SchedulerOverloaded):
+        await queued
+    assert service.scheduler.get_stats()["displaced"] == 1
+    assert ollama.generations == 2
+    await service.shutdown()
+
+
+async def test_stream_yields_tokens_then_summary(ollama, ollama_service):
+    events = [event async for event in ollama_service.stream_interpretation(dreams(1)[0])]
+
+    tokens = [event["token"] for event in events if event["event"] == "token"]
+    assert "".join(tokens) == INTERPRETATION
+    assert len(tokens) > 1
+    done = events[-1]
+    assert done["event"] == "done"
+    assert done["tokens"] == 12
+    assert done["usage"]["completion_tokens"] == 12
+    assert ollama.generations == 1
+
+
+async def test_stream_reports_its_own_place_in_the_queue(ollama):
+    service = ollama.service(max_concurrency=1)
+    ollama.configure(delay=0.1)
+    first, second, third = dreams(3)
+
+    async def collect(dream):
+        return [event async for event in service.stream_interpretation(dream)]
+
+    running = asyncio.create_task(collect(first))
+    await wait_until(lambda: ollama.active == 1)
+    queued = asyncio.create_task(collect(second))
+    await wait_until(lambda: service.scheduler.queue_length == 1)
+    behind = await collect(third)
+
+    running, queued = await running, await queued
+    assert running[0]["event"] == "token"
+    assert queued[0] == {"event": "queued", "position": 1}
+    assert behind[0] == {"event": "queued", "position": 2}
+    assert [events[-1]["event"] for events in (running, queued, behind)] == ["done"] * 3
+    await service.shutdown()
+
+
+
+async def test_reservation_that_is_not_entered_can_be_given_up():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=2)
+    running = scheduler.reserve()
+    queued = scheduler.reserve(Priority.BULK)
+    urgent = scheduler.reserve(Priority.HIGH)
+
+    assert (running.position, queued.position, urgent.position) == (0, 1, 1)
+    urgent.cancel()
+    assert scheduler.queue_length == 1
+    running.cancel()
+    async with queued:
+        assert scheduler.get_stats()["running"] == 1
+    assert scheduler.get_stats()["running"] == 0
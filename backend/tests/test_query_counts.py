@@ -0,0 +1,181 @@
+"""
+Database queries per API endpoint
+
+Each endpoint has a budget of statements. List endpoints are called with
+a small and a large page and must not run more queries for the larger
+one, the signature of an N+1 query. Redis is disconnected and the
+response cache is off, so the counts are those of the uncached path.
+"""
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal, count_queries
+from app.core.redis import close_redis
+from app.models.dream import Dream, DreamPrivacy
+from app.models.interpretation import Interpretation, InterpretationStatus, InterpretationType
+from app.models.social import Comment, Follow, SocialPost
+from app.models.user import User
+from app.services.response_cache import response_cache
+from app.services.trending_service import trending_service
+
+SEARCH_WORD = "qcfixturelantern"
+
+AUTHORS = 4
+DREAMS_PER_AUTHOR = 6
+TOP_LEVEL_COMMENTS = 6
+REPLIES_PER_COMMENT = 2
+
+# Page sizes compared for list endpoints
+SMALL_PAGE = 2
+LARGE_PAGE = 20
+
+
+class Check(NamedTuple):
+    """
+    One endpoint call and the most statements it may run
+
+    The path is formatted with the seeded ids and, for list endpoints
+    (paginated), the page size as {limit}; body builds the JSON body
+    from the ids.
+    """
+    name: str
+    method: str
+    path: str
+    budget: int
+    body: Optional[Callable[[Dict[str, int]], Dict]] = None
+    paginated: bool = False
+
+
+CHECKS = [
+    Check("global feed", "GET", "/api/v1/social/feed?limit={limit}", 1, paginated=True),
+    Check("following feed", "GET", "/api/v1/social/feed/following?user_id={reader}&limit={limit}", 2,
+          paginated=True),
+    Check("trending", "GET", "/api/v1/social/trending?limit={limit}", 1, paginated=True),
+    Check("comment thread", "GET", "/api/v1/social/posts/{post}/comments?limit={limit}", 2, paginated=True),
+    Check("dream search", "GET", f"/api/v1/dreams/search?q={SEARCH_WORD}&user_id={{reader}}&limit={{limit}}", 1,
+          paginated=True),
+    Check("similar dreams", "GET", "/api/v1/dreams/{dream}/similar?user_id={reader}&limit={limit}", 4,
+          paginated=True),
+    Check("interpretation job", "GET", "/api/v1/interpretations/jobs/{job}", 1),
+    Check("like post", "POST", "/api/v1/social/posts/{post}/like?user_id={reader}", 2),
+    Check("reply to comment", "POST", "/api/v1/social/posts/{post}/comments?user_id={reader}", 3,
+          body=lambda ids: {"text": "Query count check", "parent_comment_id": ids["comment"]}),
+    Check("share dream", "POST", "/api/v1/social/dreams/{unshared_dream}/share", 4,
+          body=lambda ids: {"caption": "Query count check"}),
+]
+
+
+@pytest.fixture(autouse=True)
+async def uncached(monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", False)
+    await close_redis()
+
+
+@pytest.fixture
+async def ids() -> Dict[str, int]:
+    """
+    A reader following every author, public dreams shared as posts, and
+    a comment tree on the first post
+    """
+    async with AsyncSessionLocal() as session:
+        user_ids = list(await session.scalars(
+            insert(User).returning(User.id),
+            [
+                {"email": f"qc_{i}@example.com", "username": f"qc_{i}", "hashed_password": "-"}
+                for i in range(AUTHORS + 1)
+            ]
+        ))
+        reader, authors = user_ids[0], user_ids[1:]
+        await session.execute(
+            insert(Follow),
+            [{"follower_id": reader, "followee_id": author} for author in authors]
+        )
+
+        dream_ids = list(await session.scalars(
+            insert(Dream).returning(Dream.id),
+            [
+                {
+                    "user_id": author,
+                    "title": f"Lantern dream {i}",
+                    "description": f"I carried a {SEARCH_WORD} through a dark street and it lit every door",
+                    "symbols": ["lantern", "door"],
+                    "privacy": DreamPrivacy.PUBLIC,
+                }
+                for author in authors for i in range(DREAMS_PER_AUTHOR)
+            ]
+        ))
+        # The last dream stays unshared for the share check
+        shared = dream_ids[:-1]
+        author_of = {dream_id: authors[i // DREAMS_PER_AUTHOR] for i, dream_id in enumerate(dream_ids)}
+        post_ids = list(await session.scalars(
+            insert(SocialPost).returning(SocialPost.id),
+            [{"user_id": author_of[dream_id], "dream_id": dream_id} for dream_id in shared]
+        ))
+
+        top_level = list(await session.scalars(
+            insert(Comment).returning(Comment.id),
+            [
+                {"user_id": user_ids[i % len(user_ids)], "post_id": post_ids[0], "text": f"Comment {i}"}
+                for i in range(TOP_LEVEL_COMMENTS)
+            ]
+        ))
+        await session.execute(
+            insert(Comment),
+            [
+                {
+                    "user_id": user_ids[(i + j + 1) % len(user_ids)],
+                    "post_id": post_ids[0],
+                    "parent_comment_id": parent,
+                    "text": f"Reply {j} to comment {i}",
+                }
+                for i, parent in enumerate(top_level) for j in range(REPLIES_PER_COMMENT)
+            ]
+        )
+
+        job = await session.scalar(
+            insert(Interpretation)
+            .values(
+                user_id=author_of[dream_ids[0]],
+                dream_id=dream_ids[0],
+                interpretation_type=InterpretationType.AI,
+                interpretation_text="A lantern is guidance.",
+                status=InterpretationStatus.COMPLETED,
+            )
+            .returning(Interpretation.id)
+        )
+        await session.commit()
+
+    for post_id in post_ids:
+        await trending_service.record(post_id, "share")
+
+    return {
+        "reader": reader,
+        "dream": dream_ids[0],
+        "unshared_dream": dream_ids[-1],
+        "post": post_ids[0],
+        "comment": top_level[0],
+        "job": job,
+    }
+
+
+async def measure(client, check: Check, ids: Dict[str, int], limit: int) -> List[str]:
+    """
+    Call an endpoint and return the statements it executed
+    """
+    body = check.body(ids) if check.body else None
+    with count_queries() as counter:
+        response = await client.request(check.method, check.path.format(limit=limit, **ids), json=body)
+    assert response.status_code < 400, f"HTTP {response.status_code} {response.text[:200]}"
+    return counter.statements
+
+
+@pytest.mark.parametrize("check", CHECKS, ids=[check.name for check in CHECKS])
+async def test_query_budget(client, ids, check):
+    statements = await measure(client, check, ids, SMALL_PAGE)
+    assert len(statements) <= check.budget, "\n".join(statements)
+
+    if check.paginated:
+        larger = await measure(client, check, ids, LARGE_PAGE)
+        assert len(larger) <= len(statements), "\n".join(larger)
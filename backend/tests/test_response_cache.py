@@ -0,0 +1,84 @@
+"""
+Cached read routes: ETags, conditional GETs and invalidation on commit
+"""
+import pytest
+
+from app.core.config import settings
+from app.services.interpretation_cache import LRUCache
+from app.services.response_cache import response_cache
+from tests.factories import share_dreams
+
+FEED = "/api/v1/social/feed"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    # Entries and tag versions from earlier tests must not be served
+    monkeypatch.setattr(response_cache, "enabled", True)
+    monkeypatch.setattr(response_cache, "_local", LRUCache(100, settings.RESPONSE_CACHE_MAX_TTL))
+    monkeypatch.setattr(response_cache, "_versions", {})
+
+
+async def test_repeat_request_is_served_from_cache(client):
+    await share_dreams(client, 2)
+
+    first = await client.get(FEED)
+    second = await client.get(FEED)
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.json() == first.json()
+    assert first.headers["cache-control"] == f"public, max-age={settings.RESPONSE_CACHE_FEED_TTL}"
+
+
+async def test_matching_etag_gets_304(client):
+    await share_dreams(client, 1)
+    etag = (await client.get(FEED)).headers["etag"]
+
+    response = await client.get(FEED, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+async def test_stale_etag_gets_full_response(client):
+    await share_dreams(client, 1)
+
+    response = await client.get(FEED, headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+
+async def test_commit_invalidates_cached_pages(client):
+    await share_dreams(client, 1)
+    before = await client.get(FEED)
+
+    await share_dreams(client, 1, username="second")
+    after = await client.get(FEED, headers={"If-None-Match": before.headers["etag"]})
+
+    assert after.status_code == 200
+    assert after.headers["x-cache"] == "MISS"
+    assert len(after.json()["items"]) == 2
+
+
+async def test_query_string_varies_the_entry(client):
+    await share_dreams(client, 3)
+
+    assert (await client.get(FEED, params={"limit": 1})).headers["x-cache"] == "MISS"
+    response = await client.get(FEED, params={"limit": 2})
+
+    assert response.headers["x-cache"] == "MISS"
+    assert len(response.json()["items"]) == 2
+
+
+async def test_unregistered_routes_are_not_cached(client):
+    _, (post_id,) = await share_dreams(client, 1)
+
+    response = await client.get(f"/api/v1/social/posts/{post_id}/comments")
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert "x-cache" not in response.headers
@@ -0,0 +1,76 @@
+"""
+Single-flight: concurrent identical interpretations share one generation
+"""
+import asyncio
+
+import pytest
+
+from tests.fake_ollama import INTERPRETATION
+
+DREAM = "I drank clear water from a well in my village"
+
+
+@pytest.fixture(autouse=True)
+def slow_generations(ollama):
+    # Long enough for concurrent callers to find the generation in flight
+    ollama.configure(delay=0.05)
+
+
+async def test_concurrent_identical_requests_share_a_generation(ollama, ollama_service):
+    results = await asyncio.gather(*(ollama_service.interpret_dream(DREAM) for _ in range(5)))
+
+    assert [result["interpretation"] for result in results] == [INTERPRETATION] * 5
+    assert ollama.generations == 1
+    assert ollama_service.get_single_flight_stats()["coalesced"] == 4
+
+
+async def test_different_dreams_are_not_coalesced(ollama, ollama_service):
+    await asyncio.gather(
+        ollama_service.interpret_dream(DREAM),
+        ollama_service.interpret_dream(f"{DREAM} at night"),
+    )
+
+    assert ollama.generations == 2
+
+
+async def test_uncached_requests_do_not_join_a_cached_flight(ollama, ollama_service):
+    await asyncio.gather(
+        ollama_service.interpret_dream(DREAM),
+        ollama_service.interpret_dream(DREAM, use_cache=False),
+        ollama_service.interpret_dream(DREAM, use_cache=False),
+    )
+
+    assert ollama.generations == 2
+
+
+async def test_failure_reaches_every_waiter(ollama, ollama_service):
+    ollama.configure(status=500)
+
+    results = await asyncio.gather(*(ollama_service.interpret_dream(DREAM) for _ in range(3)))
+
+    assert [result["success"] for result in results] == [False] * 3
+    assert ollama.generations == 1
+
+
+async def test_cancelled_caller_does_not_cancel_the_others(ollama, ollama_service):
+    first = asyncio.create_task(ollama_service.interpret_dream(DREAM))
+    second = asyncio.create_task(ollama_service.interpret_dream(DREAM))
+    await asyncio.sleep(0.01)
+
+    first.cancel()
+
+    assert (await second)["interpretation"] == INTERPRETATION
+    assert first.cancelled()
+    assert ollama.generations == 1
+
+
+async def test_concurrent_streams_share_one_upstream_stream(ollama, ollama_service):
+    async def collect():
+        return [event async for event in ollama_service.stream_interpretation(DREAM)]
+
+    streams = await asyncio.gather(*(collect() for _ in range(3)))
+
+    for events in streams:
+        assert "".join(event["token"] for event in events if event["event"] == "token") == INTERPRETATION
+        assert events[-1]["event"] == "done"
+    assert ollama.generations == 1
@@ -0,0 +1,97 @@
+"""
+Structured interpretations: incremental JSON parsing and section columns
+"""
+import json
+
+import pytest
+
+from app.models import Interpretation
+from app.services.structured_output import (
+    StreamingJSONParser,
+    parse_sections,
+    section_columns,
+    sections_from_columns,
+)
+
+SECTIONS = {
+    "interpretation": 'A "clear" well is {knowledge}, and a path is guidance.',
+    "key_symbols": [{"symbol": "well", "meaning": "knowledge \\ learning"}],
+    "spiritual_guidance": "Seek knowledge, [as] the Prophet taught.",
+    "quranic_references": ["Surah Al-Mulk 67:30"],
+    "hadith_references": [],
+}
+TEXT = json.dumps(SECTIONS, ensure_ascii=False)
+
+
+def feed_all(chunks):
+    parser = StreamingJSONParser()
+    completed = []
+    for chunk in chunks:
+        completed += parser.feed(chunk)
+    return parser, completed
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(TEXT)])
+def test_sections_are_the_same_however_the_text_is_split(size):
+    parser, completed = feed_all(TEXT[start:start + size] for start in range(0, len(TEXT), size))
+
+    assert completed == list(SECTIONS.items())
+    assert parser.sections == SECTIONS
+
+
+def test_each_section_is_reported_once_it_is_complete():
+    parser = StreamingJSONParser()
+
+    assert parser.feed('{"interpretation": "Water, {light} and \\"rain\\"') == []
+    assert parser.feed('", "key_symbols": [{"symbol": "rain",') == [
+        ("interpretation", 'Water, {light} and "rain"'),
+    ]
+    assert parser.feed(' "meaning": "mercy"}]}') == [
+        ("key_symbols", [{"symbol": "rain", "meaning": "mercy"}]),
+    ]
+
+
+def test_escaped_backslash_before_a_quote_ends_the_string():
+    parser, completed = feed_all(['{"interpretation": "ends with \\\\', '", "spiritual_guidance": "pray"}'])
+
+    assert completed == [("interpretation", "ends with \\"), ("spiritual_guidance", "pray")]
+
+
+def test_truncated_output_keeps_completed_sections():
+    sections = parse_sections(TEXT[:TEXT.index('"spiritual_guidance"') + 30])
+
+    assert sections == {
+        "interpretation": SECTIONS["interpretation"],
+        "key_symbols": SECTIONS["key_symbols"],
+    }
+
+
+def test_text_that_is_not_json_becomes_the_interpretation():
+    text = "  A well is knowledge; drinking from it is learning.\n"
+
+    assert parse_sections(text) == {"interpretation": text.strip()}
+
+
+def test_unknown_members_are_dropped():
+    sections = parse_sections('{"interpretation": "Rain is mercy.", "mood": "calm"}')
+
+    assert sections == {"interpretation": "Rain is mercy."}
+
+
+def test_columns_round_trip():
+    columns = section_columns(SECTIONS)
+    stored = Interpretation(interpretation_text=SECTIONS["interpretation"], **columns)
+
+    assert columns["hadith_references"] is None
+    assert sections_from_columns(stored) == {
+        name: value for name, value in SECTIONS.items() if value != []
+    }
+
+
+def test_hand_written_columns_are_read_as_single_items():
+    stored = Interpretation(interpretation_text="Rain is mercy.", key_symbols="rain", quranic_references="Surah Qaf")
+
+    sections = sections_from_columns(stored)
+
+    assert sections["key_symbols"] == [{"symbol": "rain", "meaning": ""}]
+    assert sections["quranic_references"] == ["Surah Qaf"]
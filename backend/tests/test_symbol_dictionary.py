@@ -0,0 +1,63 @@
+"""
+Symbol dictionary: whole-word matching of classical dream symbols
+"""
+import json
+
+import pytest
+
+from app.services import symbol_dictionary as symbol_dictionary_module
+from app.services.symbol_dictionary import SymbolDictionary, symbol_dictionary
+
+
+def symbols(text: str):
+    return [entry.symbol for entry in symbol_dictionary.lookup(text)]
+
+
+@pytest.mark.parametrize("text", ["I am doing well", "My mother came as well", "Well, then I woke up"])
+def test_well_in_other_senses_does_not_match(text):
+    assert "well" not in symbols(text)
+
+
+@pytest.mark.parametrize("text", ["I drank from a well", "I fell into the well", "Dry wells", "An old water well"])
+def test_well_as_a_noun_matches(text):
+    assert "well" in symbols(text)
+
+
+def test_only_whole_words_match():
+    assert symbols("Her education was a concatenation of scattered lessons") == []
+    assert symbols("A cat, then a snake!") == ["cat", "snake"]
+
+
+def test_aliases_plurals_and_phrases_match_their_symbol():
+    assert symbols("Serpents and two horses under a full moon") == ["snake", "horse", "moon"]
+    assert symbols("I wore white clothes") == ["white clothes"]
+
+
+def test_user_symbols_come_first_and_results_are_capped(monkeypatch):
+    monkeypatch.setattr(symbol_dictionary_module.settings, "SYMBOL_REFERENCES_MAX", 3)
+
+    found = symbol_dictionary.lookup("A lion, a wolf, a dog and a cat", ["rain"])
+
+    assert [entry.symbol for entry in found] == ["rain", "lion", "wolf"]
+    assert found[0].source == "Ibn Sirin"
+
+
+def test_missing_file_gives_an_empty_dictionary(tmp_path):
+    dictionary = SymbolDictionary(str(tmp_path / "missing.json"))
+
+    assert dictionary.lookup("A snake in the garden") == []
+    assert dictionary.size == 0
+
+
+def test_load_reads_the_file_once(tmp_path):
+    path = tmp_path / "symbols.json"
+    path.write_text(json.dumps({"version": 3, "symbols": [
+        {"symbol": "lamp", "aliases": ["lantern"], "meaning": "Guidance", "source": "Al-Nabulsi"},
+    ]}))
+    dictionary = SymbolDictionary(str(path))
+    dictionary.load()
+    path.write_text("not json")
+    dictionary.load()
+
+    assert dictionary.version == 3
+    assert [entry.meaning for entry in dictionary.lookup("Two lanterns")] == ["Guidance"]
@@ -0,0 +1,63 @@
+"""
+Token budgets: fitting dreams into the context window and usage accounting
+"""
+import pytest
+
+from app.services.token_budget import (
+    CHARS_PER_TOKEN,
+    TRUNCATION_MARKER,
+    TokenUsageStats,
+    dream_token_budget,
+    truncate_text,
+)
+
+DREAM = " ".join(f"word{n}" for n in range(400))
+
+
+def test_text_within_the_budget_is_unchanged():
+    assert truncate_text(DREAM, len(DREAM) // CHARS_PER_TOKEN + 1) is DREAM
+
+
+@pytest.mark.parametrize("max_tokens", [20, 100, 500])
+def test_long_text_keeps_its_beginning_and_end(max_tokens):
+    fitted = truncate_text(DREAM, max_tokens)
+    head, tail = fitted.split(TRUNCATION_MARKER)
+
+    assert len(fitted) <= max_tokens * CHARS_PER_TOKEN
+    assert DREAM.startswith(head)
+    assert DREAM.endswith(tail)
+    assert len(head) > len(tail)
+
+
+def test_cuts_fall_between_words():
+    head, tail = truncate_text(DREAM, 50).split(TRUNCATION_MARKER)
+
+    assert head.split(" ")[-1] in DREAM.split(" ")
+    assert tail.split(" ")[0] in DREAM.split(" ")
+
+
+def test_no_budget_leaves_only_the_marker():
+    assert truncate_text(DREAM, 0) == TRUNCATION_MARKER
+
+
+def test_budget_is_what_the_window_leaves_and_never_negative():
+    assert dream_token_budget(4096, 400, "x" * 300) == 4096 - 400 - 100 - 256
+    assert dream_token_budget(512, 512, "system") == 0
+
+
+def test_usage_is_aggregated_per_model():
+    stats = TokenUsageStats()
+    final = {"prompt_eval_count": 100, "eval_count": 40, "eval_duration": 2_000_000_000}
+
+    usage = stats.record("llama2", final)
+    stats.record("llama2", {**final, "done_reason": "length"})
+    stats.record_truncated_input("llama2")
+
+    assert usage["completion_tokens"] == 40
+    assert usage["eval_duration_ms"] == 2000.0
+    assert usage["total_duration_ms"] is None
+    llama = stats.get_stats()["llama2"]
+    assert (llama["generations"], llama["completion_tokens"], llama["stopped_at_limit"]) == (2, 80, 1)
+    assert llama["inputs_truncated"] == 1
+    assert llama["completion_tokens_per_second"] == 20.0
+    assert llama["prompt_tokens_per_second"] is None
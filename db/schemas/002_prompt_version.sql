@@ -0,0 +1,6 @@
+-- Record which prompt template produced an AI interpretation
+-- PostgreSQL 15+
+
+ALTER TABLE interpretations ADD COLUMN IF NOT EXISTS prompt_version VARCHAR(50);
+
+CREATE INDEX IF NOT EXISTS idx_interpretations_prompt_version ON interpretations(prompt_version);
@@ -0,0 +1,49 @@
+-- Follows and feed indexes
+-- PostgreSQL 15+
+
+-- Follows table
+CREATE TABLE IF NOT EXISTS follows (
+    id SERIAL PRIMARY KEY,
+    follower_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    followee_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+
+    -- Timestamps
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    -- A user follows another user at most once
+    CONSTRAINT unique_follower_followee UNIQUE (follower_id, followee_id),
+    CONSTRAINT no_self_follow CHECK (follower_id <> followee_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_follows_follower_id ON follows(follower_id);
+CREATE INDEX IF NOT EXISTS idx_follows_followee_id ON follows(followee_id);
+
+-- Denormalized follower count, used to choose fan-out on write or on read
+ALTER TABLE users ADD COLUMN IF NOT EXISTS followers_count INTEGER DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION update_follower_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE users SET followers_count = followers_count + 1 WHERE id = NEW.followee_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE users SET followers_count = followers_count - 1 WHERE id = OLD.followee_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_followers_counter AFTER INSERT OR DELETE ON follows
+    FOR EACH ROW EXECUTE FUNCTION update_follower_counters();
+
+-- Keyset pagination over visible posts: (created_at, id) cursors
+CREATE INDEX IF NOT EXISTS idx_social_posts_feed ON social_posts(created_at DESC, id DESC)
+    WHERE is_hidden = FALSE AND is_flagged = FALSE;
+
+-- Per-author keyset pagination (following feed, timeline rebuilds)
+CREATE INDEX IF NOT EXISTS idx_social_posts_user_feed ON social_posts(user_id, created_at DESC, id DESC)
+    WHERE is_hidden = FALSE AND is_flagged = FALSE;
+
+COMMENT ON TABLE follows IS 'Follow relationships between users for the following feed';
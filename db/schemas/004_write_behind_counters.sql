@@ -0,0 +1,18 @@
+-- Write-behind engagement counters
+-- PostgreSQL 15+
+--
+-- likes_count and comments_count are now maintained by the application:
+-- like/unlike/comment events are buffered and applied in periodic batched
+-- UPDATEs (app/services/engagement_counters.py). The per-row triggers made
+-- every like lock the post row and would double count alongside the buffer.
+
+DROP TRIGGER IF EXISTS update_likes_counter ON likes;
+DROP TRIGGER IF EXISTS update_comments_counter ON comments;
+
+-- Bring counters in line with the tables before the application takes over
+UPDATE social_posts p SET
+    likes_count = (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id),
+    comments_count = (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id);
+
+-- The Like model inherits updated_at from BaseModel
+ALTER TABLE likes ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,52 @@
+-- Dream search: full-text and fuzzy symbol matching
+-- PostgreSQL 15+
+--
+-- Search columns are maintained by a trigger and queried by
+-- app/services/search_service.py; they are not mapped on the ORM model.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- search_vector: weighted full-text document
+--   A: title and symbols/tags, B: description (English stemming)
+--   D: title and description without stemming ('simple'), which also
+--      covers Arabic script and transliterated terms
+-- symbols_text: lower-cased symbols and tags for trigram matching
+ALTER TABLE dreams ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE dreams ADD COLUMN IF NOT EXISTS symbols_text TEXT;
+
+CREATE OR REPLACE FUNCTION jsonb_strings(value JSONB)
+RETURNS TEXT AS $$
+    SELECT COALESCE(string_agg(item, ' '), '')
+    FROM jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(value) = 'array' THEN value ELSE '[]'::jsonb END
+    ) AS item;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION update_dream_search_fields()
+RETURNS TRIGGER AS $$
+DECLARE
+    labels TEXT := lower(jsonb_strings(NEW.symbols) || ' ' || jsonb_strings(NEW.tags));
+BEGIN
+    NEW.symbols_text := labels;
+    NEW.search_vector :=
+        setweight(to_tsvector('english', COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', labels), 'A') ||
+        setweight(to_tsvector('english', COALESCE(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('simple', COALESCE(NEW.title, '') || ' ' || COALESCE(NEW.description, '')), 'D');
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_dreams_search_fields BEFORE INSERT OR UPDATE OF title, description, symbols, tags ON dreams
+    FOR EACH ROW EXECUTE FUNCTION update_dream_search_fields();
+
+-- Backfill existing dreams without touching updated_at
+ALTER TABLE dreams DISABLE TRIGGER update_dreams_updated_at;
+UPDATE dreams SET title = title;
+ALTER TABLE dreams ENABLE TRIGGER update_dreams_updated_at;
+
+CREATE INDEX IF NOT EXISTS idx_dreams_search_vector ON dreams USING GIN(search_vector);
+CREATE INDEX IF NOT EXISTS idx_dreams_symbols_trgm ON dreams USING GIN(symbols_text gin_trgm_ops);
+
+-- Journal search and recency ordering within a user's dreams
+CREATE INDEX IF NOT EXISTS idx_dreams_user_created ON dreams(user_id, created_at DESC, id DESC);
@@ -0,0 +1,26 @@
+-- Dream embeddings for similar-dream lookups
+-- PostgreSQL 15+, pgvector 0.5+
+--
+-- One float32 vector per dream, written by app/services/dream_embeddings.py.
+-- The dimension must match EMBEDDING_DIMENSIONS (768 for nomic-embed-text);
+-- switching to a model with another dimension needs a new column and index.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS dream_embeddings (
+    dream_id INTEGER PRIMARY KEY REFERENCES dreams(id) ON DELETE CASCADE,
+    model VARCHAR(100) NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    embedding vector(768) NOT NULL,
+
+    -- Timestamps
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Approximate nearest neighbours by cosine distance
+CREATE INDEX IF NOT EXISTS idx_dream_embeddings_hnsw ON dream_embeddings
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE TRIGGER update_dream_embeddings_updated_at BEFORE UPDATE ON dream_embeddings
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -0,0 +1,11 @@
+-- Comment thread loading
+-- PostgreSQL 15+
+--
+-- GET /social/posts/{id}/comments loads a page of top-level comments and
+-- their replies with one recursive query (app/services/comment_threads.py).
+-- Top-level comments are paged by id within a post; replies are found
+-- through the existing idx_comments_parent_id.
+
+CREATE INDEX IF NOT EXISTS idx_comments_post_top_level
+    ON comments(post_id, id)
+    WHERE parent_comment_id IS NULL;
@@ -0,0 +1,219 @@
+-- Dream journal analytics
+-- PostgreSQL 15+
+--
+-- Per-user monthly aggregates read by GET /api/v1/dreams/analytics
+-- (app/services/dream_analytics.py), so a summary never scans or unnests
+-- a user's journal:
+--
+-- - dream_term_counts: dreams per symbol, emotion and dream type
+-- - sleep_period_stats: nights, quality and duration totals, split by
+--   whether the user dreamed that night
+--
+-- Statement-level triggers apply the net change of each INSERT, UPDATE or
+-- DELETE on dreams and sleep_logs, so a bulk import updates each aggregate
+-- row once per statement rather than once per dream.
+-- refresh_dream_analytics() rebuilds the aggregates from the source tables
+-- (python -m app.cli.refresh_analytics).
+
+CREATE TABLE IF NOT EXISTS dream_term_counts (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    period DATE NOT NULL, -- First day of the month the dreams were recorded
+    kind VARCHAR(10) NOT NULL, -- 'symbol', 'emotion' or 'type'
+    term VARCHAR(200) NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (user_id, period, kind, term)
+);
+
+-- Most frequent terms of a user's month
+CREATE INDEX IF NOT EXISTS idx_dream_term_counts_top
+    ON dream_term_counts(user_id, period, kind, count DESC);
+
+CREATE TABLE IF NOT EXISTS sleep_period_stats (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    period DATE NOT NULL, -- First day of the month of the sleep date
+    had_dream BOOLEAN NOT NULL,
+    nights INTEGER NOT NULL DEFAULT 0,
+    quality_sum INTEGER NOT NULL DEFAULT 0,
+    rated_nights INTEGER NOT NULL DEFAULT 0,
+    hours_sum FLOAT NOT NULL DEFAULT 0,
+    timed_nights INTEGER NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (user_id, period, had_dream)
+);
+
+-- Distinct normalized terms of one dream
+CREATE OR REPLACE FUNCTION dream_analytics_terms(symbols JSONB, emotions JSONB, dream_type TEXT)
+RETURNS TABLE(kind TEXT, term TEXT) AS $$
+    SELECT 'symbol', left(lower(btrim(item)), 200)
+    FROM jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(symbols) = 'array' THEN symbols ELSE '[]'::jsonb END
+    ) AS item
+    WHERE btrim(item) <> ''
+    UNION
+    SELECT 'emotion', left(lower(btrim(item)), 200)
+    FROM jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(emotions) = 'array' THEN emotions ELSE '[]'::jsonb END
+    ) AS item
+    WHERE btrim(item) <> ''
+    UNION
+    SELECT 'type', COALESCE(dream_type, 'regular');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION apply_dream_term_deltas(added dreams[], removed dreams[])
+RETURNS VOID AS $$
+    WITH changes AS (
+        SELECT d.user_id, date_trunc('month', d.created_at)::date AS period, t.kind, t.term, 1 AS delta
+        FROM unnest(COALESCE(added, '{}')) AS d,
+             dream_analytics_terms(d.symbols, d.emotions, d.dream_type::text) AS t
+        UNION ALL
+        SELECT d.user_id, date_trunc('month', d.created_at)::date, t.kind, t.term, -1
+        FROM unnest(COALESCE(removed, '{}')) AS d,
+             dream_analytics_terms(d.symbols, d.emotions, d.dream_type::text) AS t
+    ),
+    deltas AS (
+        SELECT user_id, period, kind, term, sum(delta) AS delta
+        FROM changes
+        GROUP BY user_id, period, kind, term
+        HAVING sum(delta) <> 0
+    )
+    INSERT INTO dream_term_counts (user_id, period, kind, term, count)
+    SELECT user_id, period, kind, term, delta
+    FROM deltas
+    -- Same lock order in every transaction, so concurrent writers cannot deadlock
+    ORDER BY user_id, period, kind, term
+    ON CONFLICT (user_id, period, kind, term)
+        DO UPDATE SET count = dream_term_counts.count + EXCLUDED.count;
+
+    DELETE FROM dream_term_counts
+    WHERE count <= 0
+      AND (user_id, period) IN (
+          SELECT d.user_id, date_trunc('month', d.created_at)::date
+          FROM unnest(COALESCE(removed, '{}')) AS d
+      );
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION update_dream_analytics()
+RETURNS TRIGGER AS $$
+DECLARE
+    added dreams[];
+    removed dreams[];
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT array_agg(n) INTO added FROM new_dreams AS n;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT array_agg(o) INTO removed FROM old_dreams AS o;
+    END IF;
+    PERFORM apply_dream_term_deltas(added, removed);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_dreams_analytics_on_insert AFTER INSERT ON dreams
+    REFERENCING NEW TABLE AS new_dreams
+    FOR EACH STATEMENT EXECUTE FUNCTION update_dream_analytics();
+
+CREATE TRIGGER update_dreams_analytics_on_update AFTER UPDATE ON dreams
+    REFERENCING OLD TABLE AS old_dreams NEW TABLE AS new_dreams
+    FOR EACH STATEMENT EXECUTE FUNCTION update_dream_analytics();
+
+CREATE TRIGGER update_dreams_analytics_on_delete AFTER DELETE ON dreams
+    REFERENCING OLD TABLE AS old_dreams
+    FOR EACH STATEMENT EXECUTE FUNCTION update_dream_analytics();
+
+CREATE OR REPLACE FUNCTION apply_sleep_deltas(added sleep_logs[], removed sleep_logs[])
+RETURNS VOID AS $$
+    WITH changes AS (
+        SELECT s.user_id, date_trunc('month', s.sleep_date)::date AS period,
+               COALESCE(s.had_dream, FALSE) AS had_dream, s.delta,
+               s.quality_rating, s.duration_hours
+        FROM (
+            SELECT a.*, 1 AS delta FROM unnest(COALESCE(added, '{}')) AS a
+            UNION ALL
+            SELECT r.*, -1 FROM unnest(COALESCE(removed, '{}')) AS r
+        ) AS s
+    ),
+    deltas AS (
+        SELECT user_id, period, had_dream,
+               sum(delta) AS nights,
+               COALESCE(sum(delta * quality_rating), 0) AS quality_sum,
+               sum(delta) FILTER (WHERE quality_rating IS NOT NULL) AS rated_nights,
+               COALESCE(sum(delta * duration_hours), 0) AS hours_sum,
+               sum(delta) FILTER (WHERE duration_hours IS NOT NULL) AS timed_nights
+        FROM changes
+        GROUP BY user_id, period, had_dream
+    )
+    INSERT INTO sleep_period_stats (user_id, period, had_dream, nights, quality_sum, rated_nights, hours_sum, timed_nights)
+    SELECT user_id, period, had_dream, nights, quality_sum,
+           COALESCE(rated_nights, 0), hours_sum, COALESCE(timed_nights, 0)
+    FROM deltas
+    ORDER BY user_id, period, had_dream
+    ON CONFLICT (user_id, period, had_dream) DO UPDATE SET
+        nights = sleep_period_stats.nights + EXCLUDED.nights,
+        quality_sum = sleep_period_stats.quality_sum + EXCLUDED.quality_sum,
+        rated_nights = sleep_period_stats.rated_nights + EXCLUDED.rated_nights,
+        hours_sum = sleep_period_stats.hours_sum + EXCLUDED.hours_sum,
+        timed_nights = sleep_period_stats.timed_nights + EXCLUDED.timed_nights;
+
+    DELETE FROM sleep_period_stats
+    WHERE nights <= 0
+      AND (user_id, period) IN (
+          SELECT r.user_id, date_trunc('month', r.sleep_date)::date
+          FROM unnest(COALESCE(removed, '{}')) AS r
+      );
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION update_sleep_analytics()
+RETURNS TRIGGER AS $$
+DECLARE
+    added sleep_logs[];
+    removed sleep_logs[];
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT array_agg(n) INTO added FROM new_logs AS n;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT array_agg(o) INTO removed FROM old_logs AS o;
+    END IF;
+    PERFORM apply_sleep_deltas(added, removed);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_sleep_logs_analytics_on_insert AFTER INSERT ON sleep_logs
+    REFERENCING NEW TABLE AS new_logs
+    FOR EACH STATEMENT EXECUTE FUNCTION update_sleep_analytics();
+
+CREATE TRIGGER update_sleep_logs_analytics_on_update AFTER UPDATE ON sleep_logs
+    REFERENCING OLD TABLE AS old_logs NEW TABLE AS new_logs
+    FOR EACH STATEMENT EXECUTE FUNCTION update_sleep_analytics();
+
+CREATE TRIGGER update_sleep_logs_analytics_on_delete AFTER DELETE ON sleep_logs
+    REFERENCING OLD TABLE AS old_logs
+    FOR EACH STATEMENT EXECUTE FUNCTION update_sleep_analytics();
+
+-- Recompute the aggregates of one user, or of everyone when p_user_id is NULL
+CREATE OR REPLACE FUNCTION refresh_dream_analytics(p_user_id INTEGER DEFAULT NULL)
+RETURNS VOID AS $$
+    DELETE FROM dream_term_counts WHERE p_user_id IS NULL OR user_id = p_user_id;
+    DELETE FROM sleep_period_stats WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+    INSERT INTO dream_term_counts (user_id, period, kind, term, count)
+    SELECT d.user_id, date_trunc('month', d.created_at)::date, t.kind, t.term, count(*)
+    FROM dreams AS d,
+         dream_analytics_terms(d.symbols, d.emotions, d.dream_type::text) AS t
+    WHERE p_user_id IS NULL OR d.user_id = p_user_id
+    GROUP BY 1, 2, 3, 4;
+
+    INSERT INTO sleep_period_stats (user_id, period, had_dream, nights, quality_sum, rated_nights, hours_sum, timed_nights)
+    SELECT user_id, date_trunc('month', sleep_date)::date, COALESCE(had_dream, FALSE),
+           count(*), COALESCE(sum(quality_rating), 0), count(quality_rating),
+           COALESCE(sum(duration_hours), 0), count(duration_hours)
+    FROM sleep_logs
+    WHERE p_user_id IS NULL OR user_id = p_user_id
+    GROUP BY 1, 2, 3;
+$$ LANGUAGE sql;
+
+-- Backfill
+SELECT refresh_dream_analytics();